@@ -0,0 +1,250 @@
+"""CSC148 Assignment 2 - Batch File
+
+=== CSC148 Summer 2019 ===
+Department of Computer Science,
+University of Toronto
+
+=== Module Description ===
+
+This file contains a batch runner that plays many independent games of
+<games.py> on a pool of processes, and an aggregator that summarizes how often
+each outcome happened for every configuration of game:
+
+    python batch.py --games ZombieTag --players 50 100 --runs 200 --workers 4
+
+Every game gets a seed of its own drawn from the master seed, so a batch gives
+the same records however its games are spread over the processes.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, \
+    Tuple, Union
+from benchmarks import TREE_TYPES, GAME_SIDE, new_tree
+from games import Tag, ZombieTag, EliminationTag
+from simulation import Simulation
+
+GAME_TYPES = ['Tag', 'ZombieTag', 'EliminationTag']
+
+
+class GameConfig(NamedTuple):
+    """The settings of a game played by the batch runner.
+
+    === Public Attributes ===
+    game: the name of the game, one of GAME_TYPES
+    tree: the name of the tree used as the field, one of TREE_TYPES
+    n_players: the number of players the game starts with
+    max_speed: the highest speed a player can start with
+    max_vision: the highest vision a player can start with
+    duration: the duration of a Tag or ZombieTag game, in ticks
+    max_ticks: the number of ticks after which the game is stopped
+    """
+    game: str
+    tree: str
+    n_players: int
+    max_speed: int
+    max_vision: int
+    duration: int = 10
+    max_ticks: int = 1000
+
+
+class GameRecord(NamedTuple):
+    """The outcome of one game played by the batch runner.
+
+    === Public Attributes ===
+    config: the settings of the game
+    seed: the seed the game was played with
+    winner: the winner of the game, or None if there was none after
+    config.max_ticks ticks
+    ticks: the number of ticks played
+    eliminations: the number of players eliminated, or converted to zombies
+    seconds: the wall clock time the game took, setup included
+    """
+    config: GameConfig
+    seed: int
+    winner: Optional[str]
+    ticks: int
+    eliminations: int
+    seconds: float
+
+
+def _new_game(config: GameConfig, seed: int) -> \
+        Union[Tag, ZombieTag, EliminationTag]:
+    """ Return a new game with the settings in <config>, seeded with <seed>.
+    """
+    field = new_tree(config.tree, GAME_SIDE)
+    rng = random.Random(seed)
+    if config.game == 'Tag':
+        return Tag(config.n_players, field, config.duration, config.max_speed,
+                   config.max_vision, rng)
+    elif config.game == 'ZombieTag':
+        return ZombieTag(config.n_players, field, config.duration,
+                         config.max_speed, config.max_vision, rng)
+    return EliminationTag(config.n_players, field, config.max_speed,
+                          config.max_vision, rng)
+
+
+def play(config: GameConfig, seed: int) -> GameRecord:
+    """ Play one game with the settings in <config> and seeded with <seed>,
+    and return its record.
+
+    >>> record = play(GameConfig('ZombieTag', 'QuadTree', 5, 2, 2), 148)
+    >>> record.winner in ['humans', 'zombies']
+    True
+    >>> record.ticks
+    10
+    """
+    start = time.perf_counter()
+    game = _new_game(config, seed)
+    report = Simulation(game).run(config.max_ticks)
+    if config.game == 'ZombieTag':
+        left = len(game.get_team('humans'))
+    else:
+        left = len(game.get_players())
+    return GameRecord(config, seed, report.winner, report.ticks,
+                      config.n_players - left, time.perf_counter() - start)
+
+
+def _play_shard(shard: List[Tuple[GameConfig, int]]) -> List[GameRecord]:
+    """ Play every game in <shard>, a list of settings and seeds, in order. """
+    return [play(config, seed) for config, seed in shard]
+
+
+def run_batch(configs: Iterable[GameConfig], runs: int, seed: int,
+              workers: Optional[int] = None, shard_size: int = 8) -> \
+        Iterator[GameRecord]:
+    """ Play <runs> games of every configuration in <configs> on a pool of
+    <workers> processes, or of one per core if <workers> is None, and yield
+    their records as soon as each shard of <shard_size> games is done.
+
+    The seed of every game is drawn from <seed> before any game starts, so the
+    records of a batch only differ in their timing and in the order they are
+    yielded in.
+    """
+    master = random.Random(seed)
+    games = [(config, master.getrandbits(64))
+             for config in configs for _ in range(runs)]
+    shards = [games[i:i + shard_size]
+              for i in range(0, len(games), shard_size)]
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_play_shard, shard) for shard in shards]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def outcome(record: GameRecord) -> str:
+    """ Return the outcome of the game of <record>: the group that won a
+    ZombieTag game, or whether any player won the other games, as the names of
+    their players do not carry over from one game to the next.
+
+    >>> config = GameConfig('Tag', 'QuadTree', 5, 2, 2)
+    >>> outcome(GameRecord(config, 0, '3', 20, 3, 0.1))
+    'winner'
+    >>> outcome(GameRecord(config, 0, None, 1000, 2, 0.5))
+    'no winner'
+    """
+    if record.config.game == 'ZombieTag' and record.winner is not None:
+        return record.winner
+    return 'winner' if record.winner is not None else 'no winner'
+
+
+def aggregate(records: Iterable[GameRecord]) -> List[Dict]:
+    """ Return a JSON compatible summary of <records> for every configuration
+    they were played with: the number of games, the rate of each outcome and
+    the mean ticks, eliminations and seconds per game.
+
+    >>> config = GameConfig('ZombieTag', 'QuadTree', 5, 2, 2)
+    >>> summary = aggregate([GameRecord(config, 0, 'humans', 10, 1, 0.1),
+    ...                      GameRecord(config, 1, 'zombies', 6, 5, 0.3)])
+    >>> summary[0]['games'], summary[0]['win_rates']
+    (2, {'humans': 0.5, 'zombies': 0.5})
+    >>> summary[0]['mean_ticks']
+    8.0
+    """
+    by_config = {}
+    for record in records:
+        by_config.setdefault(record.config, []).append(record)
+
+    summary = []
+    for config in sorted(by_config):
+        group = by_config[config]
+        counts = {}
+        for record in group:
+            counts[outcome(record)] = counts.get(outcome(record), 0) + 1
+        summary.append(dict(
+            config._asdict(), games=len(group),
+            win_rates={name: counts[name] / len(group)
+                       for name in sorted(counts)},
+            mean_ticks=sum(record.ticks for record in group) / len(group),
+            mean_eliminations=sum(record.eliminations
+                                  for record in group) / len(group),
+            mean_seconds=sum(record.seconds for record in group) / len(group)))
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """ Run the batch of games selected on the command line <argv>."""
+    parser = argparse.ArgumentParser(
+        description='Play many seeded games on a pool of processes and '
+                    'summarize how often each outcome happened for every '
+                    'configuration of game.')
+    parser.add_argument('--games', nargs='+', choices=GAME_TYPES,
+                        default=GAME_TYPES)
+    parser.add_argument('--trees', nargs='+', choices=TREE_TYPES,
+                        default=['QuadTree'])
+    parser.add_argument('--players', type=int, nargs='+', default=[50])
+    parser.add_argument('--speeds', type=int, nargs='+', default=[3],
+                        help='values of max_speed to play with')
+    parser.add_argument('--visions', type=int, nargs='+', default=[10],
+                        help='values of max_vision to play with')
+    parser.add_argument('--duration', type=int, default=10)
+    parser.add_argument('--max-ticks', type=int, default=1000)
+    parser.add_argument('--runs', type=int, default=100,
+                        help='games played per configuration')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes to play on, one per core by default')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--records', default=None,
+                        help='JSON lines file to stream every record to')
+    parser.add_argument('--output', default=None,
+                        help='JSON file to write the summary to, stdout by '
+                             'default')
+    args = parser.parse_args(argv)
+
+    configs = [GameConfig(game, tree, n, speed, vision, args.duration,
+                          args.max_ticks)
+               for game in args.games for tree in args.trees
+               for n in args.players for speed in args.speeds
+               for vision in args.visions]
+    records = []
+    stream = None if args.records is None else open(args.records, 'w')
+    try:
+        for record in run_batch(configs, args.runs, args.seed, args.workers):
+            records.append(record)
+            if stream is not None:
+                stream.write(json.dumps(dict(record._asdict(),
+                                             config=record.config._asdict()))
+                             + '\n')
+            print('{:>6}/{}'.format(len(records), len(configs) * args.runs),
+                  end='\r', file=sys.stderr)
+    finally:
+        if stream is not None:
+            stream.close()
+    print(file=sys.stderr)
+
+    summary = aggregate(records)
+    if args.output is None:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
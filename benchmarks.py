@@ -0,0 +1,424 @@
+"""CSC148 Assignment 2 - Benchmarks File
+
+=== CSC148 Summer 2019 ===
+Department of Computer Science,
+University of Toronto
+
+=== Module Description ===
+
+This file contains a standalone benchmark runner for the trees in <trees.py>
+and for full ticks of the games in <games.py>. Results are written as JSON so
+that runs can be compared across releases:
+
+    python benchmarks.py --sizes 1000 10000 100000 --output results.json
+
+Every tree benchmark builds its tree before the clock starts, and then times
+<ops> operations on it. Every game benchmark times Simulation.step.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from games import Tag, ZombieTag, EliminationTag
+from simulation import Simulation
+from trees import Tree, QuadTree, CompactQuadTree, TwoDTree, FlatTwoDTree, \
+    GridTree, LinearQuadTree, OutOfBoundsError
+
+TREE_TYPES = ['QuadTree', 'BucketQuadTree', 'CompactQuadTree', 'TwoDTree',
+              'ScapegoatTwoDTree', 'FlatTwoDTree', 'GridTree', 'LinearQuadTree']
+VISIONS = [2, 10, 50]
+DIRECTIONS = ['N', 'S', 'E', 'W']
+QUADRANTS = ['NW', 'NE', 'SW', 'SE']
+GAME_SIDE = 500
+
+
+def _field_side(n: int) -> int:
+    """ Return an even side length for a square field where <n> points take
+    roughly a tenth of all the cells.
+    """
+    side = max(100, int(math.sqrt(10 * n)))
+    return side + side % 2
+
+
+def new_tree(tree_type: str, side: int) -> Tree:
+    """ Return a new empty tree of <tree_type> covering a square field with
+    sides of length <side>.
+    """
+    if tree_type == 'QuadTree':
+        return QuadTree((side // 2, side // 2))
+    elif tree_type == 'BucketQuadTree':
+        return QuadTree((side // 2, side // 2), capacity=8)
+    elif tree_type == 'CompactQuadTree':
+        return CompactQuadTree((side // 2, side // 2))
+    elif tree_type == 'FlatTwoDTree':
+        return FlatTwoDTree((0, 0), (side, side))
+    elif tree_type == 'GridTree':
+        return GridTree((0, 0), (side, side))
+    elif tree_type == 'LinearQuadTree':
+        return LinearQuadTree((side // 2, side // 2))
+    elif tree_type == 'ScapegoatTwoDTree':
+        return TwoDTree((0, 0), (side, side), alpha=0.75)
+    return TwoDTree((0, 0), (side, side))
+
+
+def _items(rng: random.Random, n: int, side: int) -> \
+        List[Tuple[str, Tuple[int, int]]]:
+    """ Return <n> players with unique random points on a field with sides of
+    length <side>.
+    """
+    points = set()
+    while len(points) < n:
+        points.add((rng.randint(0, side), rng.randint(0, side)))
+    return [(str(i), point) for i, point in enumerate(points)]
+
+
+def _filled(tree_type: str, items: List[Tuple[str, Tuple[int, int]]],
+            side: int) -> Tree:
+    """ Return a tree of <tree_type> built by inserting <items> one by one.
+
+    A FlatTwoDTree is bulk loaded instead, since it is rebuilt whenever its
+    delta buffer fills up.
+    """
+    tree = new_tree(tree_type, side)
+    if tree_type == 'FlatTwoDTree':
+        tree.insert_many(items)
+        return tree
+    for name, point in items:
+        tree.insert(name, point)
+    return tree
+
+
+def _timed(operation: Callable[[], None]) -> float:
+    """ Return the number of seconds <operation> took to run.
+    """
+    start = time.perf_counter()
+    operation()
+    return time.perf_counter() - start
+
+
+class Case:
+    """The data every tree benchmark is run against.
+
+    === Public Attributes ===
+    tree_type: the name of the tree class benchmarked
+    items: the players stored in the tree
+    side: the side length of the square field
+    rng: the random number generator used to draw the operations
+    ops: the number of operations to time
+    """
+    tree_type: str
+    items: List[Tuple[str, Tuple[int, int]]]
+    side: int
+    rng: random.Random
+    ops: int
+
+    def __init__(self, tree_type: str, items: List[Tuple[str, Tuple[int, int]]],
+                 side: int, rng: random.Random, ops: int) -> None:
+        """Initialize a new Case."""
+        self.tree_type = tree_type
+        self.items = items
+        self.side = side
+        self.rng = rng
+        self.ops = ops
+
+    def filled(self) -> Tree:
+        """ Return a new tree storing every player of <self>."""
+        return _filled(self.tree_type, self.items, self.side)
+
+    def sample(self) -> List[Tuple[str, Tuple[int, int]]]:
+        """ Return <self.ops> players of <self>, drawn with replacement."""
+        return [self.rng.choice(self.items) for _ in range(self.ops)]
+
+    def random_points(self) -> List[Tuple[int, int]]:
+        """ Return <self.ops> random points on the field of <self>."""
+        return [(self.rng.randint(0, self.side), self.rng.randint(0, self.side))
+                for _ in range(self.ops)]
+
+
+def bench_insert(case: Case) -> Tuple[int, float]:
+    """ Time inserting every player, one at a time, into an empty tree."""
+    tree = new_tree(case.tree_type, case.side)
+
+    def run() -> None:
+        for name, point in case.items:
+            tree.insert(name, point)
+    return len(case.items), _timed(run)
+
+
+def bench_insert_many(case: Case) -> Tuple[int, float]:
+    """ Time bulk loading every player into an empty tree."""
+    tree = new_tree(case.tree_type, case.side)
+    return len(case.items), _timed(lambda: tree.insert_many(case.items))
+
+
+def bench_contains_point(case: Case) -> Tuple[int, float]:
+    """ Time contains_point on random points, most of which are empty."""
+    tree = case.filled()
+    points = case.random_points()
+
+    def run() -> None:
+        for point in points:
+            tree.contains_point(point)
+    return len(points), _timed(run)
+
+
+def bench_contains(case: Case) -> Tuple[int, float]:
+    """ Time the 'in' operator on names of stored players."""
+    tree = case.filled()
+    names = [name for name, _ in case.sample()]
+
+    def run() -> None:
+        for name in names:
+            _ = name in tree
+    return len(names), _timed(run)
+
+
+def _moves(case: Case) -> List[Tuple[str, str, int]]:
+    """ Return <case.ops> moves of one step for random players."""
+    return [(name, case.rng.choice(DIRECTIONS), 1)
+            for name, _ in case.sample()]
+
+
+def bench_move(case: Case) -> Tuple[int, float]:
+    """ Time moving random players by one step, by name."""
+    tree = case.filled()
+    moves = _moves(case)
+
+    def run() -> None:
+        for name, direction, steps in moves:
+            try:
+                tree.move(name, direction, steps)
+            except OutOfBoundsError:
+                pass
+    return len(moves), _timed(run)
+
+
+def bench_move_point(case: Case) -> Tuple[int, float]:
+    """ Time moving random players by one step, by point."""
+    tree = case.filled()
+    locations = dict(case.items)
+    moves = _moves(case)
+
+    def run() -> None:
+        for name, direction, steps in moves:
+            try:
+                locations[name] = tree.move_point(locations[name], direction,
+                                                  steps)
+            except OutOfBoundsError:
+                pass
+    return len(moves), _timed(run)
+
+
+def bench_move_many(case: Case) -> Tuple[int, float]:
+    """ Time moving random players by one step with a single batched call."""
+    tree = case.filled()
+    moves = _moves(case)
+    return len(moves), _timed(lambda: tree.move_many(moves))
+
+
+def _bench_names_in_range(vision: int) -> Callable[[Case], Tuple[int, float]]:
+    """ Return a benchmark timing names_in_range with distance <vision>."""
+    def bench(case: Case) -> Tuple[int, float]:
+        tree = case.filled()
+        queries = [(point, case.rng.choice(QUADRANTS))
+                   for _, point in case.sample()]
+
+        def run() -> None:
+            for point, direction in queries:
+                tree.names_in_range(point, direction, vision)
+        return len(queries), _timed(run)
+    bench.__doc__ = """ Time names_in_range with distance {}.""".format(vision)
+    return bench
+
+
+def bench_remove(case: Case) -> Tuple[int, float]:
+    """ Time removing distinct players by name."""
+    tree = case.filled()
+    names = [name for name, _ in case.items[:case.ops]]
+
+    def run() -> None:
+        for name in names:
+            tree.remove(name)
+    return len(names), _timed(run)
+
+
+def bench_remove_point(case: Case) -> Tuple[int, float]:
+    """ Time removing distinct players by point."""
+    tree = case.filled()
+    points = [point for _, point in case.items[:case.ops]]
+
+    def run() -> None:
+        for point in points:
+            tree.remove_point(point)
+    return len(points), _timed(run)
+
+
+def bench_balance(case: Case) -> Tuple[int, float]:
+    """ Time balancing a tree built by inserting players one by one."""
+    tree = case.filled()
+    return len(case.items), _timed(tree.balance)
+
+
+TREE_BENCHMARKS = [('insert', bench_insert),
+                   ('insert_many', bench_insert_many),
+                   ('contains_point', bench_contains_point),
+                   ('contains', bench_contains),
+                   ('move', bench_move),
+                   ('move_point', bench_move_point),
+                   ('move_many', bench_move_many)] + \
+                  [('names_in_range_' + str(vision),
+                    _bench_names_in_range(vision)) for vision in VISIONS] + \
+                  [('remove', bench_remove),
+                   ('remove_point', bench_remove_point),
+                   ('balance', bench_balance)]
+
+
+def _applies(name: str, tree_type: str) -> bool:
+    """ Return True if the tree benchmark <name> is run on <tree_type>.
+
+    Only the kd-trees can be balanced, and filling a FlatTwoDTree one player
+    at a time rebuilds it over and over, which it is not meant for.
+    """
+    if name == 'balance':
+        return tree_type in ['TwoDTree', 'ScapegoatTwoDTree',
+                             'FlatTwoDTree']
+    elif name == 'insert':
+        return tree_type != 'FlatTwoDTree'
+    return True
+
+
+def _new_game(game_type: str, n: int, tree_type: str, seed: int) -> \
+        Union[Tag, ZombieTag, EliminationTag]:
+    """ Return a new game of <game_type> with <n> players on a field of
+    <tree_type>, seeded with <seed>.
+    """
+    field = new_tree(tree_type, GAME_SIDE)
+    rng = random.Random(seed)
+    if game_type == 'Tag':
+        return Tag(n, field, 10, 3, 10, rng)
+    elif game_type == 'ZombieTag':
+        return ZombieTag(n, field, 10 ** 9, 3, 10, rng)
+    return EliminationTag(n, field, 3, 10, rng)
+
+
+def bench_game(game_type: str, tree_type: str, n: int, ticks: int,
+               seed: int) -> Tuple[int, float]:
+    """ Time <ticks> full ticks of a <game_type> game with <n> players,
+    seeded with <seed>."""
+    sim = Simulation(_new_game(game_type, n, tree_type, seed))
+    seconds = 0.0
+    for _ in range(ticks):
+        start = time.perf_counter()
+        winner = sim.step()
+        seconds += time.perf_counter() - start
+        if winner is not None:
+            break
+    return sim.get_tick(), seconds
+
+
+def _record(results: List[Dict], name: str, tree_type: str, size: int,
+            runs: List[Tuple[int, float]]) -> None:
+    """ Append the summary of <runs> of the benchmark <name> to <results> and
+    echo it on stderr.
+    """
+    ops = runs[0][0]
+    seconds = [run[1] for run in runs]
+    best = min(seconds)
+    results.append({'name': name, 'tree': tree_type, 'size': size,
+                    'ops': ops, 'repeat': len(runs),
+                    'best_seconds': best,
+                    'mean_seconds': sum(seconds) / len(seconds),
+                    'ns_per_op': best / ops * 1e9 if ops else None})
+    print('{:<20} {:<15} {:>7} {:>12.1f} ns/op'.format(
+        name, tree_type, size, best / ops * 1e9 if ops else 0.0),
+        file=sys.stderr)
+
+
+def run_benchmarks(sizes: List[int], game_sizes: List[int],
+                   tree_types: List[str], ops: int, ticks: int, repeat: int,
+                   seed: int, only: Optional[str] = None) -> Dict:
+    """ Run every benchmark whose name contains <only>, or all of them if
+    <only> is None, and return the results as a JSON compatible dictionary.
+    """
+    results = []
+    for size in sizes:
+        side = _field_side(size)
+        items = _items(random.Random(seed), size, side)
+        for tree_type in tree_types:
+            for name, bench in TREE_BENCHMARKS:
+                if (only is not None and only not in name) or \
+                        not _applies(name, tree_type):
+                    continue
+                runs = []
+                for i in range(repeat):
+                    case = Case(tree_type, items, side,
+                                random.Random(seed + i), min(ops, size))
+                    runs.append(bench(case))
+                _record(results, name, tree_type, size, runs)
+
+    for size in game_sizes:
+        for game_type in ['Tag', 'ZombieTag', 'EliminationTag']:
+            name = game_type + '_tick'
+            if only is not None and only not in name:
+                continue
+            for tree_type in tree_types:
+                runs = []
+                for i in range(repeat):
+                    runs.append(bench_game(game_type, tree_type, size, ticks,
+                                           seed + i))
+                _record(results, name, tree_type, size, runs)
+
+    return {'meta': {'python': platform.python_version(),
+                     'implementation': platform.python_implementation(),
+                     'machine': platform.machine(),
+                     'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                     'seed': seed, 'ops': ops, 'ticks': ticks,
+                     'repeat': repeat},
+            'results': results}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """ Run the benchmarks selected on the command line <argv>."""
+    parser = argparse.ArgumentParser(
+        description='Time the tree operations and full game ticks at several '
+                    'sizes, and write the results as JSON.',
+        epilog='python benchmarks.py --sizes 1000 10000 100000 '
+               '--output results.json')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000],
+                        help='numbers of points in the tree benchmarks')
+    parser.add_argument('--game-sizes', type=int, nargs='*',
+                        default=[1000, 10000, 100000],
+                        help='numbers of players in the game benchmarks')
+    parser.add_argument('--trees', nargs='+', choices=TREE_TYPES,
+                        default=TREE_TYPES)
+    parser.add_argument('--ops', type=int, default=10000,
+                        help='operations timed per tree benchmark')
+    parser.add_argument('--ticks', type=int, default=5,
+                        help='ticks timed per game benchmark')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', default=None,
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', default=None,
+                        help='JSON file to write, stdout by default')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.game_sizes, args.trees, args.ops,
+                            args.ticks, args.repeat, args.seed, args.only)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
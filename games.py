@@ -11,13 +11,31 @@ This file contains classes that describe different versions of tag games.
 
 from __future__ import annotations
 import random
-from typing import Dict, Union, Optional
+from typing import Dict, Union, Optional, List, Tuple, KeysView
 from players import Player
-from trees import QuadTree, TwoDTree
+from spawn import spawn_points
+from trees import QuadTree, CompactQuadTree, TwoDTree, FlatTwoDTree, \
+    GridTree, LinearQuadTree
 
 
 class Game:
-    """An abstract class for a Game."""
+    """An abstract class for a Game.
+
+    === Public Attribute ===
+    field: a tree that stores the location of all players in the game
+
+    === Private Attribute ===
+    _teams: a dictionary mapping the name of each team in the game to the names
+    of its players, kept as the keys of a dict. Players share these dicts as
+    their targets or enemies, so moving a player to another team updates every
+    player that chases or avoids either team at once.
+    _rng: the random number generator the game makes its own choices with, and
+    that seeds the generator of each of its players
+    """
+    field: Union[QuadTree, CompactQuadTree, TwoDTree, FlatTwoDTree, GridTree,
+                 LinearQuadTree]
+    _teams: Dict[str, Dict[str, None]]
+    _rng: random.Random
 
     def handle_collision(self, player1: str, player2: str) -> None:
         """ Perform some action when <player1> and <player2> collide """
@@ -28,6 +46,61 @@ class Game:
         won the game, or None if no player has won yet """
         raise NotImplementedError
 
+    def get_players(self) -> Dict[str, Player]:
+        """ Return a dictionary mapping the names of all players still in the
+        game to their Player instances """
+        raise NotImplementedError
+
+    def end_of_tick(self, tick: int) -> Optional[str]:
+        """ Apply the rules of the game that depend on time at the end of tick
+        number <tick>, and return the name of the player or group of players
+        that have won the game, or None if no player has won yet.
+
+        By default the winner is checked after every tick.
+        """
+        return self.check_for_winner()
+
+    def _set_rng(self, rng: Optional[random.Random]) -> None:
+        """ Make <rng> the generator of the game, or a generator seeded from
+        the random module if <rng> is None """
+        if rng is None:
+            rng = random.Random(random.getrandbits(64))
+        self._rng = rng
+
+    def _player_rng(self) -> random.Random:
+        """ Return a new generator for a player, seeded from the generator of
+        the game so that every player gets a stream of its own """
+        return random.Random(self._rng.getrandbits(64))
+
+    def get_team(self, team: str) -> KeysView[str]:
+        """ Return a read-only view of the names of the players in <team>
+
+        >>> game = ZombieTag(2, QuadTree((250, 250)), 10, 2, 2)
+        >>> list(game.get_team('zombies'))
+        ['first zombie']
+        """
+        return self._teams[team].keys()
+
+    def _change_team(self, name: str, old: str, new: str) -> None:
+        """ Move the player named <name> from team <old> to team <new> """
+        self._teams[old].pop(name)
+        self._teams[new][name] = None
+
+    def resolve_collisions(self, radius: int = 1) -> List[Tuple[str, str]]:
+        """ Call handle_collision for every pair of players on the field that
+        are within <radius> steps of each other, in the sorted order of the
+        pairs. Pairs with a player that an earlier collision removed from the
+        field are skipped.
+
+        Return the pairs that handle_collision was called for.
+        """
+        handled = []
+        for player1, player2 in self.field.find_collisions(radius):
+            if player1 in self.field and player2 in self.field:
+                self.handle_collision(player1, player2)
+                handled.append((player1, player2))
+        return handled
+
 
 class Tag(Game):
     """A Game of Tag.
@@ -40,7 +113,8 @@ class Tag(Game):
 
     === Public Attribute ===
     field: a tree that stores the location of all players in _players which can
-    be either QuadTree or TwoDTree
+    be a QuadTree, a CompactQuadTree, a TwoDTree, a FlatTwoDTree, a GridTree or
+    a LinearQuadTree
 
     === Private Attribute ===
     _players: a dictionary (key-value pair) mapping the names of players to
@@ -49,56 +123,76 @@ class Tag(Game):
 
     _it: the name of the player in _players that is currently ‘it’
     _duration: the amount of time before the game eliminates some more players
+    _teams: maps 'it' to the name of the player who is ‘it’, who targets the
+    team 'players' of everyone else, who all have the team 'it' as enemies
 
     === Representation Invariant ===
     - In this game there is one player who is ‘it’.
     - Every other player should try to avoid the player who is ‘it’.
+    - _duration >= 1
     """
     _players: Dict[str, Player]
-    field: Union[QuadTree, TwoDTree]
+    field: Union[QuadTree, CompactQuadTree, TwoDTree, FlatTwoDTree, GridTree,
+                 LinearQuadTree]
     _it: str
     _duration: int
 
-    def __init__(self, n_players: int, field_type: Union[QuadTree, TwoDTree],
-                 duration: int, max_speed: int, max_vision: int) -> None:
+    def __init__(self, n_players: int,
+                 field_type: Union[QuadTree, CompactQuadTree, TwoDTree,
+                                   FlatTwoDTree, GridTree, LinearQuadTree],
+                 duration: int, max_speed: int, max_vision: int,
+                 rng: Optional[random.Random] = None) -> None:
         """Initialize a new game Tag containing n_players, field_type, duration,
-         max_speed and max_vision.
+         max_speed and max_vision, which makes its random choices with <rng>.
+
+        Raise a ValueError if <duration> is less than 1.
 
         >>> game = Tag(3, QuadTree((100, 100)), 10, 2, 2)
+        >>> game = Tag(3, CompactQuadTree((100, 100)), 10, 2, 2)
+        >>> game1 = Tag(3, QuadTree((100, 100)), 10, 2, 2, random.Random(1))
+        >>> game2 = Tag(3, QuadTree((100, 100)), 10, 2, 2, random.Random(1))
+        >>> game1._it == game2._it
+        True
+        >>> Tag(3, QuadTree((100, 100)), 0, 2, 2)
+        Traceback (most recent call last):
+        ...
+        ValueError: the duration of a Tag game must be at least 1, not 0
         """
-
+        if duration < 1:
+            raise ValueError('the duration of a Tag game must be at least 1, '
+                             'not {}'.format(duration))
+        self._set_rng(rng)
         player_list = list(range(n_players))
-        p = 0
-        location_lst = []
-        while p < n_players:
-            loc = (random.randint(0, 500), random.randint(0, 500))
-            if loc not in location_lst:
-                location_lst.append(loc)
-                p += 1
+        location_lst = spawn_points(n_players, field_type.bounds(),
+                                    self._rng.getrandbits(64))
 
         self._players = {}
         self.field = field_type
-        self._it = str(random.choice(player_list))
+        self._it = str(self._rng.choice(player_list))
         self._duration = duration
-        create_it = Player(self._it, random.randint(0, max_vision),
-                           random.randint(1, max_speed), self, 'purple',
-                           location_lst[int(self._it)])
+        create_it = Player(self._it, self._rng.randint(0, max_vision),
+                           self._rng.randint(1, max_speed), self, 'purple',
+                           location_lst[int(self._it)], self._player_rng())
         self._players[self._it] = create_it
-        self.field.insert(self._it, location_lst[int(self._it)])
+        self._teams = {'it': {self._it: None}, 'players': {}}
+        create_it.share_targets(self._teams['players'])
 
         for player in range(len(player_list)):
             player_name = str(player_list[player])
             if player_name != self._it:
                 create_player = Player(player_name,
-                                       random.randint(0, max_vision),
-                                       random.randint(1, max_speed), self,
-                                       'green', location_lst[player])
+                                       self._rng.randint(0, max_vision),
+                                       self._rng.randint(1, max_speed), self,
+                                       'green', location_lst[player],
+                                       self._player_rng())
 
-                create_player.select_enemy(self._it)
-                self._players[self._it].select_target(player_name)
+                create_player.share_enemies(self._teams['it'])
+                self._teams['players'][player_name] = None
 
                 self._players[player_name] = create_player
-                self.field.insert(player_name, location_lst[player])
+
+        self.field.insert_many([(str(player), location_lst[player])
+                                for player in player_list])
 
     def handle_collision(self, player1: str, player2: str) -> None:
         """ Perform some action when <player1> and <player2> collide
@@ -118,26 +212,60 @@ class Tag(Game):
         self._players[player2].reverse_direction()
         if player1 == self._it:
             self._players[player2].increase_points(1)
-            self._players[player2].ignore_enemy(player1)
-            self._players[player1].ignore_target(player2)
-            self._players[player1].select_enemy(player2)
-            for player in self._players[player1].get_targets():
-                self._players[player1].ignore_target(player)
-                self._players[player2].select_target(player)
-            self._it = player2
-            self._players[player2].set_colour('purple')
-            self._players[player1].set_colour('green')
+            self._hand_off(player2)
         elif player2 == self._it:
             self._players[player1].increase_points(1)
-            self._players[player1].ignore_enemy(player2)
-            self._players[player2].ignore_target(player1)
-            self._players[player2].select_enemy(player1)
-            for player in self._players[player2].get_targets():
-                self._players[player2].ignore_target(player)
-                self._players[player1].select_target(player)
-            self._it = player1
-            self._players[player1].set_colour('purple')
-            self._players[player2].set_colour('green')
+            self._hand_off(player1)
+
+    def _hand_off(self, name: str) -> None:
+        """ Make the player named <name> ‘it’ in place of the current one
+
+        >>> game = Tag(3, QuadTree((250, 250)), 10, 2, 2)
+        >>> old_it = game._it
+        >>> new_it = next(p for p in game._players if p != old_it)
+        >>> game._hand_off(new_it)
+        >>> list(game.get_team('it')) == [new_it]
+        True
+        >>> old_it in game._players[new_it].get_targets()
+        True
+        >>> game._players[old_it].get_enemies() == [new_it]
+        True
+        """
+        old_it = self._players[self._it]
+        new_it = self._players[name]
+        self._change_team(self._it, 'it', 'players')
+        self._change_team(name, 'players', 'it')
+        old_it.share_targets({})
+        old_it.share_enemies(self._teams['it'])
+        new_it.share_enemies({})
+        new_it.share_targets(self._teams['players'])
+        self._it = name
+        new_it.set_colour('purple')
+        old_it.set_colour('green')
+
+    def get_players(self) -> Dict[str, Player]:
+        """ Return a dictionary mapping the names of all players still in the
+        game to their Player instances
+
+        >>> game = Tag(3, QuadTree((250, 250)), 10, 2, 2)
+        >>> sorted(game.get_players())
+        ['0', '1', '2']
+        """
+        return self._players.copy()
+
+    def end_of_tick(self, tick: int) -> Optional[str]:
+        """ Eliminate tagged players every _duration ticks, and return the
+        name of the winner once it is decided
+
+        >>> game = Tag(1, QuadTree((250, 250)), 10, 2, 2)
+        >>> game.end_of_tick(9) is None
+        True
+        >>> game.end_of_tick(10)
+        '0'
+        """
+        if tick % self._duration == 0:
+            return self.check_for_winner()
+        return None
 
     def check_for_winner(self) -> Optional[str]:
         """ Return the name of the player or group of players that have
@@ -166,7 +294,7 @@ class Tag(Game):
             for loser in to_del_lst:
                 self.field.remove(loser)
                 self._players.pop(loser)
-                self._players[self._it].ignore_target(loser)
+                self._teams['players'].pop(loser)
 
 
 class ZombieTag(Game):
@@ -180,7 +308,8 @@ class ZombieTag(Game):
 
     === Public Attribute ===
     field: a tree that stores the location of all players in _players which can
-    be either QuadTree or TwoDTree
+    be a QuadTree, a CompactQuadTree, a TwoDTree, a FlatTwoDTree, a GridTree or
+    a LinearQuadTree
 
     === Private Attribute ===
     _humans: a dictionary (key-value pair) mapping the names of human players to
@@ -193,6 +322,9 @@ class ZombieTag(Game):
 
     _it: the name of the player in _players that is currently ‘it’
     _duration: The amount of time before the game ends and a winner is decided
+    _teams: maps 'humans' and 'zombies' to the names of the players in
+    _humans and _zombies. Every zombie targets the team 'humans' and every
+    human has the team 'zombies' as enemies.
 
     === Representation Invariants ===
     - In this game, one person starts out as a zombie and everyone else starts
@@ -200,25 +332,25 @@ class ZombieTag(Game):
     """
     _humans: Dict[str, Player]
     _zombies: Dict[str, Player]
-    field: Union[QuadTree, TwoDTree]
+    field: Union[QuadTree, CompactQuadTree, TwoDTree, FlatTwoDTree, GridTree,
+                 LinearQuadTree]
     _duration: int
 
-    def __init__(self, n_players: int, field_type: Union[QuadTree, TwoDTree],
-                 duration: int, max_speed: int, max_vision: int) -> None:
+    def __init__(self, n_players: int,
+                 field_type: Union[QuadTree, CompactQuadTree, TwoDTree,
+                                   FlatTwoDTree, GridTree, LinearQuadTree],
+                 duration: int, max_speed: int, max_vision: int,
+                 rng: Optional[random.Random] = None) -> None:
         """Initialize a new game ZombieTag containing n_players, field_type,
-        duration, max_speed and max_vision.
+        duration, max_speed and max_vision, which makes its random choices with
+        <rng>.
 
         >>> game = ZombieTag(3, QuadTree((100, 100)), 10, 2, 2)
         """
-
+        self._set_rng(rng)
         player_list = list(range(n_players))
-        p = 0
-        location_lst = []
-        while p <= n_players:
-            loc = (random.randint(0, 500), random.randint(0, 500))
-            if loc not in location_lst:
-                location_lst.append(loc)
-                p += 1
+        location_lst = spawn_points(n_players + 1, field_type.bounds(),
+                                    self._rng.getrandbits(64))
 
         self._humans = {}
         self._zombies = {}
@@ -226,21 +358,27 @@ class ZombieTag(Game):
         self._duration = duration
 
         zombie = Player('first zombie', max_vision, max_speed, self, 'purple',
-                        location_lst[n_players])
+                        location_lst[n_players], self._player_rng())
         self._zombies['first zombie'] = zombie
-        self.field.insert('first zombie', location_lst[n_players])
+        self._teams = {'humans': {}, 'zombies': {'first zombie': None}}
+        zombie.share_targets(self._teams['humans'])
 
         for player in range(len(player_list)):
             player_name = str(player_list[player])
-            create_player = Player(player_name, random.randint(0, max_vision),
-                                   random.randint(0, max_speed), self, 'green',
-                                   location_lst[player])
+            create_player = Player(player_name,
+                                   self._rng.randint(0, max_vision),
+                                   self._rng.randint(0, max_speed), self,
+                                   'green', location_lst[player],
+                                   self._player_rng())
 
-            create_player.select_enemy('first zombie')
-            zombie.select_target(player_name)
+            create_player.share_enemies(self._teams['zombies'])
+            self._teams['humans'][player_name] = None
 
             self._humans[player_name] = create_player
-            self.field.insert(player_name, location_lst[player])
+
+        self.field.insert_many([('first zombie', location_lst[n_players])] +
+                               [(str(player), location_lst[player])
+                                for player in player_list])
 
     def handle_collision(self, player1: str, player2: str) -> None:
         """ Perform some action when <player1> and <player2> collide
@@ -262,30 +400,62 @@ class ZombieTag(Game):
         elif player1 in self._zombies and player2 in self._humans:
             self._zombies[player1].reverse_direction()
             self._humans[player2].reverse_direction()
-            self._zombies[player2] = self._humans[player2]
-            self._zombies[player2].set_speed(1)
-            self._humans[player2].ignore_enemy(player1)
-            self._humans.pop(player2)
-            self._zombies[player1].ignore_target(player2)
-            for target in self._zombies[player1].get_targets():
-                self._zombies[player2].select_target(target)
-            self._zombies[player2].set_colour('purple')
+            self._convert(player2)
 
         elif player2 in self._zombies and player1 in self._humans:
             self._humans[player1].reverse_direction()
             self._zombies[player2].reverse_direction()
-            self._zombies[player1] = self._humans[player1]
-            self._zombies[player1].set_speed(1)
-            self._humans[player1].ignore_enemy(player2)
-            self._humans.pop(player1)
-            self._zombies[player2].ignore_target(player1)
-            for target in self._zombies[player2].get_targets():
-                self._zombies[player1].select_target(target)
-            self._zombies[player1].set_colour('purple')
+            self._convert(player1)
         else:
             self._zombies[player1].reverse_direction()
             self._zombies[player2].reverse_direction()
 
+    def _convert(self, name: str) -> None:
+        """ Turn the human named <name> into a zombie
+
+        >>> game = ZombieTag(2, QuadTree((250, 250)), 10, 2, 2)
+        >>> game._convert('0')
+        >>> list(game.get_team('zombies'))
+        ['first zombie', '0']
+        >>> game._zombies['first zombie'].get_targets()
+        ['1']
+        >>> game._zombies['0'].get_targets()
+        ['1']
+        """
+        zombie = self._humans.pop(name)
+        self._zombies[name] = zombie
+        self._change_team(name, 'humans', 'zombies')
+        zombie.set_speed(1)
+        zombie.share_enemies({})
+        zombie.share_targets(self._teams['humans'])
+        zombie.set_colour('purple')
+
+    def get_players(self) -> Dict[str, Player]:
+        """ Return a dictionary mapping the names of all players still in the
+        game to their Player instances
+
+        >>> game = ZombieTag(2, QuadTree((250, 250)), 10, 2, 2)
+        >>> sorted(game.get_players())
+        ['0', '1', 'first zombie']
+        """
+        players = self._humans.copy()
+        players.update(self._zombies)
+        return players
+
+    def end_of_tick(self, tick: int) -> Optional[str]:
+        """ Return the winner once _duration ticks have passed, or as soon as
+        every human has been converted
+
+        >>> game = ZombieTag(2, QuadTree((250, 250)), 10, 2, 2)
+        >>> game.end_of_tick(9) is None
+        True
+        >>> game.end_of_tick(10)
+        'humans'
+        """
+        if tick >= self._duration or len(self._humans) == 0:
+            return self.check_for_winner()
+        return None
+
     def check_for_winner(self) -> Optional[str]:
         """ Return the name of the player or group of players that have
         won the game, or None if no player has won yet
@@ -310,45 +480,58 @@ class EliminationTag(Game):
 
     === Public Attribute ===
     field: a tree that stores the location of all players in _players which can
-    be either QuadTree or TwoDTree
+    be a QuadTree, a CompactQuadTree, a TwoDTree, a FlatTwoDTree, a GridTree or
+    a LinearQuadTree
 
     === Private Attribute ===
     _players: a dictionary (key-value pair) mapping the names of players to
     their Player instances,i.e, the key is names of players and value is their
     Player instance
 
+    _next: maps the name of each player in _players to the name of its target,
+    so that following _next from any player goes around all of them once
+    _prev: maps the name of each player in _players to the name of the player
+    that targets it, i.e. the reverse of _next
+
     === Representation Invariants ===
     - In this game, every player has exactly one other player they are trying to
     tag. Once a player tags their target, their target is eliminated and they
     now try to tag their target’s target.
+    - _next[_prev[name]] == name for every name in _players
+    - the target of every player in _players is its name in _next, unless it
+    is the only player left
     """
     _players: Dict[str, Player]
-    field: Union[QuadTree, TwoDTree]
-
-    def __init__(self, n_players: int, field_type: Union[QuadTree, TwoDTree],
-                 max_speed: int, max_vision: int) -> None:
+    field: Union[QuadTree, CompactQuadTree, TwoDTree, FlatTwoDTree, GridTree,
+                 LinearQuadTree]
+    _next: Dict[str, str]
+    _prev: Dict[str, str]
+
+    def __init__(self, n_players: int,
+                 field_type: Union[QuadTree, CompactQuadTree, TwoDTree,
+                                   FlatTwoDTree, GridTree, LinearQuadTree],
+                 max_speed: int, max_vision: int,
+                 rng: Optional[random.Random] = None) -> None:
         """Initialize a new game EliminationTag containing n_players,
-        field_type, duration, max_speed and max_vision.
+        field_type, duration, max_speed and max_vision, which makes its random
+        choices with <rng>.
 
         >>> game = EliminationTag(3, QuadTree((100, 100)), 10, 2, 2)
         """
-
+        self._set_rng(rng)
         player_list = list(range(n_players))
-        p = 0
-        location_lst = []
-        while p < n_players:
-            loc = (random.randint(0, 500), random.randint(0, 500))
-            if loc not in location_lst:
-                location_lst.append(loc)
-                p += 1
+        location_lst = spawn_points(n_players, field_type.bounds(),
+                                    self._rng.getrandbits(64))
 
         self._players = {}
+        self._teams = {}
         self.field = field_type
         for p in range(len(player_list)):
             create_player = Player(str(player_list[p]),
-                                   random.randint(0, max_vision),
-                                   random.randint(1, max_speed), self, 'random',
-                                   location_lst[p])
+                                   self._rng.randint(0, max_vision),
+                                   self._rng.randint(1, max_speed), self,
+                                   'random', location_lst[p],
+                                   self._player_rng())
             if p == len(player_list) - 1:
                 create_player.select_target(str(player_list[0]))
             else:
@@ -361,7 +544,12 @@ class EliminationTag(Game):
                 create_player.select_enemy(str(player_list[p - 1]))
 
             self._players[str(player_list[p])] = create_player
-            self.field.insert(str(player_list[p]), location_lst[p])
+
+        names = list(self._players)
+        self._next = dict(zip(names, names[1:] + names[:1]))
+        self._prev = dict(zip(names, names[-1:] + names[:-1]))
+        self.field.insert_many([(str(player_list[p]), location_lst[p])
+                                for p in range(len(player_list))])
 
     def handle_collision(self, player1: str, player2: str) -> None:
         """ Perform some action when <player1> and <player2> collide
@@ -377,28 +565,54 @@ class EliminationTag(Game):
         >>> game._players[player[2]]._direction == d_lst[d_lst.index(d_2) + 1]
         True
         """
-        if player1 in self._players[player2].get_targets():
-            self._players[player2].ignore_target(player1)
-            for targets in self._players[player1].get_targets():
-                self._players[targets].ignore_enemy(player1)
-                self._players[targets].select_enemy(player2)
-                self._players[player2].select_target(targets)
-            self._players.pop(player1)
-            self.field.remove(player1)
-            self._players[player2].increase_points(1)
-        elif player2 in self._players[player1].get_targets():
-            self._players[player1].ignore_target(player2)
-            for targets in self._players[player2].get_targets():
-                self._players[targets].ignore_enemy(player2)
-                self._players[targets].select_enemy(player1)
-                self._players[player1].select_target(targets)
-            self._players.pop(player2)
-            self.field.remove(player2)
-            self._players[player1].increase_points(1)
+        if self._next[player2] == player1:
+            self._eliminate(player2, player1)
+        elif self._next[player1] == player2:
+            self._eliminate(player1, player2)
         else:
             self._players[player1].reverse_direction()
             self._players[player2].reverse_direction()
 
+    def _eliminate(self, hunter: str, prey: str) -> None:
+        """ Remove <prey>, the target of <hunter>, from the game, give a point
+        to <hunter> and make it target the target of <prey>
+
+        >>> game = EliminationTag(4, QuadTree((250, 250)), 2, 2)
+        >>> game._eliminate('0', '1')
+        >>> game._players['0'].get_targets()
+        ['2']
+        >>> game._players['2'].get_enemies()
+        ['0']
+        >>> game._next
+        {'0': '2', '2': '3', '3': '0'}
+        >>> game.check_for_winner()
+        '0'
+        """
+        after = self._next.pop(prey)
+        self._prev.pop(prey)
+        self._next[hunter] = after
+        self._prev[after] = hunter
+
+        self._players[hunter].ignore_target(prey)
+        self._players[after].ignore_enemy(prey)
+        if after != hunter:
+            self._players[hunter].select_target(after)
+            self._players[after].select_enemy(hunter)
+
+        self._players.pop(prey)
+        self.field.remove(prey)
+        self._players[hunter].increase_points(1)
+
+    def get_players(self) -> Dict[str, Player]:
+        """ Return a dictionary mapping the names of all players still in the
+        game to their Player instances
+
+        >>> game = EliminationTag(3, QuadTree((250, 250)), 2, 2)
+        >>> sorted(game.get_players())
+        ['0', '1', '2']
+        """
+        return self._players.copy()
+
     def check_for_winner(self) -> Optional[str]:
         """ Return the name of the player or group of players that have
         won the game, or None if no player has won yet
@@ -426,6 +640,6 @@ class EliminationTag(Game):
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={'extra-imports': ['random', 'typing', 'players',
-                                                  'trees'],
+                                                  'trees', 'spawn'],
                                 'disable': ['R0913', 'R0902', 'W0611', 'R1710',
                                             'R1702']})
@@ -11,7 +11,9 @@ This file contains classes that describe players that play in one of the games.
 
 from __future__ import annotations
 import random
-from typing import List, Tuple, Optional, Set
+from itertools import accumulate
+from operator import add
+from typing import List, Tuple, Optional, Set, Dict, Iterable, KeysView
 from trees import OutOfBoundsError
 
 
@@ -28,9 +30,13 @@ class Player:
     _speed: the number of steps a player can move in a single turn
     _game: a reference to an instance of a Game class
     _points: the number of points the player has
-    _targets: a list of player names that this player should move towards
-    _enemies: a list of player names that this player should avoid
+    _targets: the names of the players that this player should move towards,
+    kept as the keys of a dict so that they stay in the order they were added.
+    The dict may be a team shared with other players, see share_targets
+    _enemies: the names of the players that this player should avoid, kept the
+    same way as _targets
     _direction: a string indicating the direction the player is currently moving
+    _rng: the random number generator this player makes all its choices with
 
     === Representation Invariants ===
     - The _location of a player must fall within the boundaries set by the
@@ -50,16 +56,26 @@ class Player:
     _speed: int
     _game: 'Game'
     _points: int
-    _targets: List[str]
-    _enemies: List[str]
+    _targets: Dict[str, None]
+    _enemies: Dict[str, None]
     _direction: str
+    _rng: random.Random
 
     def __init__(self, name: str, vision: int, speed: int, game: 'Game',
-                 colour: str, location: Tuple[int, int]) -> None:
+                 colour: str, location: Tuple[int, int],
+                 rng: Optional[random.Random] = None) -> None:
         """Initialize a new Player containing name, vision, speed, game, colour
-        and location.
+        and location, which makes its random choices with <rng>. If <rng> is
+        None, the player gets a generator of its own seeded from the random
+        module.
 
         >>> player = Player('4', 1, 1, 'Game', 'green', (67,89))
+        >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89),
+        ...                  random.Random(148))
+        >>> player2 = Player('4', 1, 1, 'Game', 'green', (67,89),
+        ...                  random.Random(148))
+        >>> player1._direction == player2._direction
+        True
         """
         self._name = name
         self._location = location
@@ -68,9 +84,12 @@ class Player:
         self._speed = speed
         self._game = game
         self._points = 0
-        self._targets = []
-        self._enemies = []
-        self._direction = random.choice(['N', 'S', 'E', 'W'])
+        self._targets = {}
+        self._enemies = {}
+        if rng is None:
+            rng = random.Random(random.getrandbits(64))
+        self._rng = rng
+        self._direction = rng.choice(['N', 'S', 'E', 'W'])
 
     def set_colour(self, colour: str) -> None:
         """ Change the colour of self
@@ -114,11 +133,11 @@ class Player:
         >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
         >>> player2 = Player('5', 1, 1, 'Game', 'green', (47,29))
         >>> player1.select_target(player2._name)
-        >>> player1._targets
+        >>> player1.get_targets()
         ['5']
         """
         if name not in self._targets and name not in self._enemies:
-            self._targets.append(name)
+            self._targets[name] = None
 
     def ignore_target(self, name: str) -> None:
         """ Remove a target from <self>'s target list
@@ -126,17 +145,17 @@ class Player:
         >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
         >>> player2 = Player('5', 1, 1, 'Game', 'green', (47,29))
         >>> player1.select_target(player2._name)
-        >>> player1._targets
+        >>> player1.get_targets()
         ['5']
         >>> player1.ignore_target(player2._name)
-        >>> player1._targets
+        >>> player1.get_targets()
         []
         """
-        if name in self._targets:
-            self._targets.remove(name)
+        self._targets.pop(name, None)
 
     def get_targets(self) -> List[str]:
-        """ Return a copy of the list of target names
+        """ Return a new list of the target names, in the order they were
+        selected
 
         >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
         >>> player2 = Player('5', 1, 1, 'Game', 'green', (47,29))
@@ -144,7 +163,22 @@ class Player:
         >>> player1.get_targets()
         ['5']
         """
-        return self._targets.copy()
+        return list(self._targets)
+
+    def get_targets_view(self) -> KeysView[str]:
+        """ Return a read-only view of the target names, in the order they were
+        selected. The view reflects later changes to the targets, so it must not
+        be iterated over while they change.
+
+        >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
+        >>> targets = player1.get_targets_view()
+        >>> player1.select_target('5')
+        >>> '5' in targets
+        True
+        >>> list(targets)
+        ['5']
+        """
+        return self._targets.keys()
 
     def select_enemy(self, name: str) -> None:
         """ Add an enemy to <self>'s target list
@@ -152,11 +186,11 @@ class Player:
         >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
         >>> player2 = Player('5', 1, 1, 'Game', 'green', (47,29))
         >>> player1.select_enemy(player2._name)
-        >>> player1._enemies
+        >>> player1.get_enemies()
         ['5']
         """
         if name not in self._targets and name not in self._enemies:
-            self._enemies.append(name)
+            self._enemies[name] = None
 
     def ignore_enemy(self, name: str) -> None:
         """ Remove an enemy from <self>'s enemy list
@@ -164,17 +198,17 @@ class Player:
         >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
         >>> player2 = Player('5', 1, 1, 'Game', 'green', (47,29))
         >>> player1.select_enemy(player2._name)
-        >>> player1._enemies
+        >>> player1.get_enemies()
         ['5']
         >>> player1.ignore_enemy(player2._name)
-        >>> player1._enemies
+        >>> player1.get_enemies()
         []
         """
-        if name in self._enemies:
-            self._enemies.remove(name)
+        self._enemies.pop(name, None)
 
     def get_enemies(self) -> List[str]:
-        """ Return a copy of the list of enemy names
+        """ Return a new list of the enemy names, in the order they were
+        selected
 
         >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
         >>> player2 = Player('5', 1, 1, 'Game', 'green', (47,29))
@@ -182,7 +216,48 @@ class Player:
         >>> player1.get_enemies()
         ['5']
         """
-        return self._enemies.copy()
+        return list(self._enemies)
+
+    def get_enemies_view(self) -> KeysView[str]:
+        """ Return a read-only view of the enemy names, in the order they were
+        selected. The view reflects later changes to the enemies, so it must not
+        be iterated over while they change.
+
+        >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
+        >>> enemies = player1.get_enemies_view()
+        >>> player1.select_enemy('5')
+        >>> list(enemies)
+        ['5']
+        """
+        return self._enemies.keys()
+
+    def share_targets(self, team: Dict[str, None]) -> None:
+        """ Make the players in <team> the targets of <self>, in place of its
+        current targets. <team> is shared, not copied: players added to or
+        removed from it are targets of <self> from then on, and selecting or
+        ignoring a target of <self> changes <team>.
+
+        >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
+        >>> humans = {'5': None}
+        >>> player1.share_targets(humans)
+        >>> humans['6'] = None
+        >>> player1.get_targets()
+        ['5', '6']
+        """
+        self._targets = team
+
+    def share_enemies(self, team: Dict[str, None]) -> None:
+        """ Make the players in <team> the enemies of <self>, in place of its
+        current enemies. <team> is shared the same way as in share_targets.
+
+        >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
+        >>> zombies = {'5': None}
+        >>> player1.share_enemies(zombies)
+        >>> zombies.pop('5')
+        >>> player1.get_enemies()
+        []
+        """
+        self._enemies = team
 
     def reverse_direction(self) -> None:
         """ Update the direction so that <self> will move in the opposite
@@ -233,23 +308,42 @@ class Player:
         True
         """
         d_lst = ['NW', 'NE', 'SE', 'SW']
-        random.shuffle(d_lst)
+        self._rng.shuffle(d_lst)
         direction_lst = d_lst[:2]
-        d_to_player_dict = {'N': 0, 'S': 0, 'E': 0, 'W': 0}
+        targets = {}
+        enemies = {}
         for direction in direction_lst:
-            d_1 = direction[0]
-            d_2 = direction[1]
+            targets[direction] = 0
+            enemies[direction] = 0
             player_lst = self._game.field.names_in_range(self._location,
                                                          direction, self._vision
                                                          )
 
             for player in player_lst:
                 if player in self._targets:
-                    d_to_player_dict[d_1] += 1
-                    d_to_player_dict[d_2] += 1
+                    targets[direction] += 1
                 elif player in self._enemies:
-                    d_to_player_dict[_reverse(d_1)] += 1
-                    d_to_player_dict[_reverse(d_2)] += 1
+                    enemies[direction] += 1
+        return self._choose_direction(direction_lst, targets, enemies)
+
+    def _choose_direction(self, direction_lst: List[str],
+                          targets: Dict[str, int],
+                          enemies: Dict[str, int]) -> Set[str]:
+        """
+        Helper method for next_direction and next_directions.
+        Set self._direction to one of the best directions given the number of
+        <targets> and <enemies> seen in each of the quadrants of
+        <direction_lst>, chosen at random, and return all of the best
+        directions.
+        """
+        d_to_player_dict = {'N': 0, 'S': 0, 'E': 0, 'W': 0}
+        for direction in direction_lst:
+            d_1 = direction[0]
+            d_2 = direction[1]
+            d_to_player_dict[d_1] += targets[direction]
+            d_to_player_dict[d_2] += targets[direction]
+            d_to_player_dict[_reverse(d_1)] += enemies[direction]
+            d_to_player_dict[_reverse(d_2)] += enemies[direction]
 
         max_val = 0
         max_lst = []
@@ -260,9 +354,31 @@ class Player:
                 max_lst = [direction]
             elif val == max_val:
                 max_lst.append(direction)
-        self._direction = random.choice(max_lst)
+        self._direction = self._rng.choice(max_lst)
         return set(max_lst)
 
+    def get_move(self) -> Tuple[str, str, int]:
+        """ Return the name of <self>, the direction it is moving in and the
+        number of steps it moves in a single turn, as expected by
+        Tree.move_many
+
+        >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
+        >>> player1._direction = 'N'
+        >>> player1.get_move()
+        ('4', 'N', 1)
+        """
+        return self._name, self._direction, self._speed
+
+    def set_location(self, location: Tuple[int, int]) -> None:
+        """ Update the location of <self> after it was moved on the field
+
+        >>> player1 = Player('4', 1, 1, 'Game', 'green', (67,89))
+        >>> player1.set_location((67, 88))
+        >>> player1._location
+        (67, 88)
+        """
+        self._location = location
+
     def move(self) -> None:
         """ Move <self> in the direction described by self._direction by the
         number of steps described by self._speed. Make sure to keep track of the
@@ -288,6 +404,146 @@ class Player:
             self.reverse_direction()
 
 
+def next_directions(players: List[Player]) -> List[Set[str]]:
+    """ Update the direction of every player in <players>, as if next_direction
+    was called on each of them in order, and return the set of all equally good
+    directions for each of them.
+
+    Instead of querying the field twice per player, the targets and enemies
+    visible in every quadrant are counted for all players at once: the players
+    sharing the same targets (or enemies) count them with a single table of
+    prefix sums over the area those targets cover, or by checking each of them
+    directly when there are few. Players share their targets when they
+    reference the same team, see share_targets. Every player makes the same
+    random choices with its generator as in next_direction, so both give the
+    same directions from the same state of the generators.
+
+    <players> must be all the players on the field, at their current location.
+
+    >>> player1 = Player('1', 10, 1, 'Game', 'green', (50, 50))
+    >>> player2 = Player('2', 10, 1, 'Game', 'green', (55, 45))
+    >>> sorted(next_directions([player1, player2])[0])
+    ['E', 'N', 'S', 'W']
+    >>> player1._direction in {'N', 'S', 'E', 'W'}
+    True
+    """
+    locations = {player._name: player._location for player in players}
+    targets = _count_visible(players, [player._targets for player in players],
+                             locations)
+    enemies = _count_visible(players, [player._enemies for player in players],
+                             locations)
+    directions = []
+    for i, player in enumerate(players):
+        d_lst = ['NW', 'NE', 'SE', 'SW']
+        player._rng.shuffle(d_lst)
+        directions.append(player._choose_direction(d_lst[:2], targets[i],
+                                                   enemies[i]))
+    return directions
+
+
+def _count_visible(players: List[Player], groups: List[Iterable[str]],
+                   locations: Dict[str, Tuple[int, int]]) -> \
+        List[Dict[str, int]]:
+    """ Return, for every player in <players>, the number of players named in
+    its group in <groups> that it can see in each quadrant, keyed by 'NW',
+    'NE', 'SE' and 'SW'. <locations> maps every player on the field to its
+    location.
+    """
+    counts = [{'NW': 0, 'NE': 0, 'SE': 0, 'SW': 0} for _ in players]
+    users = {}
+    for i, group in enumerate(groups):
+        if group:
+            users.setdefault(id(group), (group, []))[1].append(i)
+
+    for group, user_lst in users.values():
+        points = [locations[name] for name in group if name in locations]
+        if not points:
+            continue
+        x_min = min(x for x, _ in points)
+        x_max = max(x for x, _ in points)
+        y_min = min(y for _, y in points)
+        y_max = max(y for _, y in points)
+        area = (x_max - x_min + 1) * (y_max - y_min + 1)
+        if len(points) * len(user_lst) <= area + len(user_lst):
+            for i in user_lst:
+                _count_directly(players[i], points, counts[i])
+        else:
+            table = _prefix_sums(points, x_min, y_min, x_max, y_max)
+            for i in user_lst:
+                x, y = players[i]._location
+                vision = players[i]._vision
+                count = counts[i]
+                for direction in count:
+                    x_range, y_range = _xy_range(x, y, direction, vision)
+                    count[direction] = _table_count(
+                        table, max(x_range[0], x_min) - x_min,
+                        max(y_range[0], y_min) - y_min,
+                        min(x_range[1], x_max) - x_min,
+                        min(y_range[1], y_max) - y_min)
+    return counts
+
+
+def _count_directly(player: Player, points: List[Tuple[int, int]],
+                    count: Dict[str, int]) -> None:
+    """ Add to <count> the number of <points> that <player> can see in each
+    quadrant.
+    """
+    x, y = player._location
+    vision = player._vision
+    for point_x, point_y in points:
+        dx = point_x - x
+        dy = point_y - y
+        if -vision <= dx <= vision and -vision <= dy <= vision:
+            if dy <= 0:
+                if dx <= 0:
+                    count['NW'] += 1
+                if dx >= 0:
+                    count['NE'] += 1
+            if dy >= 0:
+                if dx <= 0:
+                    count['SW'] += 1
+                if dx >= 0:
+                    count['SE'] += 1
+
+
+def _xy_range(x: int, y: int, direction: str, vision: int) -> \
+        Tuple[Tuple[int, int], Tuple[int, int]]:
+    """ Return the ranges of x and y coordinates, lowest first, that a player
+    at (<x>, <y>) with <vision> sees in <direction>.
+    """
+    x_range = (x - vision, x) if direction[1] == 'W' else (x, x + vision)
+    y_range = (y - vision, y) if direction[0] == 'N' else (y, y + vision)
+    return x_range, y_range
+
+
+def _prefix_sums(points: List[Tuple[int, int]], x_min: int, y_min: int,
+                 x_max: int, y_max: int) -> List[List[int]]:
+    """ Return a table where the value at [row][column] is the number of
+    <points> with x < x_min + column and y < y_min + row. Every point must be
+    inside the rectangle from (<x_min>, <y_min>) to (<x_max>, <y_max>).
+    """
+    width = x_max - x_min + 1
+    grid = [[0] * width for _ in range(y_max - y_min + 1)]
+    for x, y in points:
+        grid[y - y_min][x - x_min] += 1
+    table = [[0] * (width + 1)]
+    for row in grid:
+        above = table[-1]
+        table.append([0] + list(map(add, above[1:], accumulate(row))))
+    return table
+
+
+def _table_count(table: List[List[int]], x0: int, y0: int, x1: int,
+                 y1: int) -> int:
+    """ Return the number of points counted in <table> inside the rectangle
+    from column <x0> and row <y0> to column <x1> and row <y1>, included.
+    """
+    if x0 > x1 or y0 > y1:
+        return 0
+    return table[y1 + 1][x1 + 1] - table[y0][x1 + 1] - table[y1 + 1][x0] + \
+        table[y0][x0]
+
+
 def _reverse(direction: str)-> Optional[str]:
     """ Return a string of opposite direction to < direction >.
 
@@ -311,5 +567,6 @@ def _reverse(direction: str)-> Optional[str]:
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(
-        config={'extra-imports': ['typing', 'random', 'games', 'trees'],
+        config={'extra-imports': ['typing', 'random', 'games', 'trees',
+                                  'itertools', 'operator'],
                 'disable': ['R0913', 'R0902', 'W0611', 'R1710', 'R1702']})
@@ -0,0 +1,135 @@
+"""CSC148 Assignment 2 - Simulation File
+
+=== CSC148 Summer 2019 ===
+Department of Computer Science,
+University of Toronto
+
+=== Module Description ===
+
+This file contains the Simulation class, which runs any of the games in
+<games.py> tick by tick until a winner is found.
+"""
+
+from __future__ import annotations
+import time
+from typing import Optional, NamedTuple
+from games import Game
+from players import next_directions
+
+
+class RunReport(NamedTuple):
+    """The outcome of a call to Simulation.run.
+
+    === Public Attributes ===
+    winner: the name of the player or group of players that won the game, or
+    None if no player had won when the run stopped
+    ticks: the number of ticks that were run
+    seconds: the wall clock time the run took, in seconds
+    ticks_per_second: the number of ticks run per second
+    """
+    winner: Optional[str]
+    ticks: int
+    seconds: float
+    ticks_per_second: float
+
+
+class Simulation:
+    """A Simulation driving a Game.
+
+    Every tick, all players choose their next direction, every player is moved
+    with a single batched call on the field, the collisions on the field are
+    handled by the game, and the game applies its rules that depend on time.
+
+    === Private Attributes ===
+    _game: the game being simulated
+    _tick: the number of ticks run so far
+    _collision_radius: the distance at or below which two players collide
+
+    === Representation Invariants ===
+    - _tick >= 0
+    - _collision_radius >= 1
+    """
+    _game: Game
+    _tick: int
+    _collision_radius: int
+
+    def __init__(self, game: Game, collision_radius: int = 1) -> None:
+        """Initialize a new Simulation of <game> where players collide when
+        they are within <collision_radius> steps of each other.
+
+        >>> from games import Tag
+        >>> from trees import QuadTree
+        >>> simulation = Simulation(Tag(5, QuadTree((250, 250)), 10, 2, 2))
+        """
+        self._game = game
+        self._tick = 0
+        self._collision_radius = collision_radius
+
+    def get_tick(self) -> int:
+        """ Return the number of ticks run so far
+
+        >>> from games import Tag
+        >>> from trees import QuadTree
+        >>> simulation = Simulation(Tag(5, QuadTree((250, 250)), 10, 2, 2))
+        >>> simulation.get_tick()
+        0
+        """
+        return self._tick
+
+    def step(self) -> Optional[str]:
+        """ Run a single tick of the game, and return the name of the player
+        or group of players that have won the game, or None if no player has
+        won yet
+
+        >>> from games import Tag
+        >>> from trees import QuadTree
+        >>> simulation = Simulation(Tag(1, QuadTree((250, 250)), 2, 2, 2))
+        >>> simulation.step() is None
+        True
+        >>> simulation.step()
+        '0'
+        """
+        self._tick += 1
+        players = self._game.get_players()
+        next_directions(list(players.values()))
+
+        locations, rejected = self._game.field.move_many(
+            [player.get_move() for player in players.values()])
+        for name in locations:
+            players[name].set_location(locations[name])
+        for name, _, _ in rejected:
+            players[name].reverse_direction()
+
+        self._game.resolve_collisions(self._collision_radius)
+        return self._game.end_of_tick(self._tick)
+
+    def run(self, max_ticks: int) -> RunReport:
+        """ Run ticks until a winner is found or <max_ticks> ticks have been
+        run, and return a report of the run
+
+        >>> from games import ZombieTag
+        >>> from trees import TwoDTree
+        >>> game = ZombieTag(5, TwoDTree((0, 0), (500, 500)), 10, 2, 2)
+        >>> report = Simulation(game).run(100)
+        >>> report.ticks
+        10
+        >>> report.winner in ['humans', 'zombies']
+        True
+        """
+        winner = None
+        ticks = 0
+        start = time.perf_counter()
+        while winner is None and ticks < max_ticks:
+            winner = self.step()
+            ticks += 1
+        seconds = time.perf_counter() - start
+        return RunReport(winner, ticks, seconds,
+                         ticks / seconds if seconds > 0 else 0.0)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={'extra-imports': ['time', 'typing', 'games',
+                                                  'players'],
+                                'disable': ['R0913', 'R0902', 'W0611', 'R1710',
+                                            'R1702']})
@@ -0,0 +1,63 @@
+"""CSC148 Assignment 2 - Spawn File
+
+=== CSC148 Summer 2019 ===
+Department of Computer Science,
+University of Toronto
+
+=== Module Description ===
+
+This file contains the functions that pick the starting locations of the
+players of the games in <games.py>.
+"""
+
+from __future__ import annotations
+import random
+from typing import List, Optional, Tuple
+
+
+def spawn_points(n: int, bounds: Tuple[int, int, int, int],
+                 seed: Optional[int] = None) -> List[Tuple[int, int]]:
+    """ Return <n> different points chosen at random inside <bounds>, a
+    rectangle given as (west, north, east, south) with its edges included,
+    such as the bounds of a Tree.
+
+    The points are drawn from the module's random generator, or from a
+    generator of their own if <seed> is not None, so that the same <seed>
+    always gives the same points.
+
+    Raise a ValueError if <n> is negative or if there are fewer than <n> points
+    inside <bounds>.
+
+    Runtime: O(n)
+
+    >>> points = spawn_points(4, (0, 0, 1, 1), 148)
+    >>> sorted(points)
+    [(0, 0), (0, 1), (1, 0), (1, 1)]
+    >>> spawn_points(3, (10, 10, 500, 500), 7) == \
+    spawn_points(3, (10, 10, 500, 500), 7)
+    True
+    >>> spawn_points(5, (0, 0, 1, 1))
+    Traceback (most recent call last):
+    ...
+    ValueError: cannot place 5 players on a field of 4 points
+    """
+    west, north, east, south = bounds
+    width = east - west + 1
+    cells = max(0, width) * max(0, south - north + 1)
+    if n < 0 or n > cells:
+        raise ValueError('cannot place {} players on a field of {} points'
+                         .format(n, cells))
+
+    rng = random if seed is None else random.Random(seed)
+    # sample draws from a set of the cells picked so far when they are few
+    # compared to the field, and from a partial shuffle of all of them
+    # otherwise, so both sparse and crowded fields take O(n)
+    return [(west + cell % width, north + cell // width)
+            for cell in rng.sample(range(cells), n)]
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={'extra-imports': ['random', 'typing'],
+                                'disable': ['R0913', 'R0902', 'W0611', 'R1710',
+                                            'R1702']})
@@ -1,8 +1,12 @@
 import pytest
+import random
 from typing import Tuple, List
 import trees
 import players
 import games
+import simulation
+import spawn
+import batch
 
 
 ##### TREES #####
@@ -33,6 +37,35 @@ class TreesTest:
             return
         raise Exception('this should have raised an OutOfBoundsError')
 
+    def test_insert_many(self):
+        self.tree.insert_many([('jon', (250, 250)), ('joe', (300, 300))])
+        assert 'jon' in self.tree and 'joe' in self.tree
+        self.tree.insert_many([('job', (50, 50))])
+        assert self.tree.contains_point((50, 50))
+        assert set(self.tree.names_in_range((0, 0), 'SE', 500)) == {
+            'jon', 'joe', 'job'}
+
+    def test_insert_many_same_name_twice(self):
+        self.tree.insert_many([('jon', (250, 250)), ('joe', (300, 300)),
+                               ('jon', (100, 100))])
+        assert set(self.tree.query_rect(0, 0, 500, 500)) == {
+            ('jon', (100, 100)), ('joe', (300, 300))}
+        self.tree.remove('jon')
+        assert not self.tree.contains_point((250, 250))
+        assert list(self.tree.query_rect(0, 0, 500, 500)) == [
+            ('joe', (300, 300))]
+
+    def test_insert_many_repeated_pair(self):
+        self.tree.insert_many([('jon', (250, 250)), ('jon', (250, 250))])
+        assert list(self.tree.query_rect(0, 0, 500, 500)) == [
+            ('jon', (250, 250))]
+
+    def test_insert_many_legal_final_placement(self):
+        self.tree.insert_many([('jon', (100, 100)), ('joe', (200, 200)),
+                               ('joe', (300, 300)), ('jon', (200, 200))])
+        assert set(self.tree.query_rect(0, 0, 500, 500)) == {
+            ('jon', (200, 200)), ('joe', (300, 300))}
+
     def test_remove(self):
         self.tree.insert('jon', (250, 250))
         self.tree.remove('buddy')
@@ -91,6 +124,41 @@ class TreesTest:
             return
         raise Exception('this should have raised an OutOfBoundsError')
 
+    def test_move_zero_steps(self):
+        self.tree.insert_many([('jon', (250, 250)), ('joe', (300, 300))])
+        for move in [lambda: self.tree.move('jon', 'N', 0),
+                     lambda: self.tree.move_point((300, 300), 'E', 0)]:
+            try:
+                move()
+            except trees.OutOfBoundsError:
+                continue
+            raise Exception('this should have raised an OutOfBoundsError')
+        assert self.tree.move_many([('jon', 'S', 0)]) == ({}, [('jon', 'S', 0)])
+        assert set(self.tree.query_rect(0, 0, 500, 500)) == {
+            ('jon', (250, 250)), ('joe', (300, 300))}
+
+    def test_move_many(self):
+        self.tree.insert('jon', (250, 250))
+        self.tree.insert('joe', (250, 240))
+        locations, rejected = self.tree.move_many([('joe', 'N', 10),
+                                                   ('jon', 'N', 10),
+                                                   ('buddy', 'N', 10)])
+        assert locations == {'joe': (250, 230), 'jon': (250, 240)}
+        assert rejected == []
+        assert self.tree.contains_point((250, 230))
+        assert self.tree.contains_point((250, 240))
+        assert not self.tree.contains_point((250, 250))
+
+    def test_move_many_rejected(self):
+        self.tree.insert('jon', (250, 250))
+        self.tree.insert('joe', (250, 240))
+        locations, rejected = self.tree.move_many([('jon', 'N', 10),
+                                                   ('joe', 'E', 251),
+                                                   ('joe', 'N', 10)])
+        assert locations == {'joe': (250, 230)}
+        assert rejected == [('jon', 'N', 10), ('joe', 'E', 251)]
+        assert self.tree.contains_point((250, 250))
+
     def test_names_in_range(self):
         self.tree.insert('jon', (250, 250))
         self.tree.insert('joe', (300, 300))
@@ -104,6 +172,53 @@ class TreesTest:
         assert set(self.tree.names_in_range((350, 350), 'NW', 90)) == {'joe'}
         assert len(self.tree.names_in_range((350, 350), 'NW', 10)) == 0
 
+    def test_query_rect(self):
+        self.tree.insert('jon', (250, 250))
+        self.tree.insert('joe', (300, 300))
+        self.tree.insert('job', (50, 50))
+        assert set(self.tree.query_rect(0, 0, 250, 250)) == {
+            ('jon', (250, 250)), ('job', (50, 50))}
+        assert set(self.tree.query_rect(200, 200, 400, 400)) == {
+            ('jon', (250, 250)), ('joe', (300, 300))}
+        assert list(self.tree.query_rect(260, 0, 500, 290)) == []
+
+    def test_query_radius(self):
+        self.tree.insert('jon', (250, 250))
+        self.tree.insert('joe', (300, 300))
+        self.tree.insert('job', (50, 50))
+        assert set(self.tree.query_radius((275, 275), 50)) == {
+            ('jon', (250, 250)), ('joe', (300, 300))}
+        assert list(self.tree.query_radius((275, 275), 49)) == []
+        assert set(self.tree.query_radius((275, 275), 25, 'chebyshev')) == {
+            ('jon', (250, 250)), ('joe', (300, 300))}
+
+    def test_find_collisions(self):
+        assert self.tree.find_collisions(5) == []
+        self.tree.insert_many([('jon', (250, 250)), ('joe', (252, 251)),
+                               ('job', (249, 253)), ('jim', (100, 100))])
+        assert self.tree.find_collisions(0) == []
+        assert self.tree.find_collisions(0, 'chebyshev') == []
+        assert self.tree.find_collisions(3) == [('joe', 'jon')]
+        assert self.tree.find_collisions(4) == [('job', 'jon'), ('joe', 'jon')]
+        assert self.tree.find_collisions(2, 'chebyshev') == [('joe', 'jon')]
+        assert self.tree.find_collisions(3, 'chebyshev') == [
+            ('job', 'joe'), ('job', 'jon'), ('joe', 'jon')]
+
+    def test_nearest(self):
+        self.tree.insert('jon', (250, 250))
+        self.tree.insert('joe', (300, 300))
+        self.tree.insert('job', (50, 50))
+        self.tree.insert('jim', (200, 330))
+        assert self.tree.nearest((260, 260), 2) == [('jon', (250, 250)),
+                                                    ('joe', (300, 300))]
+        assert self.tree.nearest((240, 300), 2) == [('jon', (250, 250)),
+                                                    ('joe', (300, 300))]
+        assert self.tree.nearest((240, 300), 1, metric='chebyshev') == [
+            ('jim', (200, 330))]
+        assert self.tree.nearest((260, 260), 5, filter={'job', 'jim'}) == [
+            ('jim', (200, 330)), ('job', (50, 50))]
+        assert self.tree.nearest((260, 260), 0) == []
+
     def test_is_empty(self):
         assert self.tree.is_empty()
         self.tree.insert('jon', (250, 250))
@@ -142,6 +257,201 @@ class TestQuadTree(TreesTest):
         assert jon.depth(job) is None
         assert self.tree.depth(self.tree) is None
 
+    def test_index(self):
+        self.tree.insert_many([('jon', (250, 250)), ('joe', (300, 300))])
+        self.tree.insert('job', (50, 50))
+        assert self.tree._index == {'jon': (250, 250), 'joe': (300, 300),
+                                    'job': (50, 50)}
+        self.tree.remove('jon')
+        self.tree.remove_point((300, 300))
+        self.tree.move('job', 'S', 10)
+        assert self.tree._index == {'job': (50, 60)}
+        self.tree.move_point((50, 60), 'E', 300)
+        assert self.tree._index == {'job': (350, 60)}
+        assert list(self.tree.query_rect(0, 0, 500, 500)) == [
+            ('job', (350, 60))]
+
+    def test_insert_same_name_twice(self):
+        self.tree.insert('jon', (250, 250))
+        self.tree.insert('jon', (100, 100))
+        self.tree.insert('joe', (300, 300))
+        self.tree.insert('joe', (310, 300))
+        assert self.tree._index == {'jon': (100, 100), 'joe': (310, 300)}
+        assert not self.tree.contains_point((250, 250))
+        assert self.tree.size() == 3
+        self.tree.remove('jon')
+        self.tree.remove('joe')
+        assert self.tree._index == {}
+        assert self.tree.is_empty()
+
+    def test_move_inside_leaf(self):
+        self.tree.insert_many([('jon', (100, 100)), ('joe', (400, 400)),
+                               ('job', (400, 100))])
+        leaf = self.tree._nw
+        assert self.tree.move('jon', 'E', 10) == (110, 100)
+        assert self.tree._nw is leaf and leaf._points == [(110, 100)]
+        assert self.tree._index['jon'] == (110, 100)
+        assert (self.tree.size(), self.tree.height()) == (4, 2)
+        assert set(self.tree.query_rect(0, 0, 250, 250)) == {
+            ('jon', (110, 100))}
+
+    def test_move_restructures_below_common_ancestor(self):
+        self.tree.insert_many([('jon', (100, 100)), ('jim', (150, 150)),
+                               ('joe', (400, 400)), ('job', (400, 100))])
+        nw, se = self.tree._nw, self.tree._se
+        assert self.tree.move('jim', 'W', 40) == (110, 150)
+        assert self.tree._nw is nw and self.tree._se is se
+        assert nw._se is None and nw._sw._names == ['jim']
+        assert self.tree._index['jim'] == (110, 150)
+        assert (self.tree.size(), self.tree.height()) == (6, 3)
+        assert set(self.tree.query_rect(0, 0, 250, 250)) == {
+            ('jon', (100, 100)), ('jim', (110, 150))}
+
+    def test_move_into_occupied_point(self):
+        self.tree.insert_many([('jon', (100, 100)), ('jim', (150, 100)),
+                               ('joe', (400, 400))])
+        index = dict(self.tree._index)
+        try:
+            self.tree.move('jim', 'W', 50)
+        except trees.OutOfBoundsError:
+            assert self.tree._index == index
+            assert (self.tree.size(), self.tree.height()) == (5, 3)
+            assert set(self.tree.query_rect(0, 0, 500, 500)) == set(
+                index.items())
+            return
+        raise Exception('this should have raised an OutOfBoundsError')
+
+    def test_from_points(self):
+        tree = trees.QuadTree.from_points((250, 250), [('jon', (250, 250)),
+                                                       ('joe', (300, 300)),
+                                                       ('job', (50, 50))])
+        assert tree.height() == 3
+        assert tree._nw._se._names == ['jon']
+        assert tree._se._names == ['joe']
+        assert tree._nw._nw._names == ['job']
+        assert all(name in tree for name in ['jon', 'joe', 'job'])
+
+    def test_from_points_collision(self):
+        try:
+            trees.QuadTree.from_points((250, 250), [('jon', (250, 250)),
+                                                    ('joe', (300, 300)),
+                                                    ('job', (250, 250)),
+                                                    ('jim', (501, 0))])
+        except trees.OutOfBoundsError as error:
+            assert error.args[0] == ['jon', 'job', 'jim']
+            return
+        raise Exception('this should have raised an OutOfBoundsError')
+
+
+class TestBucketQuadTree(TreesTest):
+    def setup_method(self):
+        self.tree = trees.QuadTree((250, 250), capacity=4)
+
+    def test_is_leaf(self):
+        for i in range(4):
+            self.tree.insert('p' + str(i), (i * 100, i * 100))
+            assert self.tree.is_leaf()
+        self.tree.insert('p4', (400, 400))
+        assert not self.tree.is_leaf()
+
+    def test_capacity(self):
+        tree = trees.QuadTree((250, 250), capacity=2)
+        tree.insert_many([('jon', (250, 250)), ('joe', (240, 240))])
+        assert tree._names == ['jon', 'joe']
+        assert (tree.size(), tree.height()) == (1, 1)
+        tree.insert('job', (400, 400))
+        assert tree._nw._names == ['jon', 'joe']
+        assert tree._nw._capacity == 2
+        assert (tree.size(), tree.height()) == (3, 2)
+        tree.remove('jon')
+        assert tree._names == ['joe', 'job']
+        assert tree.is_leaf()
+
+
+class TestCompactQuadTree(TreesTest):
+    def setup_method(self):
+        self.tree = trees.CompactQuadTree((250, 250))
+
+    def test_height(self):
+        assert self.tree.height() == 1
+        self.tree.insert('jon', (250, 250))
+        assert self.tree.height() == 1
+        self.tree.insert('joe', (300, 300))
+        assert self.tree.height() == 2
+        self.tree.insert('job', (50, 50))
+        assert self.tree.height() == 3
+
+    def test_same_shape_as_quadtree(self):
+        quad = trees.QuadTree((250, 250))
+        for tree in [self.tree, quad]:
+            tree.insert_many([('jon', (250, 250)), ('joe', (300, 300)),
+                              ('job', (50, 50)), ('jim', (260, 240))])
+            tree.move('jim', 'W', 20)
+            tree.remove('joe')
+        assert self.tree.size() == quad.size() == 9
+        assert self.tree.height() == quad.height() == 7
+        assert sorted(self.tree.query_rect(0, 0, 500, 500)) == \
+            sorted(quad.query_rect(0, 0, 500, 500))
+
+    def test_remove_reuses_nodes(self):
+        self.tree.insert_many([('jon', (250, 250)), ('joe', (300, 300)),
+                               ('job', (50, 50))])
+        nodes = len(self.tree._leaf)
+        for _ in range(10):
+            self.tree.remove('job')
+            self.tree.insert('job', (50, 50))
+        assert len(self.tree._leaf) == nodes
+        assert self.tree.size() == 5
+
+
+class TestLinearQuadTree(TreesTest):
+    def setup_method(self):
+        self.tree = trees.LinearQuadTree((250, 250), capacity=1)
+
+    def test_height(self):
+        assert self.tree.height() == 1
+        self.tree.insert('jon', (250, 250))
+        assert self.tree.height() == 1
+        self.tree.insert('joe', (300, 300))
+        assert self.tree.height() == 2
+        self.tree.insert('job', (50, 50))
+        assert self.tree.height() == 3
+
+    def test_morton_order(self):
+        self.tree.insert_many([('jon', (250, 250)), ('joe', (300, 300)),
+                               ('job', (50, 50)), ('jim', (300, 50))])
+        assert self.tree._names == ['job', 'jon', 'jim', 'joe']
+        self.tree.move('job', 'E', 400)
+        assert self.tree._names == ['jon', 'jim', 'job', 'joe']
+        self.tree.move('joe', 'N', 300)
+        assert self.tree._names == ['jon', 'joe', 'jim', 'job']
+        assert list(self.tree._keys) == sorted(self.tree._keys)
+        assert list(self.tree.query_rect(0, 0, 500, 500)) == \
+            [('jon', (250, 250)), ('joe', (300, 0)), ('jim', (300, 50)),
+             ('job', (450, 50))]
+
+    def test_capacity(self):
+        tree = trees.LinearQuadTree((250, 250))
+        tree.insert_many([('p' + str(i), (i * 50, i * 50)) for i in range(8)])
+        assert tree.is_leaf()
+        assert (tree.size(), tree.height()) == (1, 1)
+        tree.insert('p8', (400, 400))
+        assert not tree.is_leaf()
+        assert tree.size() == 3
+
+    def test_same_players_as_quadtree(self):
+        quad = trees.QuadTree((250, 250))
+        for tree in [self.tree, quad]:
+            tree.insert_many([('p' + str(i), ((i * 37) % 500, (i * 91) % 500))
+                              for i in range(60)])
+            for i in range(0, 60, 3):
+                tree.move('p' + str(i), 'S', 7)
+            tree.remove('p1')
+        assert sorted(self.tree.query_rect(100, 50, 300, 400)) == \
+            sorted(quad.query_rect(100, 50, 300, 400))
+        assert self.tree.nearest((250, 250), 5) == quad.nearest((250, 250), 5)
+        assert self.tree.find_collisions(20) == quad.find_collisions(20)
+
 
 class Test2DTree(TreesTest):
     def setup_method(self):
@@ -170,6 +480,197 @@ class Test2DTree(TreesTest):
         assert jon.depth(minnie) == 2
         assert job.depth(minnie) == 1
 
+    def test_from_points(self):
+        points = [('p' + str(i), (i * 10, 500 - i * 10)) for i in range(15)]
+        tree = trees.TwoDTree.from_points((0, 0), (500, 500), points)
+        assert tree.height() == 4
+        assert all(name in tree for name, _ in points)
+        assert all(tree.contains_point(point) for _, point in points)
+
+    def test_from_points_collision(self):
+        try:
+            trees.TwoDTree.from_points((0, 0), (500, 500),
+                                       [('jon', (250, 250)),
+                                        ('joe', (250, 250))])
+        except trees.OutOfBoundsError:
+            return
+        raise Exception('this should have raised an OutOfBoundsError')
+
+    def test_balance(self):
+        for i in range(15):
+            self.tree.insert('p' + str(i), (i * 10, i * 10))
+        assert self.tree.height() == 15
+        self.tree.balance()
+        assert self.tree.height() == 4
+        assert all(self.tree.contains_point((i * 10, i * 10))
+                   for i in range(15))
+        assert all('p' + str(i) in self.tree for i in range(15))
+
+    def test_size_and_height_follow_changes(self):
+        for i in range(15):
+            self.tree.insert('p' + str(i), (i * 10, i * 10))
+        assert (self.tree.size(), self.tree.height()) == (15, 15)
+        self.tree.remove('p14')
+        self.tree.remove('p0')
+        assert (self.tree.size(), self.tree.height()) == (13, 13)
+        self.tree.move('p13', 'W', 130)
+        assert (self.tree.size(), self.tree.height()) == (13, 12)
+        self.tree.balance()
+        assert (self.tree.size(), self.tree.height()) == (13, 4)
+
+    def test_self_balancing(self):
+        tree = trees.TwoDTree((0, 0), (500, 500), alpha=0.75)
+        for i in range(500):
+            tree.insert('p' + str(i), (i, 0))
+        assert tree.size() == 500
+        assert tree.height() <= tree._height_limit(500)
+        for i in range(0, 500, 2):
+            tree.remove('p' + str(i))
+        assert tree.height() <= tree._height_limit(250)
+        assert all(tree.contains_point((i, 0)) for i in range(1, 500, 2))
+
+    def test_index(self):
+        for i in range(15):
+            self.tree.insert('p' + str(i), (i * 10, i * 10))
+        self.tree.remove('p0')
+        self.tree.remove_point((10, 10))
+        self.tree.move('p2', 'S', 5)
+        self.tree.move_point((30, 30), 'W', 30)
+        self.tree.balance()
+        index = {'p' + str(i): (i * 10, i * 10) for i in range(4, 15)}
+        index.update({'p2': (20, 25), 'p3': (0, 30)})
+        assert self.tree._index == index
+        assert set(self.tree.query_rect(0, 0, 500, 500)) == set(
+            index.items())
+
+    def test_insert_same_name_twice(self):
+        self.tree.insert('jon', (250, 250))
+        self.tree.insert('jon', (100, 100))
+        self.tree.insert('joe', (300, 300))
+        self.tree.insert('joe', (310, 300))
+        assert self.tree._index == {'jon': (100, 100), 'joe': (310, 300)}
+        assert not self.tree.contains_point((250, 250))
+        assert self.tree.size() == 2
+        self.tree.remove('jon')
+        self.tree.remove('joe')
+        assert self.tree._index == {}
+        assert self.tree.is_empty()
+
+    def test_move_inside_leaf(self):
+        for name, point in [('jon', (250, 250)), ('joe', (300, 300)),
+                            ('job', (50, 50))]:
+            self.tree.insert(name, point)
+        leaf = self.tree._lt
+        assert self.tree.move('job', 'S', 10) == (50, 60)
+        assert self.tree._lt is leaf and leaf._point == (50, 60)
+        assert self.tree._index['job'] == (50, 60)
+        assert (self.tree.size(), self.tree.height()) == (3, 2)
+        assert set(self.tree.query_rect(0, 0, 100, 100)) == {
+            ('job', (50, 60))}
+
+    def test_move_restructures_below_common_ancestor(self):
+        for name, point in [('jon', (250, 250)), ('joe', (300, 300)),
+                            ('job', (50, 50)), ('jim', (300, 100))]:
+            self.tree.insert(name, point)
+        lt, gt = self.tree._lt, self.tree._gt
+        assert self.tree.move('jim', 'S', 250) == (300, 350)
+        assert self.tree._lt is lt and self.tree._gt is gt
+        assert gt._lt is None and gt._gt._name == 'jim'
+        assert self.tree._index['jim'] == (300, 350)
+        assert (self.tree.size(), self.tree.height()) == (4, 3)
+        assert set(self.tree.query_rect(260, 0, 500, 500)) == {
+            ('joe', (300, 300)), ('jim', (300, 350))}
+
+    def test_move_into_occupied_point(self):
+        for name, point in [('jon', (250, 250)), ('joe', (300, 300)),
+                            ('job', (50, 50)), ('jim', (300, 100))]:
+            self.tree.insert(name, point)
+        index = dict(self.tree._index)
+        try:
+            self.tree.move('jim', 'S', 200)
+        except trees.OutOfBoundsError:
+            assert self.tree._index == index
+            assert (self.tree.size(), self.tree.height()) == (4, 3)
+            assert set(self.tree.query_rect(0, 0, 500, 500)) == set(
+                index.items())
+            return
+        raise Exception('this should have raised an OutOfBoundsError')
+
+    def test_remove_internal_nodes(self):
+        points = [('p' + str(i), ((i * 37) % 500, (i * 91) % 500))
+                  for i in range(60)]
+        tree = trees.TwoDTree.from_points((0, 0), (500, 500), points)
+        for name, _ in points[::3]:
+            tree.remove(name)
+        assert not any(tree.contains_point(point) for _, point in points[::3])
+        assert all(tree.contains_point(point) for i, (_, point)
+                   in enumerate(points) if i % 3 != 0)
+
+
+class TestGridTree(TreesTest):
+    def setup_method(self):
+        self.tree = trees.GridTree((0, 0), (500, 500))
+
+    def test_height(self):
+        assert self.tree.height() == 1
+        self.tree.insert('jon', (250, 250))
+        assert self.tree.height() == 1
+        self.tree.insert('joe', (300, 300))
+        assert self.tree.height() == 3
+        self.tree.remove('jon')
+        assert self.tree.height() == 1
+
+    def test_cells(self):
+        tree = trees.GridTree((0, 0), (500, 500), cell=50)
+        tree.insert_many([('jon', (250, 250)), ('joe', (260, 240)),
+                          ('job', (50, 50))])
+        assert tree._cells == {(5, 5): {'jon': None}, (5, 4): {'joe': None},
+                               (1, 1): {'job': None}}
+        assert tree.size() == 1 + 3 + 3
+        tree.move('joe', 'S', 10)
+        assert tree._cells == {(5, 5): {'jon': None, 'joe': None},
+                               (1, 1): {'job': None}}
+        assert tree.size() == 1 + 2 + 3
+
+
+class TestFlatTwoDTree(TreesTest):
+    def setup_method(self):
+        self.tree = trees.FlatTwoDTree((0, 0), (500, 500))
+
+    def test_from_tree(self):
+        tree = trees.TwoDTree((0, 0), (500, 500))
+        for i in range(15):
+            tree.insert('p' + str(i), (i * 10, 500 - i * 10))
+        flat = trees.FlatTwoDTree.from_tree(tree)
+        assert flat.height() == 4
+        assert sorted(flat.query_rect(0, 0, 500, 500)) == \
+            sorted(tree.query_rect(0, 0, 500, 500))
+        assert flat.contains_point((70, 430))
+        assert not flat.contains_point((70, 431))
+
+    def test_delta_buffer(self):
+        tree = trees.FlatTwoDTree.from_points(
+            (0, 0), (500, 500), [('jon', (250, 250)), ('joe', (300, 300))])
+        tree.move('jon', 'N', 10)
+        tree.insert('job', (50, 50))
+        assert tree._names == ['joe', None]
+        assert tree._delta == {'jon': (250, 240), 'job': (50, 50)}
+        assert set(tree.names_in_range((0, 0), 'SE', 260)) == {'jon', 'job'}
+        tree.balance()
+        assert sorted(tree._names) == ['job', 'joe', 'jon']
+        assert tree._delta == {}
+
+    def test_rebuilds_past_delta_limit(self):
+        tree = trees.FlatTwoDTree((0, 0), (500, 500), delta_limit=2)
+        tree.insert_many([('jon', (250, 250))])
+        tree.insert('joe', (300, 300))
+        tree.insert('job', (50, 50))
+        assert len(tree._delta) == 2
+        tree.move('jon', 'S', 1)
+        assert tree._delta == {}
+        assert tree.height() == 2
+        assert tree.contains_point((250, 251))
+
 
 ##### PLAYERS #####
 
@@ -183,8 +684,8 @@ class PlayersTest:
         assert player._colour == 'green'
         assert player._location == (100, 100)
         assert player._points == 0
-        assert player._targets == []
-        assert player._enemies == []
+        assert player.get_targets() == []
+        assert player.get_enemies() == []
         assert player._direction in 'NSEW'
 
     def test_set_colour(self):
@@ -211,15 +712,25 @@ class PlayersTest:
 
     def test_ignore_target(self):
         player = players.Player('eric', 1, 2, self.game, 'green', (100, 100))
-        player._targets = ['gill', 'eoin']
+        player._targets = dict.fromkeys(['gill', 'eoin'])
         player.ignore_target('gill')
-        assert player._targets == ['eoin']
+        assert player.get_targets() == ['eoin']
 
     def test_get_targets(self):
         player = players.Player('eric', 1, 2, self.game, 'green', (100, 100))
-        player._targets = ['gill', 'eoin']
+        player._targets = dict.fromkeys(['gill', 'eoin'])
         assert set(player.get_targets()) == {'gill', 'eoin'}
 
+    def test_get_targets_view(self):
+        player = players.Player('eric', 1, 2, self.game, 'green', (100, 100))
+        view = player.get_targets_view()
+        player.select_target('gill')
+        player.select_target('eoin')
+        player.ignore_target('gill')
+        assert list(view) == ['eoin']
+        assert 'gill' not in view
+        assert not hasattr(view, 'add')
+
     def test_select_enemy(self):
         player = players.Player('eric', 1, 2, self.game, 'green', (100, 100))
         enemies = set(player._enemies)
@@ -228,13 +739,13 @@ class PlayersTest:
 
     def test_ignore_enemy(self):
         player = players.Player('eric', 1, 2, self.game, 'green', (100, 100))
-        player._enemies = ['gill', 'eoin']
+        player._enemies = dict.fromkeys(['gill', 'eoin'])
         player.ignore_enemy('gill')
-        assert player._enemies == ['eoin']
+        assert player.get_enemies() == ['eoin']
 
     def test_get_enemies(self):
         player = players.Player('eric', 1, 2, self.game, 'green', (100, 100))
-        player._enemies = ['gill', 'eoin']
+        player._enemies = dict.fromkeys(['gill', 'eoin'])
         assert set(player.get_enemies()) == {'gill', 'eoin'}
 
     def test_reverse_direction(self):
@@ -251,8 +762,8 @@ class PlayersTest:
 
     def _reset_player(self, player: players.Player, loc: Tuple[int, int]):
         player._location = loc
-        player._targets = []
-        player._enemies = []
+        player._targets = {}
+        player._enemies = {}
         player._vision = 100
         self.game.field.remove(player._name)
         self.game.field.insert(player._name, loc)
@@ -267,9 +778,9 @@ class PlayersTest:
         for i, (coord, other) in enumerate(zip(coords, others)):
             self._reset_player(other, coord)
             if i in targets:
-                player._targets.append(other._name)
+                player.select_target(other._name)
             if i in enemies:
-                player._enemies.append(other._name)
+                player.select_enemy(other._name)
         return player, others
 
     def test_next_direction_no_best(self):
@@ -280,6 +791,25 @@ class PlayersTest:
         assert player.next_direction() == set('NSEW')
         assert player._direction in set('NSEW')
 
+    def test_next_directions_same_as_next_direction(self):
+        coords = [(200, 200), (300, 260), (250, 320), (180, 250)]
+        targets = [0, 2]
+        enemies = [1]
+        player, others = self._move_into_starting_position(coords, targets,
+                                                           enemies)
+        others[0].select_target(player._name)
+        others[3].select_enemy(player._name)
+        others[3].select_enemy(others[2]._name)
+        all_players = [player] + others
+        for i, p in enumerate(all_players):
+            p._rng = random.Random(i)
+        expected = [p.next_direction() for p in all_players]
+        expected_directions = [p._direction for p in all_players]
+        for i, p in enumerate(all_players):
+            p._rng = random.Random(i)
+        assert players.next_directions(all_players) == expected
+        assert [p._direction for p in all_players] == expected_directions
+
     def test_move_no_collision(self):
         coords = [(50, 50), (50, 450), (450, 450), (450, 50)]
         targets = []
@@ -336,6 +866,10 @@ class TagTests:
         assert game._it in game._players
         assert game._players[game._it]._colour == 'purple'
 
+    def test_init_zero_duration(self):
+        with pytest.raises(ValueError):
+            games.Tag(10, self.tree, 0, 3, 4)
+
     def test_handle_collision_reverse_direction(self):
         game = games.Tag(10, self.tree, 5, 3, 4)
         player1, player2 = list(game._players.values())[:2]
@@ -353,6 +887,31 @@ class TagTests:
         assert game._it == not_it
         assert it_points + 1 == game._players[game._it].get_points()
 
+    def test_handle_collision_shares_it_team(self):
+        game = games.Tag(10, self.tree, 5, 3, 4)
+        it = game._it
+        not_it = next(p for p in game._players if p != game._it)
+        game.handle_collision(it, not_it)
+        assert list(game.get_team('it')) == [not_it]
+        assert it in game.get_team('players')
+        assert all(p.get_enemies() == [not_it] for name, p in
+                   game._players.items() if name != not_it)
+        assert set(game._players[not_it].get_targets()) == \
+            set(game._players) - {not_it}
+
+    def test_resolve_collisions(self):
+        game = games.Tag(2, self.tree, 5, 3, 4)
+        it = game._it
+        not_it = next(p for p in game._players if p != game._it)
+        game.field.remove(it)
+        game.field.remove(not_it)
+        game.field.insert(it, (250, 250))
+        game.field.insert(not_it, (250, 251))
+        assert game.resolve_collisions() == [tuple(sorted([it, not_it]))]
+        assert game._it == not_it
+        game.field.move(not_it, 'S', 9)
+        assert game.resolve_collisions() == []
+
     def test_check_for_winner_no_winner(self):
         game = games.Tag(10, self.tree, 5, 3, 4)
         assert game.check_for_winner() is None
@@ -372,6 +931,11 @@ class TestTagQuadTree(TagTests):
         self.tree = trees.QuadTree((250, 250))
 
 
+class TestTagCompactQuadTree(TagTests):
+    def setup_method(self):
+        self.tree = trees.CompactQuadTree((250, 250))
+
+
 class TestTag2dTree(TagTests):
     def setup_method(self):
         self.tree = trees.TwoDTree((0, 0), (500, 500))
@@ -408,6 +972,20 @@ class ZombieTagTests:
         assert human._name in game._zombies
         assert human._name not in game._humans
 
+    def test_handle_collision_shares_teams(self):
+        game = games.ZombieTag(10, self.tree, 5, 3, 4)
+        human1, human2 = list(game._humans)[:2]
+        game.handle_collision('first zombie', human1)
+        game.handle_collision(human1, human2)
+        assert list(game.get_team('zombies')) == ['first zombie', human1,
+                                                  human2]
+        targets = game._zombies['first zombie']._targets
+        assert all(zombie._targets is targets
+                   for zombie in game._zombies.values())
+        assert set(targets) == set(game._humans)
+        assert all(human.get_enemies() == list(game._zombies)
+                   for human in game._humans.values())
+
     def test_check_for_winner_humans_win(self):
         game = games.ZombieTag(2, self.tree, 5, 3, 4)
         assert game.check_for_winner() == 'humans'
@@ -470,10 +1048,37 @@ class EliminationTagTests:
         assert game._players[player1].get_targets()[0] == p2targets[0]
         assert game._players[player1].get_points() - 1 == points
 
+    def test_resolve_collisions_skips_eliminated(self):
+        game = games.EliminationTag(3, self.tree, 3, 4)
+        for name, point in zip(['0', '1', '2'],
+                               [(250, 250), (251, 250), (250, 251)]):
+            game.field.remove(name)
+            game.field.insert(name, point)
+        # '0' tags '1', then '2' tags '0'; the pair ('1', '2') is skipped
+        assert game.resolve_collisions() == [('0', '1'), ('0', '2')]
+        assert list(game._players) == ['2']
+        assert '1' not in game.field
+
     def test_check_for_winner_no_winner(self):
         game = games.EliminationTag(10, self.tree, 3, 4)
         assert game.check_for_winner() is None
 
+    def test_check_for_winner_after_eliminations(self):
+        game = games.EliminationTag(5, self.tree, 3, 4)
+        game.handle_collision('1', '0')
+        game.handle_collision('3', '2')
+        assert game.check_for_winner() is None
+        assert game._next == {'0': '2', '2': '4', '4': '0'}
+        assert game._prev == {'2': '0', '4': '2', '0': '4'}
+        game.handle_collision('2', '4')
+        assert game.check_for_winner() == '2'
+        assert {name: player.get_points()
+                for name, player in game._players.items()} == {'0': 1, '2': 2}
+        game.handle_collision('2', '0')
+        assert game._next == {'0': '0'}
+        assert game._players['0'].get_points() == 2
+        assert game.check_for_winner() == '0'
+
     def test_check_for_winner_one_winner(self):
         game = games.EliminationTag(10, self.tree, 3, 4)
         player1 = list(game._players)[0]
@@ -491,5 +1096,142 @@ class TestEliminationTag2dTree(EliminationTagTests):
         self.tree = trees.TwoDTree((0, 0), (500, 500))
 
 
+##### SIMULATION #####
+
+class SimulationTests:
+    def test_step(self):
+        game = games.Tag(10, self.tree, 5, 3, 4)
+        sim = simulation.Simulation(game)
+        assert sim.step() is None
+        assert sim.get_tick() == 1
+        assert all(game.field.contains_point(player._location)
+                   for player in game.get_players().values())
+
+    def test_run_max_ticks(self):
+        game = games.Tag(10, self.tree, 1000, 3, 4)
+        report = simulation.Simulation(game).run(3)
+        assert report.winner is None
+        assert report.ticks == 3
+
+    def test_run_tag_duration(self):
+        game = games.Tag(1, self.tree, 3, 3, 4)
+        report = simulation.Simulation(game).run(10)
+        assert report.winner == '0'
+        assert report.ticks == 3
+
+    def test_run_zombie_tag_duration(self):
+        game = games.ZombieTag(10, self.tree, 5, 3, 4)
+        report = simulation.Simulation(game).run(10)
+        assert report.winner in ['humans', 'zombies']
+        assert report.ticks <= 5
+
+
+class TestSimulationQuadTree(SimulationTests):
+    def setup_method(self):
+        self.tree = trees.QuadTree((250, 250))
+
+    def test_seeded_runs_replay(self):
+        def run(seed: int) -> List[Tuple[str, Tuple[int, int]]]:
+            game = games.ZombieTag(30, trees.QuadTree((250, 250)), 10, 3, 40,
+                                   random.Random(seed))
+            sim = simulation.Simulation(game)
+            for _ in range(5):
+                sim.step()
+            return sorted((name, player._location)
+                          for name, player in game.get_players().items())
+
+        first = run(148)
+        random.seed(0)
+        assert run(148) == first
+        assert run(149) != first
+
+
+class TestSimulationCompactQuadTree(SimulationTests):
+    def setup_method(self):
+        self.tree = trees.CompactQuadTree((250, 250))
+
+
+class TestSimulationLinearQuadTree(SimulationTests):
+    def setup_method(self):
+        self.tree = trees.LinearQuadTree((250, 250))
+
+
+class TestSimulationFlat2dTree(SimulationTests):
+    def setup_method(self):
+        self.tree = trees.FlatTwoDTree((0, 0), (500, 500))
+
+
+class TestSimulationGridTree(SimulationTests):
+    def setup_method(self):
+        self.tree = trees.GridTree((0, 0), (500, 500))
+
+
+class TestSimulation2dTree(SimulationTests):
+    def setup_method(self):
+        self.tree = trees.TwoDTree((0, 0), (500, 500))
+
+
+##### SPAWN #####
+
+def test_spawn_points_unique_in_bounds():
+    points = spawn.spawn_points(1000, (10, 20, 59, 69), 148)
+    assert len(set(points)) == 1000
+    assert all(10 <= x <= 59 and 20 <= y <= 69 for x, y in points)
+
+
+def test_spawn_points_fills_field():
+    points = spawn.spawn_points(2500, (10, 20, 59, 69), 148)
+    assert len(set(points)) == 2500
+
+
+def test_spawn_points_seed():
+    assert spawn.spawn_points(50, (0, 0, 500, 500), 1) == \
+        spawn.spawn_points(50, (0, 0, 500, 500), 1)
+    assert spawn.spawn_points(50, (0, 0, 500, 500), 1) != \
+        spawn.spawn_points(50, (0, 0, 500, 500), 2)
+
+
+def test_spawn_points_too_many():
+    with pytest.raises(ValueError):
+        spawn.spawn_points(10, (0, 0, 2, 2))
+
+
+def test_games_spawn_in_field_bounds():
+    game = games.ZombieTag(120, trees.QuadTree((5, 5)), 5, 3, 4)
+    assert len(game.get_players()) == 121
+    assert all(name in game.field for name in game.get_players())
+    with pytest.raises(ValueError):
+        games.Tag(122, trees.TwoDTree((0, 0), (10, 10)), 5, 3, 4)
+
+
+##### BATCH #####
+
+def test_run_batch_reproducible():
+    configs = [batch.GameConfig(game, 'QuadTree', 8, 3, 20, 5, 20)
+               for game in batch.GAME_TYPES]
+
+    def run() -> List[Tuple]:
+        return sorted(record[:-1] for record in
+                      batch.run_batch(configs, 3, 148, 2, shard_size=2))
+
+    records = run()
+    assert len(records) == 9
+    assert records == run()
+    assert all(record[0] in configs for record in records)
+
+
+def test_aggregate():
+    config = batch.GameConfig('Tag', 'TwoDTree', 8, 3, 20)
+    summary = batch.aggregate([batch.GameRecord(config, 0, '3', 20, 6, 1.0),
+                               batch.GameRecord(config, 1, None, 30, 2, 2.0),
+                               batch.GameRecord(config, 2, '5', 10, 7, 3.0)])
+    assert len(summary) == 1
+    assert summary[0]['tree'] == 'TwoDTree'
+    assert summary[0]['games'] == 3
+    assert summary[0]['win_rates'] == {'no winner': 1 / 3, 'winner': 2 / 3}
+    assert summary[0]['mean_eliminations'] == 5
+    assert summary[0]['mean_seconds'] == 2
+
+
 if __name__ == '__main__':
     pytest.main('tests.py')
@@ -8,10 +8,23 @@ implementations of this abstract class. The two implementations are QuadTree and
 TwoDTree which is a kd-tree of dimension 2. These trees are used to store
 information of a two dimensional space with points on it. What makes the use
 of these trees powerful here is it's efficiency in doing many of the operations.
+CompactQuadTree is an alternate QuadTree engine that keeps its nodes in
+parallel arrays rather than one object per node, to save memory on large fields.
+FlatTwoDTree is a static kd-tree laid out in flat arrays, with a delta buffer
+for the players that moved since it was last rebuilt, for read-heavy phases.
+GridTree is a uniform grid of cells sized from the vision of the players, for
+dense fields where players only look a short distance around them.
+LinearQuadTree is a QuadTree engine that keeps its players in one array sorted
+by the Z-order key of their points, and finds them with binary searches.
 """
 
 from __future__ import annotations
-from typing import Optional, List, Tuple, Dict
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+from typing import Optional, List, Tuple, Dict, Iterable, Iterator, Set, \
+    Callable
 
 
 class OutOfBoundsError(Exception):
@@ -31,7 +44,7 @@ class Tree:
     def __contains__(self, name: str) -> bool:
         """ Return True if a player named <name> is stored in this tree.
 
-        Runtime: O(n)
+        Runtime: O(1)
         """
         raise NotImplementedError
 
@@ -55,10 +68,25 @@ class Tree:
         """
         raise NotImplementedError
 
+    def insert_many(self, items: Iterable[Tuple[str, Tuple[int, int]]]) -> \
+            None:
+        """Insert a player for every (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players would share the same point.
+
+        An empty tree is bulk loaded, in which case nothing is inserted when
+        an OutOfBoundsError is raised. Otherwise the players are inserted one
+        at a time.
+
+        Runtime: O(n * log(n))
+        """
+        raise NotImplementedError
+
     def remove(self, name: str) -> None:
         """ Remove information about a player named <name> from this tree.
 
-        Runtime: O(n)
+        Runtime: O(log(n))
         """
         raise NotImplementedError
 
@@ -79,9 +107,10 @@ class Tree:
 
         Raise an OutOfBoundsError if moving the player would place the player at
         exactly the same coordinates of another player in the Tree
-        (before moving the player).
+        (before moving the player). A move of 0 steps raises it too, as the
+        player is already at those coordinates.
 
-        Runtime: O(n)
+        Runtime: O(log(n))
 
         === precondition ===
         direction in ['N', 'S', 'E', 'W']
@@ -98,7 +127,8 @@ class Tree:
 
         Raise an OutOfBoundsError if moving the player would place the player at
         exactly the same coordinates of another player in the Tree
-        (before moving the player).
+        (before moving the player). A move of 0 steps raises it too, as the
+        player is already at those coordinates.
 
         Moving a point may require the tree to be reorganized. This method
         should do the minimum amount of tree reorganization possible to move the
@@ -112,6 +142,60 @@ class Tree:
         """
         raise NotImplementedError
 
+    def move_many(self, moves: Iterable[Tuple[str, str, int]]) -> \
+            Tuple[Dict[str, Tuple[int, int]], List[Tuple[str, str, int]]]:
+        """ Move players by every (name, direction, steps) in <moves>, in
+        order, as if move had been called for each of them.
+
+        Return a dictionary mapping the name of every player that moved to its
+        new location, and a list of the moves that were rejected because they
+        would have raised an OutOfBoundsError. Moves of players that are not
+        in this tree are ignored.
+
+        Runtime: O(k * log(n)) for k moves
+
+        === precondition ===
+        every direction is in ['N', 'S', 'E', 'W']
+        """
+        raise NotImplementedError
+
+    def query_rect(self, x0: int, y0: int, x1: int, y1: int) -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player inside the rectangle
+        with north west corner (<x0>, <y0>) and south east corner (<x1>, <y1>),
+        borders included.
+
+        Runtime: faster than O(n) when the rectangle is small
+        """
+        raise NotImplementedError
+
+    def query_radius(self, point: Tuple[int, int], r: int,
+                     metric: str = 'manhattan') -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player whose distance to
+        <point>, measured with <metric>, is at most <r>.
+
+        Runtime: faster than O(n) when <r> is small
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+        """
+        raise NotImplementedError
+
+    def find_collisions(self, radius: int, metric: str = 'manhattan') -> \
+            List[Tuple[str, str]]:
+        """ Return every pair of names of players whose distance to each other,
+        measured with <metric>, is at most <radius>. Each pair is ordered, and
+        the pairs are sorted.
+
+        Runtime: O(n * log(n)) when few players are within <radius> of each
+        other
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+        """
+        raise NotImplementedError
+
     def names_in_range(self, point: Tuple[int, int], direction: str,
                        distance: int) -> List[str]:
         """ Return a list of names of players whose location is in the
@@ -131,6 +215,24 @@ class Tree:
         """
         raise NotImplementedError
 
+    def nearest(self, point: Tuple[int, int], k: int,
+                filter: Optional[Set[str]] = None,
+                metric: str = 'manhattan') -> List[Tuple[str, Tuple[int, int]]]:
+        """ Return the names and locations of the <k> players closest to
+        <point>, closest first. Players at the same distance are ordered by
+        location. Only players whose name is in <filter> are considered, unless
+        <filter> is None.
+
+        Distances are measured with <metric>, either 'manhattan' or
+        'chebyshev'.
+
+        Runtime: O(log(n) + k) for evenly spread players
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+        """
+        raise NotImplementedError
+
     def size(self) -> int:
         """ Return the number of nodes in <self>
 
@@ -171,82 +273,137 @@ class Tree:
         """
         raise NotImplementedError
 
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """ Return the rectangle that players can be placed in on the field
+        described by <self> as the root, as (west, north, east, south), edges
+        included.
+
+        Runtime: O(1)
+        """
+        raise NotImplementedError
+
 
 class QuadTree(Tree):
     """
     A QuadTree. Concrete implementation of Tree.
 
+    Every leaf holds up to a capacity of players, 1 by default, and is only
+    split into quadrants when one more player is inserted into it. A bigger
+    capacity saves the chains of nodes that players close to each other would
+    otherwise need to be told apart.
+
     === Private Attributes ===
     _centre: centre of the tree
-    _name: name of the tree
-    _point: point of the tree
+    _names: the names of the players stored in the tree, if it is a leaf
+    _points: the points of the players stored in the tree, in the order of
+    _names
+    _capacity: the number of players a leaf can hold
     _ne: the north-east subtree of the tree
     _nw: the north-west subtree of the tree
     _se: the south-east subtree of the tree
     _sw: the south-west subtree of the tree
+    _index: a dictionary mapping the name of every player stored in the tree to
+    its point. Only the root of the tree keeps an index, it is None for every
+    subtree
+    _size: the number of nodes in this tree
+    _height: the height of this tree
 
     === Representation Invariant ===
-    - only leaf nodes can have a non-None _name attribute
-    - every leaf node must have a non-None _name attribute unless it also has no
-     parents
-    - only leaf nodes can have a non-None _point attribute
-    - every leaf node must have a non-None _point attribute unless it also has
-    no parents
-    - every non-None _point attribute must contain only positive integers or
-    zero
+    - _size and _height are those of the subtrees of the tree, plus one
+    - _capacity >= 1, and is the same for every node of the tree
+    - len(_names) == len(_points) <= _capacity
+    - only leaf nodes can have non-empty _names and _points attributes
+    - every leaf node must have non-empty _names and _points attributes unless
+    it also has no parents
+    - every node that is not a leaf stores more than _capacity players in its
+    subtrees
+    - every point in _points must contain only positive integers or zero
     - every _centre attribute must contain only positive integers or zero
     - every _centre attribute describes a point that is the exact centre of the
      rectangle (if the exact centre is not an integer, the values in _centre
      should be rounded down to the nearest integer).
-    - if _point is not None, then _point[0] <= 2*_centre[0] for the root node
-    - if _point is not None, then _point[1] <= 2*_centre[1] for the root node
-    - if d._point is not None for some descendant d of p, then:
-    - d must be in the _nw or _sw subtrees if d._point[0] <= p._centre[0] and in
+    - for every point in _points of the root node, point[0] <= 2*_centre[0]
+    and point[1] <= 2*_centre[1]
+    - for every point in d._points for some descendant d of p:
+    - d must be in the _nw or _sw subtrees if point[0] <= p._centre[0] and in
      one of the other subtrees otherwise.
-    - d must be in the _nw or _ne subtrees if d._point[1] <= p._centre[1] and in
+    - d must be in the _nw or _ne subtrees if point[1] <= p._centre[1] and in
      one of the other subtrees otherwise.
     """
     _centre: Tuple[int, int]
-    _name: Optional[str]
-    _point: Optional[Tuple[int, int]]
+    _names: List[str]
+    _points: List[Tuple[int, int]]
+    _capacity: int
     _ne: Optional[QuadTree]
     _nw: Optional[QuadTree]
     _se: Optional[QuadTree]
     _sw: Optional[QuadTree]
+    _index: Optional[Dict[str, Tuple[int, int]]]
+    _size: int
+    _height: int
 
-    def __init__(self, centre: Tuple[int, int]) -> None:
-        """Initialize a new Tree instance with centre <centre>.
+    def __init__(self, centre: Tuple[int, int], capacity: int = 1) -> None:
+        """Initialize a new Tree instance with centre <centre>, whose leaves
+        hold up to <capacity> players.
 
         Runtime: O(1)
 
         >>> q1 = QuadTree((50, 50))
-        >>> q2 = QuadTree((100, 100))
+        >>> q2 = QuadTree((100, 100), capacity=8)
         """
         self._centre = centre
-        self._name = None
-        self._point = None
+        self._names = []
+        self._points = []
+        self._capacity = max(1, capacity)
         self._ne = None
         self._nw = None
         self._se = None
         self._sw = None
+        self._index = {}
+        self._size = 1
+        self._height = 1
+
+    @classmethod
+    def from_points(cls, centre: Tuple[int, int],
+                    items: Iterable[Tuple[str, Tuple[int, int]]],
+                    capacity: int = 1) -> QuadTree:
+        """ Return a new QuadTree with centre <centre> and leaves holding up to
+        <capacity> players, storing every (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players share the same point.
+
+        Runtime: O(n * log(n))
+
+        >>> q = QuadTree.from_points((50, 50), [('a', (25, 25)),
+        ...                                     ('b', (75, 75))])
+        >>> q._nw._names
+        ['a']
+        >>> QuadTree.from_points((50, 50), [('a', (25, 25)), ('b', (25, 25))])
+        Traceback (most recent call last):
+        ...
+        trees.OutOfBoundsError: ['a', 'b']
+        """
+        tree = cls(centre, capacity)
+        tree.insert_many(items)
+        return tree
 
     def __contains__(self, name: str) -> bool:
         """ Return True if a player named <name> is stored in this tree.
 
-        Runtime: O(n)
+        Runtime: O(1) on the root, O(n) on a subtree
 
         >>> q = QuadTree((50, 50))
-        >>> q._name = 'a'
-        >>> q._point = (25, 25)
+        >>> q.insert('a', (25, 25))
         >>> 'a' in q
         True
         >>> q.__contains__('b')
         False
         """
-        if self.is_empty():
-            return False
+        if self._index is not None:
+            return name in self._index
         elif self.is_leaf():
-            return self._name == name
+            return name in self._names
         else:
             return (self._ne is not None and self._ne.__contains__(name)) \
                    or (self._nw is not None and self._nw.__contains__(name)) \
@@ -259,17 +416,14 @@ class QuadTree(Tree):
         Runtime: O(log(n))
 
         >>> q = QuadTree((50, 50))
-        >>> q._name = 'a'
-        >>> q._point = (25, 25)
+        >>> q.insert('a', (25, 25))
         >>> q.contains_point((25, 25))
         True
         >>> q.contains_point((50, 50))
         False
         """
-        if self.is_empty():
-            return False
-        elif self.is_leaf():
-            return self._point == point
+        if self.is_leaf():
+            return point in self._points
         else:
             if point[0] <= self._centre[0] and point[1] <= self._centre[1]:
                 # NW
@@ -304,72 +458,149 @@ class QuadTree(Tree):
         >>> 'b' in q
         True
         """
-        if not (point[0] <= 2 * self._centre[0] and point[1] <= 2 *
-                self._centre[1]) or self.contains_point(point):
+        if not self._in_bounds(point) or self.contains_point(point):
             raise OutOfBoundsError
         else:
-            self._insert_helper(name, point, {'NW': (0, 0),
-                                              'NE': (2 * self._centre[0], 0),
-                                              'SW': (0, 2 * self._centre[1]),
-                                              'SE': (2 * self._centre[0],
-                                                     2 * self._centre[1])})
+            if self._index is not None and name in self._index:
+                # a name is stored once, so its old point is dropped
+                self.remove(name)
+            self._insert_helper(name, point, self._root_corners())
+            if self._index is not None:
+                self._index[name] = point
+
+    def insert_many(self, items: Iterable[Tuple[str, Tuple[int, int]]]) -> \
+            None:
+        """Insert a player for every (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players would share the same point.
+
+        An empty tree is bulk loaded, in which case nothing is inserted when
+        an OutOfBoundsError is raised. Otherwise the players are inserted one
+        at a time.
+
+        Runtime: O(n * log(n))
+
+        >>> q = QuadTree((50, 50))
+        >>> q.insert_many([('a', (25, 25)), ('b', (75, 75))])
+        >>> 'b' in q
+        True
+        """
+        if not self.is_empty():
+            for name, point in items:
+                self.insert(name, point)
+            return None
+        # a name given twice keeps its last point
+        items = list(dict(items).items())
+        _check_items(self, items)
+        if items:
+            self._build(items, self._root_corners())
+            if self._index is not None:
+                self._index.update(items)
+
+    def _build(self, items: List[Tuple[str, Tuple[int, int]]],
+               corners: Dict[str, Tuple[int, int]]) -> None:
+        """
+        Helper method for insert_many.
+        Fill the empty <self> with <items>, partitioning them by quadrant.
+        """
+        if len(items) <= self._capacity:
+            self._names = [name for name, _ in items]
+            self._points = [point for _, point in items]
+            return None
+        regions = {'NW': [], 'NE': [], 'SW': [], 'SE': []}
+        for item in items:
+            regions[self._find_region(item[1])].append(item)
+        for region in regions:
+            if regions[region]:
+                subtree = _quad_subtree(
+                    self._find_centre(regions[region][0][1], corners),
+                    self._capacity)
+                self._insert_region_at(region, subtree)
+                sub_corners = corners.copy()
+                self._corner_helper(region, sub_corners)
+                subtree._build(regions[region], sub_corners)
+        self._refresh()
 
     def _insert_helper(self, name: str, point: Tuple[int, int],
                        corners: Dict[str, Tuple[int, int]]) -> None:
         """
         Helper method for insert using the parameters <name> and <point>
         """
-        if self.is_empty():
-            self._name = name
-            self._point = point
-        elif self.is_leaf():
-            if self._find_region(self._point) == self._find_region(point):
-                # copying
-                demoted_tree = QuadTree(self._find_centre(self._point, corners))
-                demoted_tree._name = self._name
-                demoted_tree._point = self._point
-
-                # combine
-                self._insert_region(demoted_tree)
-                # emptying
-                self._name = None
-                self._point = None
-                self._corner_helper(self._find_region(point), corners)
-                demoted_tree._insert_helper(name, point, corners)  # recursion
-            else:  # REGIONAL BASE CASE
-                demoted_tree = QuadTree(self._find_centre(self._point, corners))
-                demoted_tree._name = self._name
-                demoted_tree._point = self._point
+        if self.is_leaf():
+            if len(self._points) < self._capacity:
+                self._names.append(name)
+                self._points.append(point)
+                return None
+            # the leaf is full: hand its players down to new subtrees, then
+            # insert <point> below <self> like in any other inner node
+            for old_name, old_point in zip(self._names, self._points):
+                region = self._find_region(old_point)
+                subtree = self._region_subtree(region)
+                if subtree is None:
+                    subtree = _quad_subtree(
+                        self._find_centre(old_point, corners), self._capacity)
+                    self._insert_region_at(region, subtree)
+                    self._size += 1
+                subtree._names.append(old_name)
+                subtree._points.append(old_point)
+            self._names.clear()
+            self._points.clear()
+            self._height = 2
+        region = self._find_region(point)
+        subtree = self._region_subtree(region)
+        if subtree is None:
+            subtree = _quad_subtree(self._find_centre(point, corners),
+                                    self._capacity)
+            self._insert_region_at(region, subtree)
+            self._size += 1
+        old_size = subtree._size
+        self._corner_helper(region, corners)
+        subtree._insert_helper(name, point, corners)
+        self._size += subtree._size - old_size
+        self._height = max(self._height, subtree._height + 1)
+
+    def _refresh(self) -> None:
+        """
+        Helper method for the methods changing the subtrees of <self>.
+        Recompute _size and _height from those of the subtrees of <self>.
+        """
+        size, height = 1, 0
+        for subtree in [self._nw, self._ne, self._sw, self._se]:
+            if subtree is not None:
+                size += subtree._size
+                height = max(height, subtree._height)
+        self._size = size
+        self._height = height + 1
+
+    def _in_bounds(self, point: Tuple[int, int]) -> bool:
+        """
+        Return True if <point> is inside the rectangle described by <self> as
+        the root.
+        """
+        return 0 <= point[0] <= 2 * self._centre[0] and \
+            0 <= point[1] <= 2 * self._centre[1]
 
-                self._name = None
-                self._point = None
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """ Return the rectangle that players can be placed in on the field
+        described by <self> as the root, as (west, north, east, south), edges
+        included.
 
-                new_tree = QuadTree(self._find_centre(point, corners))
-                new_tree._name = name
-                new_tree._point = point
-
-                self._insert_region(demoted_tree)
-                self._insert_region(new_tree)
-        elif point[0] <= self._centre[0] and point[1] <= self._centre[1]:  # NW
-            if self._nw is None:
-                self._nw = QuadTree(self._find_centre(point, corners))
-            self._corner_helper('NW', corners)
-            self._nw._insert_helper(name, point, corners)
-        elif point[0] <= self._centre[0]:  # SW
-            if self._sw is None:
-                self._sw = QuadTree(self._find_centre(point, corners))
-            self._corner_helper('SW', corners)
-            self._sw._insert_helper(name, point, corners)
-        elif point[1] <= self._centre[1]:  # NE
-            if self._ne is None:
-                self._ne = QuadTree(self._find_centre(point, corners))
-            self._corner_helper('NE', corners)
-            self._ne._insert_helper(name, point, corners)
-        else:  # SE
-            if self._se is None:
-                self._se = QuadTree(self._find_centre(point, corners))
-            self._corner_helper('SE', corners)
-            self._se._insert_helper(name, point, corners)
+        Runtime: O(1)
+
+        >>> QuadTree((100, 50)).bounds()
+        (0, 0, 200, 100)
+        """
+        return 0, 0, 2 * self._centre[0], 2 * self._centre[1]
+
+    def _root_corners(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Return the corners of the rectangle described by <self> as the root.
+        """
+        return {'NW': (0, 0),
+                'NE': (2 * self._centre[0], 0),
+                'SW': (0, 2 * self._centre[1]),
+                'SE': (2 * self._centre[0], 2 * self._centre[1])}
 
     def _corner_helper(self, direction: str,
                        corners: Dict[str, Tuple[int, int]]) -> None:
@@ -411,18 +642,31 @@ class QuadTree(Tree):
         else:  # SE
             return 'SE'
 
-    def _insert_region(self, tree: QuadTree) -> None:
+    def _region_subtree(self, region: str) -> Optional[QuadTree]:
+        """
+        Return the subtree of <self> in <region>.
+        """
+        if region == 'NW':
+            return self._nw
+        elif region == 'SW':
+            return self._sw
+        elif region == 'NE':
+            return self._ne
+        else:
+            return self._se
+
+    def _insert_region_at(self, region: str, tree: Optional[QuadTree]) -> \
+            None:
         """
-        Insert <tree> in its respective region.
+        Insert <tree> as the subtree of <self> in <region>.
         """
-        if tree._point[0] <= self._centre[0] and \
-                tree._point[1] <= self._centre[1]:  # NW
+        if region == 'NW':
             self._nw = tree
-        elif tree._point[0] <= self._centre[0]:  # SW
+        elif region == 'SW':
             self._sw = tree
-        elif tree._point[1] <= self._centre[1]:  # NE
+        elif region == 'NE':
             self._ne = tree
-        else:  # SE
+        else:
             self._se = tree
 
     def _find_centre(self, point: Tuple[int, int],
@@ -446,7 +690,7 @@ class QuadTree(Tree):
     def remove(self, name: str) -> None:
         """Remove information about a player named <name> from this tree.
 
-        Runtime: O(n)
+        Runtime: O(log(n))
 
         >>> q = QuadTree((50, 50))
         >>> q.insert('a', (25, 25))
@@ -460,75 +704,26 @@ class QuadTree(Tree):
         >>> 'b' in q
         False
         """
-        if self.is_empty():
-            return None
-        if self.is_leaf():
-            if self._name == name:
-                self._name = None
-                self._point = None
-        elif self._nw is not None and self._nw.is_leaf() and \
-                self._nw._name == name:
-            self._nw = None
-            self._remove_promoter()
-        elif self._ne is not None and self._ne.is_leaf() and \
-                self._ne._name == name:
-            self._ne = None
-            self._remove_promoter()
-        elif self._sw is not None and self._sw.is_leaf() and \
-                self._sw._name == name:
-            self._sw = None
-            self._remove_promoter()
-        elif self._se is not None and self._se.is_leaf() and \
-                self._se._name == name:
-            self._se = None
-            self._remove_promoter()
-        else:
-            self._remove_helper(name)
-            if self.is_empty():
-                return None
-            else:
-                self._remove_promoter()
-
-    def _remove_helper(self, name: str) -> None:
-        """
-        Helper method for remove with parameter name.
-        """
-        if self._nw is not None and name in self._nw:
-            self._nw.remove(name)
-            if self._nw.is_empty():
-                self._nw = None
-            else:
-                self._nw._remove_promoter()
-        elif self._ne is not None and name in self._ne:
-            self._ne.remove(name)
-            if self._ne.is_empty():
-                self._ne = None
-            else:
-                self._ne._remove_promoter()
-        elif self._sw is not None and name in self._sw:
-            self._sw.remove(name)
-            if self._sw.is_empty():
-                self._sw = None
-            else:
-                self._sw._remove_promoter()
-        elif self._se is not None and name in self._se:
-            self._se.remove(name)
-            if self._se.is_empty():
-                self._se = None
-            else:
-                self._se._remove_promoter()
+        point = self._find_point(name)
+        if point is not None:
+            self.remove_point(point)
 
     def _remove_promoter(self) -> None:
         """
-        Helper method for promoting when removing from a tree with single
-        subtree.
+        Helper method for merging the subtrees of <self> back into a leaf once
+        they hold no more players than a leaf can.
         """
-        subtrees = [self._nw, self._ne, self._sw, self._se]
-        while None in subtrees:
-            subtrees.remove(None)
-        if len(subtrees) == 1 and subtrees[0].is_leaf():
-            self._name = subtrees[0]._name
-            self._point = subtrees[0]._point
+        subtrees = [subtree for subtree in [self._nw, self._ne, self._sw,
+                                            self._se] if subtree is not None]
+        players = 0
+        for subtree in subtrees:
+            if not subtree.is_leaf():
+                return None
+            players += len(subtree._points)
+        if players <= self._capacity:
+            for subtree in subtrees:
+                self._names.extend(subtree._names)
+                self._points.extend(subtree._points)
             self._nw = None
             self._ne = None
             self._sw = None
@@ -549,63 +744,32 @@ class QuadTree(Tree):
         >>> q.contains_point((75, 75))
         False
         """
-        if self.is_empty():
-            return None
-        elif self.is_leaf():
-            if self._point == point:
-                self._name = None
-                self._point = None
-        elif self._nw is not None and self._nw.is_leaf() and \
-                self._nw._point == point:
-            self._nw = None
-            self._remove_promoter()
-        elif self._ne is not None and self._ne.is_leaf() and \
-                self._ne._point == point:
-            self._ne = None
-            self._remove_promoter()
-        elif self._sw is not None and self._sw.is_leaf() and \
-                self._sw._point == point:
-            self._sw = None
-            self._remove_promoter()
-        elif self._se is not None and self._se.is_leaf() and \
-                self._se._point == point:
-            self._se = None
-            self._remove_promoter()
-        else:
-            self._remove_point_helper(point)
-            if self.is_empty():
+        if self._index is not None:
+            name = self._find_name(point)
+            if name is None:
                 return None
-            else:
-                self._remove_promoter()
+            self._index.pop(name, None)
+        self._remove_point_helper(point)
 
     def _remove_point_helper(self, point: Tuple[int, int]) -> None:
         """
-        Helper method for remove_point with parameter point.
+        Helper method for remove_point with parameter point. The index of the
+        tree is left untouched.
         """
-        if point[0] <= self._centre[0] and point[1] <= self._centre[1]:  # NW
-            self._nw.remove_point(point)
-            if self._nw.is_empty():
-                self._nw = None
-            else:
-                self._nw._remove_promoter()
-        elif point[0] <= self._centre[0]:  # SW
-            self._sw.remove_point(point)
-            if self._sw.is_empty():
-                self._sw = None
-            else:
-                self._sw._remove_promoter()
-        elif point[1] <= self._centre[1]:  # NE
-            self._ne.remove_point(point)
-            if self._ne.is_empty():
-                self._ne = None
-            else:
-                self._ne._remove_promoter()
-        elif point[1] > self._centre[1]:  # SE
-            self._se.remove_point(point)
-            if self._se.is_empty():
-                self._se = None
-            else:
-                self._se._remove_promoter()
+        if self.is_leaf():
+            if point in self._points:
+                i = self._points.index(point)
+                del self._names[i]
+                del self._points[i]
+            return None
+        region = self._find_region(point)
+        subtree = self._region_subtree(region)
+        if subtree is not None:
+            subtree._remove_point_helper(point)
+            if subtree.is_empty():
+                self._insert_region_at(region, None)
+            self._remove_promoter()
+            self._refresh()
 
     def move(self, name: str, direction: str, steps: int) -> \
             Optional[Tuple[int, int]]:
@@ -619,7 +783,7 @@ class QuadTree(Tree):
         exactly the same coordinates of another player in the Tree
         (before moving the player).
 
-        Runtime: O(n)
+        Runtime: O(log(n))
 
         === precondition ===
         direction in ['N', 'S', 'E', 'W']
@@ -634,54 +798,28 @@ class QuadTree(Tree):
         >>> q.contains_point((25, 25))
         False
         """
-        if self.is_empty():
-            return None
-        elif self.is_leaf():
-            if self._name == name:
-                new_point = _calc_point(self._point, direction, steps)
-                if not (new_point[0] <= 2 * self._centre[0] and
-                        new_point[1] <= 2 * self._centre[1]) \
-                        or self.contains_point(new_point):
-                    raise OutOfBoundsError
-                else:
-                    self._point = new_point
-                    return self._point
-            return None
-        else:
-            point = self._find_point(name)
-            if point is not None:
-                new_point = _calc_point(point, direction, steps)
-                if not (new_point[0] <= 2 * self._centre[0] and
-                        new_point[1] <= 2 * self._centre[1]) \
-                        or self.contains_point(new_point):
-                    raise OutOfBoundsError
-                self.remove_point(point)
-                self.insert(name, new_point)
-                return new_point
+        point = self._find_point(name)
+        if point is None:
             return None
+        return self.move_point(point, direction, steps)
 
     def _find_point(self, name: str) -> Optional[Tuple[int, int]]:
         """
         Return the coordinates of the <name> in self.
         """
-        if self.is_empty():
-            return None
+        if self._index is not None:
+            return self._index.get(name)
         elif self.is_leaf():
-            if self._name == name:
-                return self._point
-            else:
-                return None
+            if name in self._names:
+                return self._points[self._names.index(name)]
+            return None
         else:
-            if self._nw is not None and name in self._nw:
-                return self._nw._find_point(name)
-            elif self._ne is not None and name in self._ne:
-                return self._ne._find_point(name)
-            elif self._sw is not None and name in self._sw:
-                return self._sw._find_point(name)
-            elif self._se is not None and name in self._se:
-                return self._se._find_point(name)
-            else:
-                return None
+            for subtree in [self._nw, self._ne, self._sw, self._se]:
+                if subtree is not None:
+                    point = subtree._find_point(name)
+                    if point is not None:
+                        return point
+            return None
 
     def move_point(self, point: Tuple[int, int], direction: str, steps: int) ->\
             Optional[Tuple[int, int]]:
@@ -716,120 +854,252 @@ class QuadTree(Tree):
         """
         if self.is_empty():
             return None
-        elif self.is_leaf():
-            if self._point == point:
-                new_point = _calc_point(self._point, direction, steps)
-                if (not (new_point[0] <= 2 * self._centre[0] and
-                         new_point[1] <= 2 * self._centre[1])) or \
-                        self.contains_point(new_point):
-                    raise OutOfBoundsError
-                else:
-                    self._point = new_point
-                    return self._point
+        new_point = _calc_point(point, direction, steps)
+        corners = self._root_corners()
+
+        # walk down while the old and the new point share a quadrant
+        node = self
+        path = []
+        while not node.is_leaf() and \
+                node._find_region(point) == node._find_region(new_point):
+            region = node._find_region(point)
+            subtree = node._region_subtree(region)
+            if subtree is None:
+                return None
+            node._corner_helper(region, corners)
+            path.append(node)
+            node = subtree
+
+        name = node._find_name(point)
+        if name is None:
             return None
-        elif self.contains_point(point):
-            new_point = _calc_point(point, direction, steps)
-            if not (new_point[0] <= 2 * self._centre[0] and
-                    new_point[1] <= 2 * self._centre[1]) \
-                    or self.contains_point(new_point):
+        elif not self._in_bounds(new_point):
+            raise OutOfBoundsError
+        elif node.is_leaf():
+            # the players of the leaf are the only ones in its quadrant, so the
+            # new point can only collide with one of them, itself included
+            if new_point in node._points:
                 raise OutOfBoundsError
-            name = self._find_name(point)
-            if name is not None:
-                self.remove_point(point)
-                self.insert(name, new_point)
-                return new_point
-            else:
-                return None
+            node._points[node._points.index(point)] = new_point
+        elif node.contains_point(new_point):
+            raise OutOfBoundsError
         else:
-            return None
+            # <node> is the lowest common ancestor of both points
+            node._insert_helper(name, new_point, corners)
+            node._remove_point_helper(point)
+            for ancestor in reversed(path):
+                ancestor._refresh()
+        if self._index is not None:
+            self._index[name] = new_point
+        return new_point
+
+    def move_many(self, moves: Iterable[Tuple[str, str, int]]) -> \
+            Tuple[Dict[str, Tuple[int, int]], List[Tuple[str, str, int]]]:
+        """ Move players by every (name, direction, steps) in <moves>, in
+        order, as if move had been called for each of them.
+
+        Return a dictionary mapping the name of every player that moved to its
+        new location, and a list of the moves that were rejected because they
+        would have raised an OutOfBoundsError. Moves of players that are not
+        in this tree are ignored.
+
+        Runtime: O(k * log(n)) for k moves
+
+        === precondition ===
+        every direction is in ['N', 'S', 'E', 'W']
+
+        >>> q = QuadTree((50, 50))
+        >>> q.insert('a', (25, 35))
+        >>> q.insert('b', (25, 45))
+        >>> q.move_many([('a', 'N', 10), ('b', 'N', 10), ('b', 'E', 90)])
+        ({'a': (25, 25), 'b': (25, 35)}, [('b', 'E', 90)])
+        """
+        locations = {}
+        rejected = []
+        for name, direction, steps in moves:
+            point = self._find_point(name)
+            if point is None:
+                continue
+            # out of bounds moves are rejected before any descent
+            if not self._in_bounds(_calc_point(point, direction, steps)):
+                rejected.append((name, direction, steps))
+                continue
+            try:
+                locations[name] = self.move_point(point, direction, steps)
+            except OutOfBoundsError:
+                rejected.append((name, direction, steps))
+        return locations, rejected
 
     def _find_name(self, point: Tuple[int, int]) -> Optional[str]:
         """
         Return the point at <point>.
         """
-        if self.is_empty():
+        if self.is_leaf():
+            if point in self._points:
+                return self._names[self._points.index(point)]
             return None
-        elif self.is_leaf():
-            if self._point == point:
-                return self._name
-            else:
-                return None
         else:
             if point[0] <= self._centre[0] and point[1] <= self._centre[1]:
                 # NW
-                return self._nw._find_name(point)
+                return self._nw._find_name(point) \
+                    if self._nw is not None else None
             elif point[0] <= self._centre[0]:  # SW
-                return self._sw._find_name(point)
+                return self._sw._find_name(point) \
+                    if self._sw is not None else None
             elif point[1] <= self._centre[1]:  # NE
-                return self._ne._find_name(point)
-            elif point[1] > self._centre[1]:  # SE
-                return self._se._find_name(point)
-            else:
-                return None
+                return self._ne._find_name(point) \
+                    if self._ne is not None else None
+            else:  # SE
+                return self._se._find_name(point) \
+                    if self._se is not None else None
 
-    def names_in_range(self, point: Tuple[int, int], direction: str,
-                       distance: int) -> List[str]:
-        """ Return a list of names of players whose location is in the
-        <direction> relative to <point> and whose location is within <distance>
-        along both the x and y axis.
+    def query_rect(self, x0: int, y0: int, x1: int, y1: int) -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player inside the rectangle
+        with north west corner (<x0>, <y0>) and south east corner (<x1>, <y1>),
+        borders included.
 
-        For example: names_in_range((100, 100), 'SE', 10) should return the
-        names of all the players south east of (100, 100) and within 10 steps in
-        either direction. In other words, find all players whose location is in
-        the box with corners at:
-        (100, 100) (110, 100) (100, 110) (110, 110)
+        Runtime: faster than O(n) when the rectangle is small
 
-        Runtime: faster than O(n) when distance is small
+        >>> q = QuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> list(q.query_rect(20, 20, 80, 70))
+        [('a', (25, 25))]
+        """
+        return _search(self, type(self)._expand,
+                       lambda rect: rect[0] <= x1 and x0 <= rect[2] and
+                       rect[1] <= y1 and y0 <= rect[3])
+
+    def query_radius(self, point: Tuple[int, int], r: int,
+                     metric: str = 'manhattan') -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player whose distance to
+        <point>, measured with <metric>, is at most <r>.
+
+        Runtime: faster than O(n) when <r> is small
 
         === precondition ===
-        direction in ['NE', 'SE', 'NE', 'SW']
+        metric in ['manhattan', 'chebyshev']
 
         >>> q = QuadTree((50, 50))
         >>> q.insert('a', (25, 25))
         >>> q.insert('b', (75, 75))
-        >>> q.names_in_range((40, 40), 'NW', 20)
-        ['a']
+        >>> list(q.query_radius((50, 50), 49))
+        []
+        >>> list(q.query_radius((50, 50), 25, 'chebyshev'))
+        [('a', (25, 25)), ('b', (75, 75))]
         """
-        if self.is_empty():
-            return []
-        elif self.is_leaf():
-            x_range, y_range = _find_xy_range(point, direction, distance)
-            if ((min(x_range) <= self._point[0] <= max(x_range) and
-                 min(y_range) <= self._point[1] <= max(y_range))):
-                return [self._name]
-            else:
-                return []
-        else:
-            players = []
-            x_range, y_range = _find_xy_range(point, direction, distance)
-
-            nw = (min(x_range), min(y_range))
-            ne = (max(x_range), min(y_range))
-            sw = (min(x_range), max(y_range))
-            se = (max(x_range), max(y_range))
-
-            if self._nw is not None and \
-                    nw[0] <= self._centre[0] and nw[1] <= self._centre[1]:  # NW
-                players.extend(self._nw.names_in_range(point,
-                                                       direction, distance))
-            if self._sw is not None and \
-                    sw[0] <= self._centre[0] and sw[1] > self._centre[1]:  # SW
-                players.extend(self._sw.names_in_range(point,
-                                                       direction, distance))
-            if self._ne is not None and \
-                    ne[0] > self._centre[0] and ne[1] <= self._centre[1]:  # NE
-                players.extend(self._ne.names_in_range(point,
-                                                       direction, distance))
-            if self._se is not None and \
-                    se[1] > self._centre[0] and se[1] > self._centre[1]:  # SE
-                players.extend(self._se.names_in_range(point,
-                                                       direction, distance))
-            return players
+        return _search(self, type(self)._expand,
+                       lambda rect: _distance(point, rect, metric) <= r)
+
+    def find_collisions(self, radius: int, metric: str = 'manhattan') -> \
+            List[Tuple[str, str]]:
+        """ Return every pair of names of players whose distance to each other,
+        measured with <metric>, is at most <radius>. Each pair is ordered, and
+        the pairs are sorted.
+
+        Runtime: O(n * log(n)) when few players are within <radius> of each
+        other
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> q = QuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (26, 25))
+        >>> q.insert('c', (25, 27))
+        >>> q.find_collisions(1)
+        [('a', 'b')]
+        >>> q.find_collisions(2, 'chebyshev')
+        [('a', 'b'), ('a', 'c'), ('b', 'c')]
+        """
+        return _find_collisions(self, type(self)._expand, radius, metric)
+
+    def names_in_range(self, point: Tuple[int, int], direction: str,
+                       distance: int) -> List[str]:
+        """ Return a list of names of players whose location is in the
+        <direction> relative to <point> and whose location is within <distance>
+        along both the x and y axis.
+
+        For example: names_in_range((100, 100), 'SE', 10) should return the
+        names of all the players south east of (100, 100) and within 10 steps in
+        either direction. In other words, find all players whose location is in
+        the box with corners at:
+        (100, 100) (110, 100) (100, 110) (110, 110)
+
+        Runtime: faster than O(n) when distance is small
+
+        === precondition ===
+        direction in ['NE', 'SE', 'NE', 'SW']
+
+        >>> q = QuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.names_in_range((40, 40), 'NW', 20)
+        ['a']
+        """
+        x_range, y_range = _find_xy_range(point, direction, distance)
+        return [name for name, _ in self.query_rect(min(x_range), min(y_range),
+                                                    max(x_range), max(y_range))]
+
+    def nearest(self, point: Tuple[int, int], k: int,
+                filter: Optional[Set[str]] = None,
+                metric: str = 'manhattan') -> List[Tuple[str, Tuple[int, int]]]:
+        """ Return the names and locations of the <k> players closest to
+        <point>, closest first. Players at the same distance are ordered by
+        location. Only players whose name is in <filter> are considered, unless
+        <filter> is None.
+
+        Distances are measured with <metric>, either 'manhattan' or
+        'chebyshev'.
+
+        Runtime: O(log(n) + k) for evenly spread players
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> q = QuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.insert('c', (60, 40))
+        >>> q.nearest((50, 50), 2)
+        [('c', (60, 40)), ('a', (25, 25))]
+        >>> q.nearest((50, 50), 2, metric='chebyshev')
+        [('c', (60, 40)), ('a', (25, 25))]
+        >>> q.nearest((50, 50), 5, filter={'b'})
+        [('b', (75, 75))]
+        """
+        return _nearest(self, type(self)._expand, point, k, filter,
+                        metric)
+
+    def _expand(self, rect: Tuple[float, float, float, float]) -> \
+            Tuple[List[Tuple[str, Tuple[int, int]]],
+                  List[Tuple[QuadTree, Tuple[float, float, float, float]]]]:
+        """
+        Helper method for nearest and the range queries.
+        Return the players stored in <self>, and every subtree of <self>
+        paired with the rectangle it covers inside <rect>, the rectangle
+        covered by <self>.
+        """
+        if self.is_leaf():
+            return list(zip(self._names, self._points)), []
+        x0, y0, x1, y1 = rect
+        x, y = min(max(self._centre[0], x0), x1), min(max(self._centre[1], y0),
+                                                       y1)
+        subtrees = []
+        for subtree, sub_rect in [(self._nw, (x0, y0, x, y)),
+                                  (self._ne, (x, y0, x1, y)),
+                                  (self._sw, (x0, y, x, y1)),
+                                  (self._se, (x, y, x1, y1))]:
+            if subtree is not None:
+                subtrees.append((subtree, sub_rect))
+        return [], subtrees
 
     def size(self) -> int:
         """ Return the number of nodes in <self>
 
-        Runtime: O(n)
+        Runtime: O(1)
 
         >>> q = QuadTree((50, 50))
         >>> q.size()
@@ -839,15 +1109,7 @@ class QuadTree(Tree):
         >>> q.size()
         3
         """
-        if self.is_empty():
-            return 1
-        elif self.is_leaf():
-            return 1
-        else:
-            return 1 + (self._ne.size() if self._ne is not None else 0)\
-                   + (self._nw.size() if self._nw is not None else 0)\
-                   + (self._se.size() if self._se is not None else 0)\
-                   + (self._sw.size() if self._sw is not None else 0)
+        return self._size
 
     def height(self) -> int:
         """ Return the height of <self>
@@ -855,7 +1117,7 @@ class QuadTree(Tree):
         Height is measured as the number of nodes in the path from the root of
         this tree to the node at the greatest depth in this tree.
 
-        Runtime: O(n)
+        Runtime: O(1)
 
         >>> q = QuadTree((50, 50))
         >>> q.insert('a', (25, 25))
@@ -863,15 +1125,7 @@ class QuadTree(Tree):
         >>> q.height()
         2
         """
-        if self.is_empty():
-            return 1
-        elif self.is_leaf():
-            return 1
-        else:
-            return 1 + max([self._ne.height() if self._ne is not None else 0,
-                            self._nw.height() if self._nw is not None else 0,
-                            self._se.height() if self._se is not None else 0,
-                            self._sw.height() if self._sw is not None else 0])
+        return self._height
 
     def depth(self, tree: Tree) -> Optional[int]:
         """Return the depth of the subtree <tree> relative to <self>. Return
@@ -880,10 +1134,8 @@ class QuadTree(Tree):
         Runtime: O(log(n))
         >>> q = QuadTree((50, 50))
         >>> q.insert('a', (25, 25))
-        >>> b = QuadTree((75, 75))
-        >>> b._name = 'b'
-        >>> b._point = (75, 75)
-        >>> q._se = b
+        >>> q.insert('b', (75, 75))
+        >>> b = q._se
         >>> q.depth(b)
         1
         >>> q.depth(q)
@@ -947,7 +1199,7 @@ class QuadTree(Tree):
 
         Runtime: O(1)
         """
-        return self._name is None and self.is_leaf()
+        return not self._names and self.is_leaf()
 
 
 def _calc_point(point: Tuple[int, int], direction: str, steps: int) -> \
@@ -965,6 +1217,137 @@ def _calc_point(point: Tuple[int, int], direction: str, steps: int) -> \
         return point[0] + steps, point[1]
 
 
+def _distance(point: Tuple[int, int], rect: Tuple[float, float, float, float],
+              metric: str) -> float:
+    """
+    Return the distance between <point> and the closest point of <rect>, given
+    as (west, north, east, south), measured with <metric>.
+    """
+    dx = max(rect[0] - point[0], 0, point[0] - rect[2])
+    dy = max(rect[1] - point[1], 0, point[1] - rect[3])
+    return dx + dy if metric == 'manhattan' else max(dx, dy)
+
+
+def _search(root: object, expand: Callable[[object, tuple], tuple],
+            overlaps: Callable[[Tuple[float, float, float, float]], bool]) -> \
+        Iterator[Tuple[str, Tuple[int, int]]]:
+    """
+    Helper for the range queries of every tree.
+    Yield every player under the node <root> whose location, seen as a
+    rectangle of size zero, <overlaps>, opening only the subtrees whose
+    rectangle <overlaps>. <expand> is the _expand method of the tree, called
+    with a node and the rectangle it covers.
+    """
+    infinity = float('inf')
+    stack = [(root, (-infinity, -infinity, infinity, infinity))]
+    while stack:
+        subtree, rect = stack.pop()
+        players, subtrees = expand(subtree, rect)
+        for player in players:
+            if overlaps((player[1][0], player[1][1], player[1][0],
+                         player[1][1])):
+                yield player
+        for sub, sub_rect in reversed(subtrees):
+            if overlaps(sub_rect):
+                stack.append((sub, sub_rect))
+
+
+def _nearest(root: object, expand: Callable[[object, tuple], tuple],
+             point: Tuple[int, int], k: int, names: Optional[Set[str]],
+             metric: str) -> List[Tuple[str, Tuple[int, int]]]:
+    """
+    Helper for the nearest method of every tree.
+    Visit the subtrees under the node <root>, opened with <expand>, best
+    first, by the distance between <point> and the rectangle each one covers,
+    so that players come out of the queue closest first and subtrees further
+    than the k-th player are never opened.
+    """
+    nearest = []
+    infinity = float('inf')
+    # entries are (distance, 0, (), counter, subtree, rectangle) for subtrees
+    # and (distance, 1, location, counter, name, None) for players
+    queue = [(0, 0, (), 0, root, (-infinity, -infinity, infinity, infinity))]
+    counter = 1
+    while queue and len(nearest) < k:
+        _, kind, location, _, item, rect = heapq.heappop(queue)
+        if kind == 1:
+            nearest.append((item, location))
+            continue
+        players, subtrees = expand(item, rect)
+        for player in players:
+            if names is None or player[0] in names:
+                p = player[1]
+                heapq.heappush(queue, (_distance(point,
+                                                 (p[0], p[1], p[0], p[1]),
+                                                 metric),
+                                       1, p, counter, player[0], None))
+                counter += 1
+        for subtree, sub_rect in subtrees:
+            heapq.heappush(queue, (_distance(point, sub_rect, metric), 0, (),
+                                   counter, subtree, sub_rect))
+            counter += 1
+    return nearest
+
+
+def _gap(rect1: Tuple[float, float, float, float],
+         rect2: Tuple[float, float, float, float], metric: str) -> float:
+    """
+    Return the distance between the closest points of <rect1> and <rect2>
+    measured with <metric>.
+    """
+    dx = max(rect1[0] - rect2[2], 0, rect2[0] - rect1[2])
+    dy = max(rect1[1] - rect2[3], 0, rect2[1] - rect1[3])
+    return dx + dy if metric == 'manhattan' else max(dx, dy)
+
+
+def _find_collisions(root: object, expand: Callable[[object, tuple], tuple],
+                     radius: int, metric: str) -> List[Tuple[str, str]]:
+    """
+    Helper for the find_collisions method of every tree.
+    Join the node <root>, opened with <expand>, with itself in one traversal:
+    a subtree is paired with itself and with every sibling whose rectangle is
+    within <radius> of its own, and a pair of disjoint parts is only opened
+    while their rectangles are still within <radius> of each other.
+    """
+    def expand_part(part: tuple) -> List[tuple]:
+        # a part is (subtree, rectangle) or (player, rectangle of size zero),
+        # and players are the only parts stored as (name, location) tuples
+        if isinstance(part[0], tuple):
+            return [part]
+        players, subtrees = expand(part[0], part[1])
+        parts = list(subtrees)
+        for player in players:
+            p = player[1]
+            parts.append((player, (p[0], p[1], p[0], p[1])))
+        return parts
+
+    collisions = []
+    infinity = float('inf')
+    selves = [(root, (-infinity, -infinity, infinity, infinity))]
+    pairs = []
+    while selves or pairs:
+        if selves:
+            parts = expand_part(selves.pop())
+            for i in range(len(parts)):
+                if not isinstance(parts[i][0], tuple):
+                    selves.append(parts[i])
+                for j in range(i + 1, len(parts)):
+                    if _gap(parts[i][1], parts[j][1], metric) <= radius:
+                        pairs.append((parts[i], parts[j]))
+        else:
+            part1, part2 = pairs.pop()
+            if isinstance(part1[0], tuple) and isinstance(part2[0], tuple):
+                collisions.append(tuple(sorted([part1[0][0], part2[0][0]])))
+                continue
+            if isinstance(part1[0], tuple):
+                part1, part2 = part2, part1
+            for part in expand_part(part1):
+                if _gap(part[1], part2[1], metric) <= radius:
+                    pairs.append((part, part2))
+    collisions.sort()
+    return collisions
+
+
 def _find_xy_range(point: Tuple[int, int], direction: str, distance: int) -> \
         Tuple[Tuple[int, int], Tuple[int, int]]:
     """
@@ -981,6 +1364,38 @@ def _find_xy_range(point: Tuple[int, int], direction: str, distance: int) -> \
     return (point[0], final[0]), (point[1], final[1])
 
 
+def _check_items(tree: Tree, items: List[Tuple[str, Tuple[int, int]]]) -> \
+        None:
+    """
+    Raise an OutOfBoundsError naming every player in <items> whose point is out
+    of the bounds of <tree> or shared with another player in <items>.
+    """
+    offending = []
+    owners = {}
+    for name, point in items:
+        if not tree._in_bounds(point):
+            offending.append(name)
+        elif point in owners:
+            if owners[point] not in offending:
+                offending.append(owners[point])
+            offending.append(name)
+        else:
+            owners[point] = name
+    if offending:
+        raise OutOfBoundsError(offending)
+
+
+def _quad_subtree(centre: Tuple[int, int], capacity: int) -> QuadTree:
+    """
+    Return a new empty QuadTree with centre <centre> and leaves holding up to
+    <capacity> players to be used as a subtree. Subtrees do not keep an index
+    of their own.
+    """
+    tree = QuadTree(centre, capacity)
+    tree._index = None
+    return tree
+
+
 class TwoDTree(Tree):
     """
     A TwoDTree. Concrete implementation of Tree.
@@ -998,8 +1413,18 @@ class TwoDTree(Tree):
     section of the rectangle
     _split_type: a string indicating whether this rectangle should be split
     vertically or horizontally
+    _index: a dictionary mapping the name of every player stored in the tree to
+    its point. Only the root of the tree keeps an index, it is None for every
+    subtree
+    _size: the number of nodes in this tree
+    _height: the height of this tree
+    _alpha: the balance factor of a self-balancing tree, or None if the tree
+    is only balanced by balance. Only the root of the tree keeps it, it is None
+    for every subtree
 
     === Representation Invariants ===
+    - _size and _height are those of the subtrees of the tree, plus one
+    - if _alpha is not None, then 0.75 <= _alpha < 1
     - all nodes must have _name and _point attributes unless they have no
     descendants and no parents.
     - a node with no parents must have a _split_type == 'x'
@@ -1027,15 +1452,36 @@ class TwoDTree(Tree):
     _lt: Optional[TwoDTree]
     _gt: Optional[TwoDTree]
     _split_type: str
+    _index: Optional[Dict[str, Tuple[int, int]]]
+    _size: int
+    _height: int
+    _alpha: Optional[float]
 
     def __init__(self, nw: Optional[Tuple[int, int]],
-                 se: Optional[Tuple[int, int]]) -> None:
+                 se: Optional[Tuple[int, int]],
+                 alpha: Optional[float] = None) -> None:
         """Initialize a new Tree instance with <nw> and <se>.
 
+        If <alpha> is not None, the tree balances itself in the style of a
+        scapegoat tree: whenever a change leaves a subtree of m nodes taller
+        than log(m) / log(1 / <alpha>) + 2, a subtree on the way to it is
+        rebuilt by splitting at the median point. Operations then take
+        O(log(n)) amortized time even when the points arrive in sorted order,
+        without ever calling balance. Bigger values of <alpha> rebuild less
+        often, for a taller tree.
+
+        Points sharing a coordinate along a split all go to its _lt subtree, so
+        a tree built by median splits can be up to 2 * log2(n) + 1 tall. An
+        <alpha> of at least 0.75 leaves room above that for the rebuilds to
+        pay off.
+
         Runtime: O(1)
 
+        === Precondition ===
+        alpha is None or 0.75 <= alpha < 1
+
         >>> t1 = TwoDTree((0, 0), (100, 100))
-        >>> t2 = TwoDTree((0, 0), (200, 200))
+        >>> t2 = TwoDTree((0, 0), (200, 200), alpha=0.75)
         """
         self._name = None
         self._point = None
@@ -1044,55 +1490,156 @@ class TwoDTree(Tree):
         self._lt = None
         self._gt = None
         self._split_type = 'x'
+        self._index = {} if nw is not None else None
+        self._size = 1
+        self._height = 1
+        self._alpha = alpha
+
+    @classmethod
+    def from_points(cls, nw: Tuple[int, int], se: Tuple[int, int],
+                    items: Iterable[Tuple[str, Tuple[int, int]]],
+                    alpha: Optional[float] = None) -> TwoDTree:
+        """ Return a new balanced TwoDTree with corners <nw> and <se> storing
+        every (name, point) pair in <items>, which balances itself with
+        <alpha> if it is not None.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players share the same point.
+
+        Runtime: O(n * log(n))
+
+        >>> t = TwoDTree.from_points((0, 0), (100, 100),
+        ...                          [('a', (10, 10)), ('b', (20, 20)),
+        ...                           ('c', (30, 30))])
+        >>> t._name
+        'b'
+        >>> t.height()
+        2
+        """
+        tree = cls(nw, se, alpha)
+        tree.insert_many(items)
+        return tree
 
     def balance(self) -> None:
         """ Balance <self> so that there is at most a difference of 1 between
         the size of the _lt subtree and the size of the _gt subtree for all
         trees in <self>.
 
+        The tree is rebuilt from scratch by splitting at the median point.
+
+        Runtime: O(n * log(n))
+
         === Precondition ===
         It is possible to balance this tree
 
         >>> t = TwoDTree((0, 0), (100, 100))
         >>> t.balance()
         """
-        lt_size = self._lt.size() if self._lt is not None else 0
-        gt_size = self._gt.size() if self._gt is not None else 0
+        if not self.is_empty():
+            self._rebuild(self._collect_all_nodes_info())
 
-        while abs(lt_size - gt_size) > 1:
-            if lt_size > gt_size:
-                self._remove_root_request('promote_left')
+    def _rebuild(self, items: List[Tuple[str, Tuple[int, int]]]) -> None:
+        """
+        Helper for from_points and balance.
+        Replace the content of <self> by a balanced tree of <items>.
+        """
+        self._name = None
+        self._point = None
+        self._lt = None
+        self._gt = None
+        self._refresh()
+        if items:
+            by_x = sorted(items, key=lambda item: item[1])
+            by_y = sorted(items, key=lambda item: (item[1][1], item[1][0]))
+            if self._split_type == 'x':
+                self._build(by_x, by_y)
             else:
-                self._remove_root_request('promote_right')
+                self._build(by_y, by_x)
+
+    def _build(self, primary: List[Tuple[str, Tuple[int, int]]],
+               secondary: List[Tuple[str, Tuple[int, int]]]) -> None:
+        """
+        Helper for _rebuild.
+        Fill the empty <self> with the points in <primary>, which are sorted
+        along the split of <self>. <secondary> holds the same points sorted
+        along the other axis.
+        """
+        axis = 0 if self._split_type == 'x' else 1
+        median = len(primary) // 2
+        # points tied with the median along the split must go to _lt
+        while median + 1 < len(primary) and \
+                primary[median + 1][1][axis] == primary[median][1][axis]:
+            median += 1
+        self._name, self._point = primary[median]
+
+        # splitting the secondary list keeps both halves sorted
+        lt_secondary = []
+        gt_secondary = []
+        for item in secondary:
+            if item[1][axis] > self._point[axis]:
+                gt_secondary.append(item)
+            elif item[1] != self._point:
+                lt_secondary.append(item)
+
+        child_split = 'y' if self._split_type == 'x' else 'x'
+        if lt_secondary:
+            self._lt = TwoDTree(None, None)
+            self._lt._split_type = child_split
+            self._lt._build(lt_secondary, primary[:median])
+        if gt_secondary:
+            self._gt = TwoDTree(None, None)
+            self._gt._split_type = child_split
+            self._gt._build(gt_secondary, primary[median + 1:])
+        self._refresh()
 
-            lt_size = self._lt.size() if self._lt is not None else 0
-            gt_size = self._gt.size() if self._gt is not None else 0
+    def _refresh(self) -> None:
+        """
+        Helper method for the methods changing the subtrees of <self>.
+        Recompute _size and _height from those of the subtrees of <self>.
+        """
+        lt_size, lt_height = (self._lt._size, self._lt._height) \
+            if self._lt is not None else (0, 0)
+        gt_size, gt_height = (self._gt._size, self._gt._height) \
+            if self._gt is not None else (0, 0)
+        self._size = 1 + lt_size + gt_size
+        self._height = 1 + max(lt_height, gt_height)
+
+    def _height_limit(self, size: int) -> int:
+        """
+        Helper method for _rebalance.
+        Return the greatest height allowed to a subtree of <size> nodes in the
+        self-balancing tree <self>.
 
-        if self._lt is not None:
-            self._lt.balance()
-        if self._gt is not None:
-            self._gt.balance()
+        """
+        return int(math.log(size) / math.log(1 / self._alpha)) + 2
 
-    def _remove_root_request(self, request: str) -> None:
+    def _rebalance(self) -> None:
         """
-        Helper for balance.
+        Helper method for the self-balancing mode, called on the root after
+        every change.
+        While <self> is taller than allowed, rebuild the lowest subtree on its
+        tallest path that is taller than allowed for its size.
         """
-        if request == 'promote_left':
-            replacement_info = self._lt._find_info('big_x')
-            self.remove_point(replacement_info[1])
-            self._name = replacement_info[0]
-            self._point = replacement_info[1]
-        else:
-            replacement_info = self._gt._find_info('small_x')
-            self.remove_point(replacement_info[1])
-            self._name = replacement_info[0]
-            self._point = replacement_info[1]
-        self._insert_helper(self._name, self._point)
+        while self._height > self._height_limit(self._size):
+            path = []
+            scapegoat = 0
+            node = self
+            while node is not None:
+                if node._height > self._height_limit(node._size):
+                    scapegoat = len(path)
+                path.append(node)
+                lt_height = node._lt._height if node._lt is not None else 0
+                gt_height = node._gt._height if node._gt is not None else 0
+                node = node._lt if lt_height >= gt_height else node._gt
+            tree = path[scapegoat]
+            tree._rebuild(tree._collect_all_nodes_info())
+            for ancestor in reversed(path[:scapegoat]):
+                ancestor._refresh()
 
     def __contains__(self, name: str) -> bool:
         """ Return True if a player named <name> is stored in this tree.
 
-        Runtime: O(n)
+        Runtime: O(1) on the root, O(n) on a subtree
 
         >>> t = TwoDTree((0, 0), (100, 100))
         >>> t.insert('a', (25, 25))
@@ -1104,7 +1651,9 @@ class TwoDTree(Tree):
         >>> 'c' in t
         False
         """
-        if self.is_empty():
+        if self._index is not None:
+            return name in self._index
+        elif self.is_empty():
             return False
         elif self.is_leaf():
             return self._name == name
@@ -1159,12 +1708,46 @@ class TwoDTree(Tree):
         >>> 'a' in t
         True
         """
-        if not (self._nw[0] <= point[0] <= self._se[0] and
-                self._nw[1] <= point[1] <= self._se[1]) or \
-                self.contains_point(point):
+        if not self._in_bounds(point) or self.contains_point(point):
             raise OutOfBoundsError
         else:
+            if self._index is not None and name in self._index:
+                # a name is stored once, so its old point is dropped
+                self.remove(name)
             self._insert_helper(name, point)
+            if self._index is not None:
+                self._index[name] = point
+            if self._alpha is not None:
+                self._rebalance()
+
+    def insert_many(self, items: Iterable[Tuple[str, Tuple[int, int]]]) -> \
+            None:
+        """Insert a player for every (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players would share the same point.
+
+        An empty tree is bulk loaded into a balanced tree, in which case
+        nothing is inserted when an OutOfBoundsError is raised. Otherwise the
+        players are inserted one at a time.
+
+        Runtime: O(n * log(n))
+
+        >>> t = TwoDTree((0, 0), (100, 100))
+        >>> t.insert_many([('a', (25, 25)), ('b', (75, 75))])
+        >>> 'b' in t
+        True
+        """
+        if not self.is_empty():
+            for name, point in items:
+                self.insert(name, point)
+            return None
+        # a name given twice keeps its last point
+        items = list(dict(items).items())
+        _check_items(self, items)
+        self._rebuild(items)
+        if self._index is not None:
+            self._index.update(items)
 
     def _insert_helper(self, name: str, point: Tuple[int, int]) -> None:
         """
@@ -1173,20 +1756,23 @@ class TwoDTree(Tree):
         if self.is_empty():
             self._name = name
             self._point = point
-        elif self.is_leaf():  # LEAF BASE CASE
-            self._insert_node_helper(name, point)
+            return None
+        elif (self._split_type == 'x' and point[0] <= self._point[0]) or \
+                (self._split_type == 'y' and point[1] <= self._point[1]):
+            if self._lt is not None:
+                self._lt._insert_helper(name, point)
+            else:
+                self._insert_node_helper(name, point)  # LEAF BASE CASE
+            subtree = self._lt
         else:
-            if (self._split_type == 'x' and point[0] <= self._point[0]) or \
-                    (self._split_type == 'y' and point[1] <= self._point[1]):
-                if self._lt is not None:
-                    self._lt._insert_helper(name, point)
-                else:
-                    self._insert_node_helper(name, point)  # HALF LEAF BASE CASE
+            if self._gt is not None:
+                self._gt._insert_helper(name, point)
             else:
-                if self._gt is not None:
-                    self._gt._insert_helper(name, point)
-                else:
-                    self._insert_node_helper(name, point)  # HALF LEAF BASE CASE
+                self._insert_node_helper(name, point)  # LEAF BASE CASE
+            subtree = self._gt
+        # the new point is the only one added below <self>
+        self._size += 1
+        self._height = max(self._height, subtree._height + 1)
 
     def _insert_node_helper(self, name: str, point: Tuple[int, int]) -> None:
         """
@@ -1208,7 +1794,7 @@ class TwoDTree(Tree):
     def remove(self, name: str) -> None:
         """ Remove information about a player named <name> from this tree.
 
-        Runtime: O(n)
+        Runtime: O(log(n))
 
         >>> t = TwoDTree((0, 0), (100, 100))
         >>> t.insert('a', (25, 25))
@@ -1220,7 +1806,12 @@ class TwoDTree(Tree):
         >>> t.is_empty()
         True
         """
-        if self.is_empty():
+        if self._index is not None:
+            point = self._index.get(name)
+            if point is not None:
+                self.remove_point(point)
+            return None
+        elif self.is_empty():
             return None
         elif self.is_leaf():
             if self._name == name:
@@ -1238,70 +1829,70 @@ class TwoDTree(Tree):
             self._lt.remove(name)
         elif self._gt is not None and name in self._gt:
             self._gt.remove(name)
+        self._refresh()
 
     def _remove_root(self) -> None:
         """
         Helper method for removing the root.
+        Replace the point of <self> by the biggest point of _lt along the split
+        of <self>, and remove that point from _lt in turn.
         """
-        if self._split_type == 'x':
-            if self._lt is not None:
-                replacement_info = self._lt._find_info('big_x')
-                self.remove_point(replacement_info[1])
-                self._name = replacement_info[0]
-                self._point = replacement_info[1]
-            else:
-                replacement_info = self._gt._find_info('small_x')
-                self.remove_point(replacement_info[1])
-                self._name = replacement_info[0]
-                self._point = replacement_info[1]
+        if self._lt is None:
+            # every remaining point is at most the biggest point of _gt along
+            # the split, so the whole _gt subtree can become the _lt subtree
+            self._lt, self._gt = self._gt, None
+        axis = 0 if self._split_type == 'x' else 1
+        replacement = self._lt._find_extreme(axis, True)
+        name, point = replacement._name, replacement._point
+        if self._lt.is_leaf():
+            self._lt = None
         else:
-            if self._lt is not None:
-                replacement_info = self._lt._find_info('big_y')
-                self.remove_point(replacement_info[1])
-                self._name = replacement_info[0]
-                self._point = replacement_info[1]
-            else:
-                replacement_info = self._gt._find_info('small_y')
-                self.remove_point(replacement_info[1])
-                self._name = replacement_info[0]
-                self._point = replacement_info[1]
-
-    def _find_info(self, request: str) -> Tuple[str, Tuple[int, int]]:
-        """
-        Helper method returning name and point of the requested tree.
-        """
-        nodes = self._collect_all_nodes_info()
-        if request == 'big_x':
-            request_points = [node[1][0] for node in nodes]
-            request_point = max(request_points)
-        elif request == 'small_x':
-            request_points = [node[1][0] for node in nodes]
-            request_point = min(request_points)
-        elif request == 'big_y':
-            request_points = [node[1][1] for node in nodes]
-            request_point = max(request_points)
+            self._lt._remove_point_helper(point)
+        self._name = name
+        self._point = point
+
+    def _find_extreme(self, axis: int, biggest: bool) -> TwoDTree:
+        """
+        Helper method for _remove_root and _can_move_to.
+        Return the node of <self> with the biggest coordinate along <axis> if
+        <biggest> is True, or with the smallest one otherwise. Of tied nodes,
+        the one visited first in preorder is returned.
+
+        Nodes split along <axis> only need one of their subtrees searched, so
+        only every other level of <self> is searched in full: O(sqrt(n)) for a
+        balanced tree.
+        """
+        if (self._split_type == 'x') == (axis == 0):
+            # _gt holds every point bigger than self along <axis>, and _lt
+            # every point at most as big
+            subtrees = [self._gt] if biggest else [self._lt]
         else:
-            request_points = [node[1][1] for node in nodes]
-            request_point = min(request_points)
-        return nodes[request_points.index(request_point)]
+            subtrees = [self._lt, self._gt]
+        best = self
+        for subtree in subtrees:
+            if subtree is not None:
+                candidate = subtree._find_extreme(axis, biggest)
+                if biggest and candidate._point[axis] > best._point[axis] or \
+                        not biggest and \
+                        candidate._point[axis] < best._point[axis]:
+                    best = candidate
+        return best
 
     def _collect_all_nodes_info(self) -> List[tuple]:
         """
-        Helper method for remove.
+        Helper method for balance.
         Return the name and point of all the nodes in the tree.
         """
-        if self.is_leaf():
-            return [(self._name, self._point)]
-        elif self._lt is not None and self._gt is not None:
-            return [(self._name, self._point)] + \
-                   self._lt._collect_all_nodes_info() + \
-                   self._gt._collect_all_nodes_info()
-        elif self._lt is not None:
-            return [(self._name, self._point)] + \
-                   self._lt._collect_all_nodes_info()
-        else:  # gt is not None
-            return [(self._name, self._point)] + \
-                   self._gt._collect_all_nodes_info()
+        nodes = []
+        stack = [self]
+        while stack:
+            tree = stack.pop()
+            nodes.append((tree._name, tree._point))
+            if tree._gt is not None:
+                stack.append(tree._gt)
+            if tree._lt is not None:
+                stack.append(tree._lt)
+        return nodes
 
     def remove_point(self, point: Tuple[int, int]) -> None:
         """ Remove information about a player at point <point> from this tree.
@@ -1318,6 +1909,20 @@ class TwoDTree(Tree):
         >>> t.is_empty()
         True
         """
+        if self._index is not None:
+            name = self._find_name(point)
+            if name is None:
+                return None
+            self._index.pop(name, None)
+        self._remove_point_helper(point)
+        if self._alpha is not None:
+            self._rebalance()
+
+    def _remove_point_helper(self, point: Tuple[int, int]) -> None:
+        """
+        Helper method for remove_point with parameter point. The index of the
+        tree is left untouched.
+        """
         if self.is_empty():
             return None
         elif self.is_leaf():
@@ -1333,13 +1938,14 @@ class TwoDTree(Tree):
                         self._lt._point == point:
                     self._lt = None
                 elif self._lt is not None:
-                    self._lt.remove_point(point)
+                    self._lt._remove_point_helper(point)
             else:
                 if self._gt is not None and self._gt.is_leaf() and \
                         self._gt._point == point:
                     self._gt = None
                 elif self._gt is not None:
-                    self._gt.remove_point(point)
+                    self._gt._remove_point_helper(point)
+        self._refresh()
 
     def move(self, name: str, direction: str, steps: int) -> \
             Optional[Tuple[int, int]]:
@@ -1353,7 +1959,7 @@ class TwoDTree(Tree):
         exactly the same coordinates of another player in the Tree
         (before moving the player).
 
-        Runtime: O(n)
+        Runtime: O(sqrt(n)) for a balanced tree, as for move_point
 
         === precondition ===
         direction in ['N', 'S', 'E', 'W']
@@ -1367,7 +1973,12 @@ class TwoDTree(Tree):
         >>> t.contains_point((75, 75))
         False
         """
-        if self.is_empty():
+        if self._index is not None:
+            point = self._index.get(name)
+            if point is None:
+                return None
+            return self.move_point(point, direction, steps)
+        elif self.is_empty():
             return None
         elif self.is_leaf():
             if self._name == name:
@@ -1398,22 +2009,19 @@ class TwoDTree(Tree):
         """
         Helper method for finding the name associated to a point in the tree.
         """
-        if self.is_empty():
+        if self._index is not None:
+            return self._index.get(name)
+        elif self.is_empty():
             return None
-        elif self.is_leaf():
-            if self._name == name:
-                return self._point
-            else:
-                return None
+        elif self._name == name:
+            return self._point
         else:
-            if self._name == name:
-                return self._point
-            elif self._lt is not None and name in self._lt:
-                return self._lt._find_point(name)
-            elif self._gt is not None and name in self._gt:
-                return self._gt._find_point(name)
-            else:
-                return None
+            for subtree in [self._lt, self._gt]:
+                if subtree is not None:
+                    point = subtree._find_point(name)
+                    if point is not None:
+                        return point
+            return None
 
     def move_point(self, point: Tuple[int, int], direction: str, steps: int) ->\
             Optional[Tuple[int, int]]:
@@ -1431,7 +2039,10 @@ class TwoDTree(Tree):
         should do the minimum amount of tree reorganization possible to move the
         given point properly.
 
-        Runtime: O(log(n))
+        Runtime: O(sqrt(n)) for a balanced tree, as keeping the player in an
+        internal node, or removing it from one, looks for the extreme point of
+        a subtree with _find_extreme. O(log(n)) if the player is in a leaf and
+        stays on the same side of every split above it.
 
         === precondition ===
         direction in ['N', 'S', 'E', 'W']
@@ -1447,33 +2058,126 @@ class TwoDTree(Tree):
         """
         if self.is_empty():
             return None
-        elif self.is_leaf():
-            if self._point == point:
-                new_point = _calc_point(self._point, direction, steps)
-                if not (self._nw[0] <= new_point[0] <= self._se[0] and
-                        self._nw[1] <= new_point[1] <= self._se[1]) or \
-                        self.contains_point(new_point):
-                    raise OutOfBoundsError
-                else:
-                    self._point = new_point
-                    return self._point
-            else:
-                return None
-        elif self.contains_point(point):
-            new_point = _calc_point(point, direction, steps)
-            if not (self._nw[0] <= new_point[0] <= self._se[0] and
-                    self._nw[1] <= new_point[1] <= self._se[1]) or \
-                    self.contains_point(new_point):
-                raise OutOfBoundsError
-            name = self._find_name(point)
-            if name is not None:
-                self.remove_point(point)
-                self.insert(name, new_point)
-                return new_point
-            else:
-                return None
-        else:
+        new_point = _calc_point(point, direction, steps)
+
+        # walk down to the node storing <point>, remembering the first node
+        # at which the old and the new point go to different subtrees
+        node = self
+        lca = None
+        path = []
+        collision = False
+        while node is not None and node._point != point:
+            collision = collision or node._point == new_point
+            goes_lt = node._goes_lt(point)
+            if lca is None and goes_lt != node._goes_lt(new_point):
+                lca = node
+            if lca is None:
+                path.append(node)
+            node = node._lt if goes_lt else node._gt
+        if node is None:
             return None
+        elif not self._in_bounds(new_point) or collision or \
+                new_point == point:
+            raise OutOfBoundsError
+
+        name = node._name
+        if lca is None and node._can_move_to(new_point):
+            node._point = new_point
+        else:
+            if lca is None:
+                lca = node
+            if lca.contains_point(new_point):
+                raise OutOfBoundsError
+            lca._remove_point_helper(point)
+            lca._insert_helper(name, new_point)
+            for ancestor in reversed(path):
+                ancestor._refresh()
+            if self._alpha is not None:
+                self._rebalance()
+        if self._index is not None:
+            self._index[name] = new_point
+        return new_point
+
+    def _in_bounds(self, point: Tuple[int, int]) -> bool:
+        """
+        Return True if <point> is inside the rectangle described by <self>.
+        """
+        return self._nw[0] <= point[0] <= self._se[0] and \
+            self._nw[1] <= point[1] <= self._se[1]
+
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """ Return the rectangle that players can be placed in on the field
+        described by <self>, as (west, north, east, south), edges included.
+
+        Runtime: O(1)
+
+        >>> TwoDTree((10, 20), (100, 200)).bounds()
+        (10, 20, 100, 200)
+        """
+        return self._nw[0], self._nw[1], self._se[0], self._se[1]
+
+    def _goes_lt(self, point: Tuple[int, int]) -> bool:
+        """
+        Return True if <point> belongs in the _lt subtree of <self>.
+        """
+        return (self._split_type == 'x' and point[0] <= self._point[0]) or \
+            (self._split_type == 'y' and point[1] <= self._point[1])
+
+    def _can_move_to(self, point: Tuple[int, int]) -> bool:
+        """
+        Return True if the point of <self> can be replaced by <point> without
+        breaking the invariants between <self> and its descendants, and without
+        colliding with any of them.
+        """
+        if self.is_leaf():
+            return True
+        axis = 0 if self._split_type == 'x' else 1
+        if point[axis] < self._point[axis] and self._lt is not None:
+            if self._lt._find_extreme(axis, True)._point[axis] > point[axis]:
+                return False
+        elif point[axis] > self._point[axis] and self._gt is not None:
+            if self._gt._find_extreme(axis, False)._point[axis] <= \
+                    point[axis]:
+                return False
+        subtree = self._lt if self._goes_lt(point) else self._gt
+        return subtree is None or not subtree.contains_point(point)
+
+    def move_many(self, moves: Iterable[Tuple[str, str, int]]) -> \
+            Tuple[Dict[str, Tuple[int, int]], List[Tuple[str, str, int]]]:
+        """ Move players by every (name, direction, steps) in <moves>, in
+        order, as if move had been called for each of them.
+
+        Return a dictionary mapping the name of every player that moved to its
+        new location, and a list of the moves that were rejected because they
+        would have raised an OutOfBoundsError. Moves of players that are not
+        in this tree are ignored.
+
+        Runtime: O(k * sqrt(n)) for k moves in a balanced tree
+
+        === precondition ===
+        every direction is in ['N', 'S', 'E', 'W']
+
+        >>> t = TwoDTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 35))
+        >>> t.insert('b', (25, 45))
+        >>> t.move_many([('a', 'N', 10), ('b', 'N', 10), ('b', 'E', 90)])
+        ({'a': (25, 25), 'b': (25, 35)}, [('b', 'E', 90)])
+        """
+        locations = {}
+        rejected = []
+        for name, direction, steps in moves:
+            point = self._find_point(name)
+            if point is None:
+                continue
+            # out of bounds moves are rejected before any descent
+            if not self._in_bounds(_calc_point(point, direction, steps)):
+                rejected.append((name, direction, steps))
+                continue
+            try:
+                locations[name] = self.move_point(point, direction, steps)
+            except OutOfBoundsError:
+                rejected.append((name, direction, steps))
+        return locations, rejected
 
     def _find_name(self, point: Tuple[int, int]) -> Optional[str]:
         """
@@ -1496,6 +2200,69 @@ class TwoDTree(Tree):
             return self._gt._find_name(point) \
                 if self._gt is not None else None
 
+    def query_rect(self, x0: int, y0: int, x1: int, y1: int) -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player inside the rectangle
+        with north west corner (<x0>, <y0>) and south east corner (<x1>, <y1>),
+        borders included.
+
+        Runtime: faster than O(n) when the rectangle is small
+
+        >>> t = TwoDTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 25))
+        >>> t.insert('b', (75, 75))
+        >>> list(t.query_rect(20, 20, 80, 70))
+        [('a', (25, 25))]
+        """
+        return _search(self, type(self)._expand,
+                       lambda rect: rect[0] <= x1 and x0 <= rect[2] and
+                       rect[1] <= y1 and y0 <= rect[3])
+
+    def query_radius(self, point: Tuple[int, int], r: int,
+                     metric: str = 'manhattan') -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player whose distance to
+        <point>, measured with <metric>, is at most <r>.
+
+        Runtime: faster than O(n) when <r> is small
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> t = TwoDTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 25))
+        >>> t.insert('b', (75, 75))
+        >>> list(t.query_radius((50, 50), 49))
+        []
+        >>> list(t.query_radius((50, 50), 25, 'chebyshev'))
+        [('a', (25, 25)), ('b', (75, 75))]
+        """
+        return _search(self, type(self)._expand,
+                       lambda rect: _distance(point, rect, metric) <= r)
+
+    def find_collisions(self, radius: int, metric: str = 'manhattan') -> \
+            List[Tuple[str, str]]:
+        """ Return every pair of names of players whose distance to each other,
+        measured with <metric>, is at most <radius>. Each pair is ordered, and
+        the pairs are sorted.
+
+        Runtime: O(n * log(n)) when few players are within <radius> of each
+        other
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> t = TwoDTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 25))
+        >>> t.insert('b', (26, 25))
+        >>> t.insert('c', (25, 27))
+        >>> t.find_collisions(1)
+        [('a', 'b')]
+        >>> t.find_collisions(2, 'chebyshev')
+        [('a', 'b'), ('a', 'c'), ('b', 'c')]
+        """
+        return _find_collisions(self, type(self)._expand, radius, metric)
+
     def names_in_range(self, point: Tuple[int, int], direction: str,
                        distance: int) -> List[str]:
         """ Return a list of names of players whose location is in the
@@ -1518,48 +2285,69 @@ class TwoDTree(Tree):
         >>> t.names_in_range((40, 40), 'NW', 20)
         ['a']
         """
-        if self.is_empty():
-            return []
-        elif self.is_leaf():
-            x_range, y_range = _find_xy_range(point, direction, distance)
-            if ((min(x_range) <= self._point[0] <= max(x_range) and
-                 min(y_range) <= self._point[1] <= max(y_range))):
-                return [self._name]
-            else:
-                return []
-        else:
-            players = []
-            x_range, y_range = _find_xy_range(point, direction, distance)
-
-            nw = (min(x_range), min(y_range))
-            ne = (max(x_range), min(y_range))
-            sw = (min(x_range), max(y_range))
+        x_range, y_range = _find_xy_range(point, direction, distance)
+        return [name for name, _ in self.query_rect(min(x_range), min(y_range),
+                                                    max(x_range), max(y_range))]
 
-            x_range, y_range = _find_xy_range(point, direction, distance)
-            if ((min(x_range) <= self._point[0] <= max(x_range) and
-                 min(y_range) <= self._point[1] <= max(y_range))):
-                players.append(self._name)
+    def nearest(self, point: Tuple[int, int], k: int,
+                filter: Optional[Set[str]] = None,
+                metric: str = 'manhattan') -> List[Tuple[str, Tuple[int, int]]]:
+        """ Return the names and locations of the <k> players closest to
+        <point>, closest first. Players at the same distance are ordered by
+        location. Only players whose name is in <filter> are considered, unless
+        <filter> is None.
 
-            if self._split_type == 'x':
-                if self._lt is not None and nw[0] <= self._point[0]:
-                    players.extend(self._lt.names_in_range(point,
-                                                           direction, distance))
-                if self._gt is not None and ne[0] >= self._point[0]:
-                    players.extend(self._gt.names_in_range(point,
-                                                           direction, distance))
-            else:
-                if self._lt is not None and nw[1] <= self._point[1]:
-                    players.extend(self._lt.names_in_range(point,
-                                                           direction, distance))
-                if self._gt is not None and sw[1] >= self._point[1]:
-                    players.extend(self._gt.names_in_range(point,
-                                                           direction, distance))
-            return players
+        Distances are measured with <metric>, either 'manhattan' or
+        'chebyshev'.
 
-    def size(self) -> int:
-        """ Return the number of nodes in <self>
+        Runtime: O(log(n) + k) for evenly spread players
 
-        Runtime: O(n)
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> t = TwoDTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 25))
+        >>> t.insert('b', (75, 75))
+        >>> t.insert('c', (60, 40))
+        >>> t.nearest((50, 50), 2)
+        [('c', (60, 40)), ('a', (25, 25))]
+        >>> t.nearest((50, 50), 2, metric='chebyshev')
+        [('c', (60, 40)), ('a', (25, 25))]
+        >>> t.nearest((50, 50), 5, filter={'b'})
+        [('b', (75, 75))]
+        """
+        return _nearest(self, type(self)._expand, point, k, filter,
+                        metric)
+
+    def _expand(self, rect: Tuple[float, float, float, float]) -> \
+            Tuple[List[Tuple[str, Tuple[int, int]]],
+                  List[Tuple[TwoDTree, Tuple[float, float, float, float]]]]:
+        """
+        Helper method for nearest and the range queries.
+        Return the player stored in <self>, if any, in a list, and every
+        subtree of <self> paired with the rectangle it covers inside <rect>, the
+        rectangle covered by <self>.
+        """
+        if self.is_empty():
+            return [], []
+        x0, y0, x1, y1 = rect
+        if self._split_type == 'x':
+            split = min(max(self._point[0], x0), x1)
+            lt_rect, gt_rect = (x0, y0, split, y1), (split, y0, x1, y1)
+        else:
+            split = min(max(self._point[1], y0), y1)
+            lt_rect, gt_rect = (x0, y0, x1, split), (x0, split, x1, y1)
+        subtrees = []
+        if self._lt is not None:
+            subtrees.append((self._lt, lt_rect))
+        if self._gt is not None:
+            subtrees.append((self._gt, gt_rect))
+        return [(self._name, self._point)], subtrees
+
+    def size(self) -> int:
+        """ Return the number of nodes in <self>
+
+        Runtime: O(1)
 
         >>> t = TwoDTree((0, 0), (100, 100))
         >>> t.size()
@@ -1571,13 +2359,7 @@ class TwoDTree(Tree):
         >>> t.size()
         2
         """
-        if self.is_empty():
-            return 1
-        elif self.is_leaf():
-            return 1
-        else:
-            return 1 + (self._lt.size() if self._lt is not None else 0) \
-                   + (self._gt.size() if self._gt is not None else 0)
+        return self._size
 
     def height(self) -> int:
         """ Return the height of <self>
@@ -1585,7 +2367,7 @@ class TwoDTree(Tree):
         Height is measured as the number of nodes in the path from the root of
         this tree to the node at the greatest depth in this tree.
 
-        Runtime: O(n)
+        Runtime: O(1)
 
         >>> t = TwoDTree((0, 0), (100, 100))
         >>> t.height()
@@ -1600,13 +2382,7 @@ class TwoDTree(Tree):
         >>> t.height()
         3
         """
-        if self.is_empty():
-            return 1
-        elif self.is_leaf():
-            return 1
-        else:
-            return 1 + max([self._lt.height() if self._lt is not None else 0,
-                            self._gt.height() if self._gt is not None else 0])
+        return self._height
 
     def depth(self, tree: Tree) -> Optional[int]:
         """ Return the depth of the subtree <tree> relative to <self>.
@@ -1687,8 +2463,2708 @@ class TwoDTree(Tree):
         return self._name is None and self.is_leaf()
 
 
+class CompactQuadTree(Tree):
+    """
+    A QuadTree whose nodes are kept in parallel arrays instead of one object
+    per node. Concrete implementation of Tree.
+
+    The tree has exactly the same shape as a QuadTree storing the same players:
+    node i has centre (_cx[i], _cy[i]), its children in the regions NW, NE, SW
+    and SE are _children[4 * i] to _children[4 * i + 3], and it stores the
+    player with id _leaf[i]. Node 0 is the root. Names are interned: every
+    player is given an integer id, and its location is kept in _xs and _ys.
+
+    === Private Attributes ===
+    _cx: the x coordinate of the centre of every node
+    _cy: the y coordinate of the centre of every node
+    _children: the four children of every node, or -1 for a missing child
+    _leaf: the id of the player stored in every node, or -1 if there is none
+    _free_nodes: the nodes that were removed and can be reused
+    _names: the name of every player id, or None for an unused id
+    _xs: the x coordinate of every player id
+    _ys: the y coordinate of every player id
+    _free_ids: the player ids that were removed and can be reused
+    _ids: a dictionary mapping the name of every player stored in the tree to
+    its id
+
+    === Representation Invariant ===
+    - the nodes reachable from node 0 satisfy every representation invariant
+    of QuadTree, reading _leaf as _name and _point, and _children as _nw,
+    _ne, _sw and _se
+    - a node is in _free_nodes if and only if it is not reachable from node 0
+    - an id is in _free_ids if and only if _names[id] is None
+    - _ids[_names[i]] == i for every id i that is not free
+    """
+    _cx: array
+    _cy: array
+    _children: array
+    _leaf: array
+    _free_nodes: List[int]
+    _names: List[Optional[str]]
+    _xs: array
+    _ys: array
+    _free_ids: List[int]
+    _ids: Dict[str, int]
+
+    def __init__(self, centre: Tuple[int, int]) -> None:
+        """Initialize a new Tree instance with centre <centre>.
+
+        Runtime: O(1)
+
+        >>> q = CompactQuadTree((50, 50))
+        """
+        self._cx = array('i', [centre[0]])
+        self._cy = array('i', [centre[1]])
+        self._children = array('i', [-1, -1, -1, -1])
+        self._leaf = array('i', [-1])
+        self._free_nodes = []
+        self._names = []
+        self._xs = array('i')
+        self._ys = array('i')
+        self._free_ids = []
+        self._ids = {}
+
+    @classmethod
+    def from_points(cls, centre: Tuple[int, int],
+                    items: Iterable[Tuple[str, Tuple[int, int]]]) -> \
+            CompactQuadTree:
+        """ Return a new CompactQuadTree with centre <centre> storing every
+        (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players share the same point.
+
+        Runtime: O(n * log(n))
+
+        >>> q = CompactQuadTree.from_points((50, 50), [('a', (25, 25)),
+        ...                                            ('b', (75, 75))])
+        >>> q.size()
+        3
+        """
+        tree = cls(centre)
+        tree.insert_many(items)
+        return tree
+
+    def __contains__(self, name: str) -> bool:
+        """ Return True if a player named <name> is stored in this tree.
+
+        Runtime: O(1)
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> 'a' in q
+        True
+        >>> 'b' in q
+        False
+        """
+        return name in self._ids
+
+    def contains_point(self, point: Tuple[int, int]) -> bool:
+        """ Return True if a player at location <point> is stored in this tree.
+
+        Runtime: O(log(n))
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.contains_point((25, 25))
+        True
+        >>> q.contains_point((50, 50))
+        False
+        """
+        return self._find_id(0, point) != -1
+
+    def insert(self, name: str, point: Tuple[int, int]) -> None:
+        """Insert a player named <name> into this tree at point <point>.
+
+        Raise an OutOfBoundsError if <point> is out of bounds.
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        Runtime: O(log(n))
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> 'b' in q
+        True
+        """
+        if not self._in_bounds(point) or self.contains_point(point):
+            raise OutOfBoundsError
+        if name in self._ids:
+            # a name is stored once, as it is in the index of a QuadTree
+            self.remove(name)
+        self._insert_helper(0, self._root_rect(), self._new_id(name, point))
+
+    def insert_many(self, items: Iterable[Tuple[str, Tuple[int, int]]]) -> \
+            None:
+        """Insert a player for every (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players would share the same point.
+
+        An empty tree is bulk loaded, in which case nothing is inserted when
+        an OutOfBoundsError is raised. Otherwise the players are inserted one
+        at a time.
+
+        Runtime: O(n * log(n))
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert_many([('a', (25, 25)), ('b', (75, 75))])
+        >>> 'b' in q
+        True
+        """
+        if not self.is_empty():
+            for name, point in items:
+                self.insert(name, point)
+            return None
+        # a name given twice keeps its last point
+        items = list(dict(items).items())
+        _check_items(self, items)
+        if items:
+            self._build(0, self._root_rect(),
+                        [self._new_id(name, point) for name, point in items])
+
+    def _build(self, node: int, rect: Tuple[int, int, int, int],
+               ids: List[int]) -> None:
+        """
+        Helper method for insert_many.
+        Fill the empty <node>, covering <rect>, with the players <ids>,
+        partitioning them by quadrant.
+        """
+        if len(ids) == 1:
+            self._leaf[node] = ids[0]
+            return None
+        regions = ([], [], [], [])
+        for i in ids:
+            regions[self._region(node, self._xs[i], self._ys[i])].append(i)
+        for region in range(4):
+            if regions[region]:
+                sub_rect = self._sub_rect(node, rect, region)
+                self._build(self._new_child(node, region, sub_rect), sub_rect,
+                            regions[region])
+
+    def _insert_helper(self, node: int, rect: Tuple[int, int, int, int],
+                       i: int) -> None:
+        """
+        Helper method for insert.
+        Store the player with id <i> under <node>, which covers <rect>,
+        splitting leaves exactly like QuadTree._insert_helper.
+        """
+        x, y = self._xs[i], self._ys[i]
+        while True:
+            if self._is_leaf(node):
+                old = self._leaf[node]
+                if old == -1:
+                    self._leaf[node] = i
+                    return None
+                self._leaf[node] = -1
+                old_region = self._region(node, self._xs[old], self._ys[old])
+                region = self._region(node, x, y)
+                sub_rect = self._sub_rect(node, rect, old_region)
+                child = self._new_child(node, old_region, sub_rect)
+                self._leaf[child] = old
+                if old_region != region:
+                    sub_rect = self._sub_rect(node, rect, region)
+                    self._leaf[self._new_child(node, region, sub_rect)] = i
+                    return None
+            else:
+                region = self._region(node, x, y)
+                sub_rect = self._sub_rect(node, rect, region)
+                child = self._children[4 * node + region]
+                if child == -1:
+                    child = self._new_child(node, region, sub_rect)
+            node, rect = child, sub_rect
+
+    def _in_bounds(self, point: Tuple[int, int]) -> bool:
+        """
+        Return True if <point> is inside the rectangle described by the root.
+        """
+        return 0 <= point[0] <= 2 * self._cx[0] and \
+            0 <= point[1] <= 2 * self._cy[0]
+
+    def _root_rect(self) -> Tuple[int, int, int, int]:
+        """
+        Return the rectangle described by the root as (west, north, east,
+        south).
+        """
+        return 0, 0, 2 * self._cx[0], 2 * self._cy[0]
+
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """ Return the rectangle that players can be placed in on the field
+        described by <self>, as (west, north, east, south), edges included.
+
+        Runtime: O(1)
+
+        >>> CompactQuadTree((100, 50)).bounds()
+        (0, 0, 200, 100)
+        """
+        return self._root_rect()
+
+    def _region(self, node: int, x: int, y: int) -> int:
+        """
+        Return the region of (<x>, <y>) relative to the centre of <node>: 0 for
+        NW, 1 for NE, 2 for SW and 3 for SE.
+        """
+        return (0 if y <= self._cy[node] else 2) + \
+            (0 if x <= self._cx[node] else 1)
+
+    def _sub_rect(self, node: int, rect: Tuple[int, int, int, int],
+                  region: int) -> Tuple[int, int, int, int]:
+        """
+        Return the part of <rect>, the rectangle covered by <node>, that is in
+        <region>.
+        """
+        cx, cy = self._cx[node], self._cy[node]
+        return (rect[0] if region % 2 == 0 else cx,
+                rect[1] if region < 2 else cy,
+                cx if region % 2 == 0 else rect[2],
+                cy if region < 2 else rect[3])
+
+    def _new_child(self, node: int, region: int,
+                   rect: Tuple[int, int, int, int]) -> int:
+        """
+        Return a new empty node covering <rect>, attached to <node> in <region>.
+        """
+        centre_x, centre_y = (rect[0] + rect[2]) // 2, (rect[1] + rect[3]) // 2
+        if self._free_nodes:
+            child = self._free_nodes.pop()
+            self._cx[child], self._cy[child] = centre_x, centre_y
+            self._leaf[child] = -1
+        else:
+            child = len(self._leaf)
+            self._cx.append(centre_x)
+            self._cy.append(centre_y)
+            self._children.extend((-1, -1, -1, -1))
+            self._leaf.append(-1)
+        self._children[4 * node + region] = child
+        return child
+
+    def _free_node(self, node: int) -> None:
+        """
+        Mark the leaf <node> as removed so that it can be reused.
+        """
+        self._leaf[node] = -1
+        self._free_nodes.append(node)
+
+    def _new_id(self, name: str, point: Tuple[int, int]) -> int:
+        """
+        Return a new id for the player named <name> at <point>.
+        """
+        if self._free_ids:
+            i = self._free_ids.pop()
+            self._names[i] = name
+            self._xs[i], self._ys[i] = point
+        else:
+            i = len(self._names)
+            self._names.append(name)
+            self._xs.append(point[0])
+            self._ys.append(point[1])
+        self._ids[name] = i
+        return i
+
+    def _is_leaf(self, node: int) -> bool:
+        """
+        Return True if <node> has no children.
+        """
+        children = self._children
+        return children[4 * node] == children[4 * node + 1] == \
+            children[4 * node + 2] == children[4 * node + 3] == -1
+
+    def _find_id(self, node: int, point: Tuple[int, int]) -> int:
+        """
+        Return the id of the player at <point> under <node>, or -1 if there is
+        none.
+        """
+        x, y = point
+        while node != -1:
+            i = self._leaf[node]
+            if i != -1:
+                return i if self._xs[i] == x and self._ys[i] == y else -1
+            node = self._children[4 * node + self._region(node, x, y)]
+        return -1
+
+    def remove(self, name: str) -> None:
+        """Remove information about a player named <name> from this tree.
+
+        Runtime: O(log(n))
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.remove('a')
+        >>> 'a' in q
+        False
+        >>> q.size()
+        1
+        """
+        i = self._ids.get(name)
+        if i is not None:
+            self.remove_point((self._xs[i], self._ys[i]))
+
+    def remove_point(self, point: Tuple[int, int]) -> None:
+        """ Remove information about a player at point <point> from this tree.
+
+        Runtime: O(log(n))
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.remove_point((25, 25))
+        >>> q.contains_point((25, 25))
+        False
+        """
+        i = self._remove_helper(0, point)
+        if i != -1:
+            del self._ids[self._names[i]]
+            self._names[i] = None
+            self._free_ids.append(i)
+
+    def _remove_helper(self, top: int, point: Tuple[int, int]) -> int:
+        """
+        Helper method for remove_point and move_point.
+        Remove the player at <point> from under the node <top>, and return its
+        id, or -1 if there is none. On the way back up to <top>, empty nodes
+        are removed and nodes left with a single leaf child take its player,
+        exactly like QuadTree.remove_point.
+        """
+        x, y = point
+        path = []
+        node = top
+        while self._leaf[node] == -1:
+            region = self._region(node, x, y)
+            child = self._children[4 * node + region]
+            if child == -1:
+                return -1
+            path.append((node, region))
+            node = child
+        i = self._leaf[node]
+        if self._xs[i] != x or self._ys[i] != y:
+            return -1
+        if not path:
+            self._leaf[node] = -1
+            return i
+        self._free_node(node)
+        detach = True
+        for parent, region in reversed(path):
+            if detach:
+                self._children[4 * parent + region] = -1
+            self._remove_promoter(parent)
+            detach = self._leaf[parent] == -1 and self._is_leaf(parent)
+            if detach and parent != top:
+                self._free_node(parent)
+        return i
+
+    def _remove_promoter(self, node: int) -> None:
+        """
+        Helper method for promoting when removing from a node with a single
+        child.
+        """
+        base = 4 * node
+        children = [c for c in self._children[base:base + 4] if c != -1]
+        if len(children) == 1 and self._is_leaf(children[0]):
+            self._leaf[node] = self._leaf[children[0]]
+            self._free_node(children[0])
+            for region in range(4):
+                self._children[base + region] = -1
+
+    def move(self, name: str, direction: str, steps: int) -> \
+            Optional[Tuple[int, int]]:
+        """ Return the new location of the player named <name> after moving it
+        in the given <direction> by <steps> steps.
+
+        Raise an OutOfBoundsError if this would move the player named
+        <name> out of bounds (before moving the player).
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        Runtime: O(log(n))
+
+        === precondition ===
+        direction in ['N', 'S', 'E', 'W']
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.move('a', 'S', 10)
+        (25, 35)
+        """
+        point = self._find_point(name)
+        if point is None:
+            return None
+        return self.move_point(point, direction, steps)
+
+    def _find_point(self, name: str) -> Optional[Tuple[int, int]]:
+        """
+        Return the coordinates of the <name> in self.
+        """
+        i = self._ids.get(name)
+        return None if i is None else (self._xs[i], self._ys[i])
+
+    def move_point(self, point: Tuple[int, int], direction: str, steps: int) ->\
+            Optional[Tuple[int, int]]:
+        """ Return the new location of the player at point <point> after moving
+        it in the given <direction> by <steps> steps.
+
+        Raise an OutOfBoundsError if this would move the player at point
+        <point> out of bounds (before moving the player).
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        Moving a point may require the tree to be reorganized. This method
+        should do the minimum amount of tree reorganization possible to move the
+        given point properly.
+
+        Runtime: O(log(n))
+
+        === precondition ===
+        direction in ['N', 'S', 'E', 'W']
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.move_point((25, 25), 'S', 10)
+        (25, 35)
+        >>> q.contains_point((25, 25))
+        False
+        """
+        new_point = _calc_point(point, direction, steps)
+        rect = self._root_rect()
+
+        # walk down while the old and the new point share a quadrant
+        node = 0
+        while not self._is_leaf(node):
+            region = self._region(node, point[0], point[1])
+            if region != self._region(node, new_point[0], new_point[1]):
+                break
+            child = self._children[4 * node + region]
+            if child == -1:
+                return None
+            rect = self._sub_rect(node, rect, region)
+            node = child
+
+        i = self._find_id(node, point)
+        if i == -1:
+            return None
+        elif not self._in_bounds(new_point) or new_point == point:
+            raise OutOfBoundsError
+        elif self._leaf[node] != -1:
+            # the leaf is the only player in its quadrant, so the new point
+            # can not collide with anyone else
+            self._xs[i], self._ys[i] = new_point
+        elif self._find_id(node, new_point) != -1:
+            raise OutOfBoundsError
+        else:
+            # <node> is the lowest common ancestor of both points
+            self._remove_helper(node, point)
+            self._xs[i], self._ys[i] = new_point
+            self._insert_helper(node, rect, i)
+        return new_point
+
+    def move_many(self, moves: Iterable[Tuple[str, str, int]]) -> \
+            Tuple[Dict[str, Tuple[int, int]], List[Tuple[str, str, int]]]:
+        """ Move players by every (name, direction, steps) in <moves>, in
+        order, as if move had been called for each of them.
+
+        Return a dictionary mapping the name of every player that moved to its
+        new location, and a list of the moves that were rejected because they
+        would have raised an OutOfBoundsError. Moves of players that are not
+        in this tree are ignored.
+
+        Runtime: O(k * log(n)) for k moves
+
+        === precondition ===
+        every direction is in ['N', 'S', 'E', 'W']
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 35))
+        >>> q.insert('b', (25, 45))
+        >>> q.move_many([('a', 'N', 10), ('b', 'N', 10), ('b', 'E', 90)])
+        ({'a': (25, 25), 'b': (25, 35)}, [('b', 'E', 90)])
+        """
+        locations = {}
+        rejected = []
+        for name, direction, steps in moves:
+            point = self._find_point(name)
+            if point is None:
+                continue
+            # out of bounds moves are rejected before any descent
+            if not self._in_bounds(_calc_point(point, direction, steps)):
+                rejected.append((name, direction, steps))
+                continue
+            try:
+                locations[name] = self.move_point(point, direction, steps)
+            except OutOfBoundsError:
+                rejected.append((name, direction, steps))
+        return locations, rejected
+
+    def query_rect(self, x0: int, y0: int, x1: int, y1: int) -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player inside the rectangle
+        with north west corner (<x0>, <y0>) and south east corner (<x1>, <y1>),
+        borders included.
+
+        Runtime: faster than O(n) when the rectangle is small
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> list(q.query_rect(20, 20, 80, 70))
+        [('a', (25, 25))]
+        """
+        return _search(0, self._expand,
+                       lambda rect: rect[0] <= x1 and x0 <= rect[2] and
+                       rect[1] <= y1 and y0 <= rect[3])
+
+    def query_radius(self, point: Tuple[int, int], r: int,
+                     metric: str = 'manhattan') -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player whose distance to
+        <point>, measured with <metric>, is at most <r>.
+
+        Runtime: faster than O(n) when <r> is small
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> list(q.query_radius((50, 50), 25, 'chebyshev'))
+        [('a', (25, 25)), ('b', (75, 75))]
+        """
+        return _search(0, self._expand,
+                       lambda rect: _distance(point, rect, metric) <= r)
+
+    def find_collisions(self, radius: int, metric: str = 'manhattan') -> \
+            List[Tuple[str, str]]:
+        """ Return every pair of names of players whose distance to each other,
+        measured with <metric>, is at most <radius>. Each pair is ordered, and
+        the pairs are sorted.
+
+        Runtime: O(n * log(n)) when few players are within <radius> of each
+        other
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (26, 25))
+        >>> q.insert('c', (25, 27))
+        >>> q.find_collisions(1)
+        [('a', 'b')]
+        """
+        return _find_collisions(0, self._expand, radius, metric)
+
+    def names_in_range(self, point: Tuple[int, int], direction: str,
+                       distance: int) -> List[str]:
+        """ Return a list of names of players whose location is in the
+        <direction> relative to <point> and whose location is within <distance>
+        along both the x and y axis.
+
+        Runtime: faster than O(n) when distance is small
+
+        === precondition ===
+        direction in ['NE', 'SE', 'NE', 'SW']
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.names_in_range((40, 40), 'NW', 20)
+        ['a']
+        """
+        x_range, y_range = _find_xy_range(point, direction, distance)
+        return [name for name, _ in self.query_rect(min(x_range), min(y_range),
+                                                    max(x_range), max(y_range))]
+
+    def nearest(self, point: Tuple[int, int], k: int,
+                filter: Optional[Set[str]] = None,
+                metric: str = 'manhattan') -> List[Tuple[str, Tuple[int, int]]]:
+        """ Return the names and locations of the <k> players closest to
+        <point>, closest first. Players at the same distance are ordered by
+        location. Only players whose name is in <filter> are considered, unless
+        <filter> is None.
+
+        Distances are measured with <metric>, either 'manhattan' or
+        'chebyshev'.
+
+        Runtime: O(log(n) + k) for evenly spread players
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.insert('c', (60, 40))
+        >>> q.nearest((50, 50), 2)
+        [('c', (60, 40)), ('a', (25, 25))]
+        """
+        return _nearest(0, self._expand, point, k, filter, metric)
+
+    def _expand(self, node: int, rect: Tuple[float, float, float, float]) -> \
+            Tuple[List[Tuple[str, Tuple[int, int]]],
+                  List[Tuple[int, Tuple[float, float, float, float]]]]:
+        """
+        Helper method for nearest and the range queries.
+        Return the player stored in <node>, if any, in a list, and every child
+        of <node> paired with the rectangle it covers inside <rect>, the
+        rectangle covered by <node>.
+        """
+        i = self._leaf[node]
+        if i != -1:
+            return [(self._names[i], (self._xs[i], self._ys[i]))], []
+        x0, y0, x1, y1 = rect
+        x = min(max(self._cx[node], x0), x1)
+        y = min(max(self._cy[node], y0), y1)
+        base = 4 * node
+        children = self._children
+        subtrees = []
+        for child, sub_rect in [(children[base], (x0, y0, x, y)),
+                                (children[base + 1], (x, y0, x1, y)),
+                                (children[base + 2], (x0, y, x, y1)),
+                                (children[base + 3], (x, y, x1, y1))]:
+            if child != -1:
+                subtrees.append((child, sub_rect))
+        return [], subtrees
+
+    def size(self) -> int:
+        """ Return the number of nodes in <self>
+
+        Runtime: O(1)
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.size()
+        1
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.size()
+        3
+        """
+        return len(self._leaf) - len(self._free_nodes)
+
+    def height(self) -> int:
+        """ Return the height of <self>
+
+        Height is measured as the number of nodes in the path from the root of
+        this tree to the node at the greatest depth in this tree.
+
+        Runtime: O(n)
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (75, 75))
+        >>> q.height()
+        2
+        """
+        height = 0
+        stack = [(0, 1)]
+        while stack:
+            node, level = stack.pop()
+            height = max(height, level)
+            for child in self._children[4 * node:4 * node + 4]:
+                if child != -1:
+                    stack.append((child, level + 1))
+        return height
+
+    def depth(self, tree: Tree) -> Optional[int]:
+        """ Return the depth of the subtree <tree> relative to <self>. Return
+        None if <tree> is not a descendant of <self>
+
+        The nodes of a CompactQuadTree are not Tree instances, so no tree is
+        ever a descendant of <self>.
+
+        Runtime: O(1)
+
+        >>> q = CompactQuadTree((50, 50))
+        >>> q.depth(QuadTree((25, 25))) is None
+        True
+        """
+        return None
+
+    def is_leaf(self) -> bool:
+        """ Return True if <self> has no children
+
+        Runtime: O(1)
+        """
+        return self._is_leaf(0)
+
+    def is_empty(self) -> bool:
+        """ Return True if <self> does not store any information about the
+        location of any players.
+
+        Runtime: O(1)
+        """
+        return self._leaf[0] == -1 and self._is_leaf(0)
+
+
+class FlatTwoDTree(Tree):
+    """
+    A static kd-tree of dimension 2 stored in flat arrays, for phases where the
+    field is queried much more often than it changes. Concrete implementation
+    of Tree.
+
+    The players are laid out as a complete binary tree: node i is at index i of
+    _xs, _ys and _names, and its children are at 2i + 1 and 2i + 2. Nodes at
+    an even depth split along x and the others along y, and every node is the
+    median of its subtree along its split, ties broken by the other axis.
+
+    Players inserted or moved since the last rebuild are kept in a delta
+    buffer instead, hashed into a coarse grid of square cells so that range
+    queries only look at the buffered players near them. Players removed from
+    the flat tree leave a node with no name behind, so that the flat arrays
+    only change on a rebuild. The tree is rebuilt by balance, which is called
+    automatically once the buffer and the removed nodes together outgrow the
+    delta limit.
+
+    === Private Attributes ===
+    _nw: the x/y coordinates of the north west corner of the field
+    _se: the x/y coordinates of the south east corner of the field
+    _xs: the x coordinate of every node of the flat tree
+    _ys: the y coordinate of every node of the flat tree
+    _names: the name of the player of every node of the flat tree, or None if
+    that player was removed since the last rebuild
+    _slots: a dictionary mapping the name of every player in the flat tree to
+    its node
+    _removed: the number of nodes of the flat tree whose player was removed
+    _delta: a dictionary mapping the name of every player in the delta buffer
+    to its point
+    _delta_at: a dictionary mapping the point of every player in the delta
+    buffer to its name
+    _cells: a dictionary mapping every cell of the grid to the names of the
+    players of the delta buffer in it. The cell of (x, y) is
+    ((x - _nw[0]) // _cell, (y - _nw[1]) // _cell)
+    _cell: the side length of the cells of the grid
+    _delta_limit: the delta limit requested by the user, or None to pick one
+    from the number of players
+    _limit: the number of buffered and removed players at which the tree is
+    rebuilt
+
+    === Representation Invariants ===
+    - len(_xs) == len(_ys) == len(_names)
+    - for every node i, the points in the subtree of 2i + 1 are before the
+    point of i, and the points in the subtree of 2i + 2 are after it, ordered
+    by (x, y) if i is at an even depth and by (y, x) otherwise
+    - no name is in both _slots and _delta
+    - no two players, in the flat tree or in the delta buffer, share a point
+    """
+    _nw: Tuple[int, int]
+    _se: Tuple[int, int]
+    _xs: array
+    _ys: array
+    _names: List[Optional[str]]
+    _slots: Dict[str, int]
+    _removed: int
+    _delta: Dict[str, Tuple[int, int]]
+    _delta_at: Dict[Tuple[int, int], str]
+    _cells: Dict[Tuple[int, int], Set[str]]
+    _cell: int
+    _delta_limit: Optional[int]
+    _limit: int
+
+    def __init__(self, nw: Tuple[int, int], se: Tuple[int, int],
+                 delta_limit: Optional[int] = None) -> None:
+        """Initialize a new Tree instance with <nw> and <se>, which is rebuilt
+        once more than <delta_limit> players are buffered or removed. If
+        <delta_limit> is None, the limit is an eighth of the number of players,
+        and at least 64.
+
+        Runtime: O(1)
+
+        >>> t = FlatTwoDTree((0, 0), (100, 100))
+        """
+        self._nw = nw
+        self._se = se
+        # a grid of at most 32 by 32 cells
+        self._cell = max(1, -(-max(se[0] - nw[0], se[1] - nw[1]) // 32))
+        self._delta_limit = delta_limit
+        self._layout([])
+
+    @classmethod
+    def from_points(cls, nw: Tuple[int, int], se: Tuple[int, int],
+                    items: Iterable[Tuple[str, Tuple[int, int]]]) -> \
+            FlatTwoDTree:
+        """ Return a new FlatTwoDTree with corners <nw> and <se> storing every
+        (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players share the same point.
+
+        Runtime: O(n * log(n))
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100),
+        ...                              [('a', (10, 10)), ('b', (20, 20)),
+        ...                               ('c', (30, 30))])
+        >>> t._names
+        ['b', 'a', 'c']
+        """
+        tree = cls(nw, se)
+        tree.insert_many(items)
+        return tree
+
+    @classmethod
+    def from_tree(cls, tree: TwoDTree) -> FlatTwoDTree:
+        """ Return a new FlatTwoDTree storing the same players as the root
+        <tree>, in the same field.
+
+        Runtime: O(n * log(n))
+
+        >>> t = TwoDTree((0, 0), (100, 100))
+        >>> t.insert('a', (10, 10))
+        >>> t.insert('b', (20, 20))
+        >>> flat = FlatTwoDTree.from_tree(t)
+        >>> sorted(flat.query_rect(0, 0, 100, 100))
+        [('a', (10, 10)), ('b', (20, 20))]
+        """
+        flat = cls(tree._nw, tree._se)
+        if not tree.is_empty():
+            flat._layout(tree._collect_all_nodes_info())
+        return flat
+
+    def balance(self) -> None:
+        """ Rebuild the flat tree from every player stored in <self>, emptying
+        the delta buffer.
+
+        Runtime: O(n * log(n))
+
+        >>> t = FlatTwoDTree((0, 0), (100, 100))
+        >>> t.insert('a', (10, 10))
+        >>> t._names, t._delta
+        ([], {'a': (10, 10)})
+        >>> t.balance()
+        >>> t._names, t._delta
+        (['a'], {})
+        """
+        items = [(name, (self._xs[i], self._ys[i]))
+                 for name, i in self._slots.items()]
+        items.extend(self._delta.items())
+        self._layout(items)
+
+    def _layout(self, items: List[Tuple[str, Tuple[int, int]]]) -> None:
+        """
+        Helper for balance and insert_many.
+        Replace the content of <self> by a flat tree of <items> and an empty
+        delta buffer.
+        """
+        n = len(items)
+        self._xs = array('i', [0]) * n
+        self._ys = array('i', [0]) * n
+        self._names = [None] * n
+        self._slots = {}
+        self._removed = 0
+        self._delta = {}
+        self._delta_at = {}
+        self._cells = {}
+        if self._delta_limit is not None:
+            self._limit = self._delta_limit
+        else:
+            self._limit = max(64, n // 8)
+
+        # every part is kept sorted along both axes, so that the median along
+        # the split of a node is found without sorting again
+        by_x = sorted(items, key=lambda item: item[1])
+        by_y = sorted(items, key=lambda item: (item[1][1], item[1][0]))
+        stack = [(0, by_x, by_y, 0)] if items else []
+        while stack:
+            node, primary, secondary, axis = stack.pop()
+            median = _left_size(len(primary))
+            name, point = primary[median]
+            self._xs[node], self._ys[node] = point
+            self._names[node] = name
+            self._slots[name] = node
+            if axis == 0:
+                lt = [item for item in secondary if item[1] < point]
+                gt = [item for item in secondary if item[1] > point]
+            else:
+                x, y = point
+                lt = [item for item in secondary if item[1][1] < y or
+                      (item[1][1] == y and item[1][0] < x)]
+                gt = [item for item in secondary if item[1][1] > y or
+                      (item[1][1] == y and item[1][0] > x)]
+            if lt:
+                stack.append((2 * node + 1, lt, primary[:median], 1 - axis))
+            if gt:
+                stack.append((2 * node + 2, gt, primary[median + 1:],
+                              1 - axis))
+
+    def _find_node(self, point: Tuple[int, int]) -> int:
+        """
+        Return the node of the flat tree at <point>, whether its player was
+        removed or not, or -1 if there is none.
+        """
+        x, y = point
+        xs, ys = self._xs, self._ys
+        node = 0
+        n = len(xs)
+        while node < n:
+            node_x, node_y = xs[node], ys[node]
+            if node_x == x and node_y == y:
+                return node
+            elif (node + 1).bit_length() % 2 == 1:  # split along x
+                before = x < node_x or (x == node_x and y < node_y)
+            else:
+                before = y < node_y or (y == node_y and x < node_x)
+            node = 2 * node + 1 if before else 2 * node + 2
+        return -1
+
+    def _find_name(self, point: Tuple[int, int]) -> Optional[str]:
+        """
+        Return the name of the player at <point>, or None if there is none.
+        """
+        name = self._delta_at.get(point)
+        if name is None:
+            node = self._find_node(point)
+            if node != -1:
+                name = self._names[node]
+        return name
+
+    def _find_point(self, name: str) -> Optional[Tuple[int, int]]:
+        """
+        Return the coordinates of the <name> in self.
+        """
+        node = self._slots.get(name)
+        if node is not None:
+            return self._xs[node], self._ys[node]
+        return self._delta.get(name)
+
+    def _in_bounds(self, point: Tuple[int, int]) -> bool:
+        """
+        Return True if <point> is inside the field of <self>.
+        """
+        return self._nw[0] <= point[0] <= self._se[0] and \
+            self._nw[1] <= point[1] <= self._se[1]
+
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """ Return the rectangle that players can be placed in on the field
+        of <self>, as (west, north, east, south), edges included.
+
+        Runtime: O(1)
+
+        >>> FlatTwoDTree((10, 20), (100, 200)).bounds()
+        (10, 20, 100, 200)
+        """
+        return self._nw[0], self._nw[1], self._se[0], self._se[1]
+
+    def _cell_of(self, point: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Return the cell of the grid of the delta buffer containing <point>.
+        """
+        return (point[0] - self._nw[0]) // self._cell, \
+            (point[1] - self._nw[1]) // self._cell
+
+    def _buffer(self, name: str, point: Tuple[int, int]) -> None:
+        """
+        Add the player named <name> at <point> to the delta buffer, and rebuild
+        the flat tree if too many players are buffered or removed.
+        """
+        self._delta[name] = point
+        self._delta_at[point] = name
+        self._cells.setdefault(self._cell_of(point), set()).add(name)
+        self._check_limit()
+
+    def _check_limit(self) -> None:
+        """
+        Rebuild the flat tree if too many players are buffered or removed.
+        """
+        if len(self._delta) + self._removed > self._limit:
+            self.balance()
+
+    def __contains__(self, name: str) -> bool:
+        """ Return True if a player named <name> is stored in this tree.
+
+        Runtime: O(1)
+
+        >>> t = FlatTwoDTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 25))
+        >>> 'a' in t
+        True
+        >>> 'b' in t
+        False
+        """
+        return name in self._slots or name in self._delta
+
+    def contains_point(self, point: Tuple[int, int]) -> bool:
+        """ Return True if a player at location <point> is stored in this tree.
+
+        Runtime: O(log(n))
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.contains_point((25, 25))
+        True
+        >>> t.contains_point((50, 50))
+        False
+        """
+        return self._find_name(point) is not None
+
+    def insert(self, name: str, point: Tuple[int, int]) -> None:
+        """Insert a player named <name> into this tree at point <point>.
+
+        Raise an OutOfBoundsError if <point> is out of bounds.
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        The player is added to the delta buffer.
+
+        Runtime: O(log(n)) amortized
+
+        >>> t = FlatTwoDTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 25))
+        >>> t.contains_point((25, 25))
+        True
+        """
+        if not self._in_bounds(point) or self.contains_point(point):
+            raise OutOfBoundsError
+        if name in self:
+            # a name is stored once, as it is in the index of a TwoDTree
+            self._discard(name)
+        self._buffer(name, point)
+
+    def insert_many(self, items: Iterable[Tuple[str, Tuple[int, int]]]) -> \
+            None:
+        """Insert a player for every (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players would share the same point.
+
+        An empty tree is bulk loaded, in which case nothing is inserted when
+        an OutOfBoundsError is raised. Otherwise the players are inserted one
+        at a time.
+
+        Runtime: O(n * log(n))
+
+        >>> t = FlatTwoDTree((0, 0), (100, 100))
+        >>> t.insert_many([('a', (25, 25)), ('b', (75, 75))])
+        >>> 'b' in t
+        True
+        """
+        if not self.is_empty():
+            for name, point in items:
+                self.insert(name, point)
+            return None
+        # a name given twice keeps its last point
+        items = list(dict(items).items())
+        _check_items(self, items)
+        self._layout(items)
+
+    def remove(self, name: str) -> None:
+        """ Remove information about a player named <name> from this tree.
+
+        Runtime: O(1) amortized
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.remove('a')
+        >>> 'a' in t
+        False
+        """
+        self._discard(name)
+        self._check_limit()
+
+    def _discard(self, name: str) -> None:
+        """
+        Helper method for remove and move_point.
+        Remove the player named <name> from the delta buffer, or leave its node
+        in the flat tree without a name.
+        """
+        point = self._delta.pop(name, None)
+        if point is not None:
+            del self._delta_at[point]
+            cell = self._cell_of(point)
+            self._cells[cell].discard(name)
+            if not self._cells[cell]:
+                del self._cells[cell]
+        elif name in self._slots:
+            self._names[self._slots.pop(name)] = None
+            self._removed += 1
+
+    def remove_point(self, point: Tuple[int, int]) -> None:
+        """ Remove information about a player at point <point> from this tree.
+
+        Runtime: O(log(n)) amortized
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.remove_point((25, 25))
+        >>> t.contains_point((25, 25))
+        False
+        """
+        name = self._find_name(point)
+        if name is not None:
+            self.remove(name)
+
+    def move(self, name: str, direction: str, steps: int) -> \
+            Optional[Tuple[int, int]]:
+        """ Return the new location of the player named <name> after moving it
+        in the given <direction> by <steps> steps.
+
+        Raise an OutOfBoundsError if this would move the player named
+        <name> out of bounds (before moving the player).
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        Runtime: O(log(n)) amortized
+
+        === precondition ===
+        direction in ['N', 'S', 'E', 'W']
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.move('a', 'S', 10)
+        (25, 35)
+        """
+        point = self._find_point(name)
+        if point is None:
+            return None
+        return self.move_point(point, direction, steps)
+
+    def move_point(self, point: Tuple[int, int], direction: str, steps: int) ->\
+            Optional[Tuple[int, int]]:
+        """ Return the new location of the player at point <point> after moving
+        it in the given <direction> by <steps> steps.
+
+        Raise an OutOfBoundsError if this would move the player at point
+        <point> out of bounds (before moving the player).
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        The player is moved to the delta buffer, so the flat arrays are left
+        untouched until the next rebuild.
+
+        Runtime: O(log(n)) amortized
+
+        === precondition ===
+        direction in ['N', 'S', 'E', 'W']
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.move_point((25, 25), 'E', 10)
+        (35, 25)
+        >>> t.contains_point((25, 25))
+        False
+        """
+        name = self._find_name(point)
+        if name is None:
+            return None
+        new_point = _calc_point(point, direction, steps)
+        if not self._in_bounds(new_point) or self.contains_point(new_point):
+            raise OutOfBoundsError
+        self._discard(name)
+        self._buffer(name, new_point)
+        return new_point
+
+    def move_many(self, moves: Iterable[Tuple[str, str, int]]) -> \
+            Tuple[Dict[str, Tuple[int, int]], List[Tuple[str, str, int]]]:
+        """ Move players by every (name, direction, steps) in <moves>, in
+        order, as if move had been called for each of them.
+
+        Return a dictionary mapping the name of every player that moved to its
+        new location, and a list of the moves that were rejected because they
+        would have raised an OutOfBoundsError. Moves of players that are not
+        in this tree are ignored.
+
+        Runtime: O(k * log(n)) amortized for k moves
+
+        === precondition ===
+        every direction is in ['N', 'S', 'E', 'W']
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 35)),
+        ...                                                   ('b', (25, 45))])
+        >>> t.move_many([('a', 'N', 10), ('b', 'N', 10), ('b', 'E', 90)])
+        ({'a': (25, 25), 'b': (25, 35)}, [('b', 'E', 90)])
+        """
+        locations = {}
+        rejected = []
+        for name, direction, steps in moves:
+            point = self._find_point(name)
+            if point is None:
+                continue
+            try:
+                locations[name] = self.move_point(point, direction, steps)
+            except OutOfBoundsError:
+                rejected.append((name, direction, steps))
+        return locations, rejected
+
+    def _delta_in_rect(self, x0: int, y0: int, x1: int, y1: int) -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """
+        Helper for the range queries.
+        Yield every player of the delta buffer inside the rectangle with north
+        west corner (<x0>, <y0>) and south east corner (<x1>, <y1>).
+        """
+        if not self._delta:
+            return
+        west, north = self._cell_of((max(x0, self._nw[0]),
+                                     max(y0, self._nw[1])))
+        east, south = self._cell_of((min(x1, self._se[0]),
+                                     min(y1, self._se[1])))
+        for column in range(west, east + 1):
+            for row in range(north, south + 1):
+                for name in list(self._cells.get((column, row), ())):
+                    point = self._delta[name]
+                    if x0 <= point[0] <= x1 and y0 <= point[1] <= y1:
+                        yield name, point
+
+    def query_rect(self, x0: int, y0: int, x1: int, y1: int) -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player inside the rectangle
+        with north west corner (<x0>, <y0>) and south east corner (<x1>, <y1>),
+        borders included.
+
+        Runtime: faster than O(n) when the rectangle is small
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                                   ('b', (75, 75))])
+        >>> list(t.query_rect(20, 20, 80, 70))
+        [('a', (25, 25))]
+        """
+        xs, ys, names = self._xs, self._ys, self._names
+        n = len(names)
+        stack = [0] if n else []
+        while stack:
+            node = stack.pop()
+            x, y = xs[node], ys[node]
+            if x0 <= x <= x1 and y0 <= y <= y1 and names[node] is not None:
+                yield names[node], (x, y)
+            if (node + 1).bit_length() % 2 == 1:  # split along x
+                low, high, split = x0, x1, x
+            else:
+                low, high, split = y0, y1, y
+            # children are pushed right first so that they are visited in order
+            if high >= split and 2 * node + 2 < n:
+                stack.append(2 * node + 2)
+            if low <= split and 2 * node + 1 < n:
+                stack.append(2 * node + 1)
+        yield from self._delta_in_rect(x0, y0, x1, y1)
+
+    def query_radius(self, point: Tuple[int, int], r: int,
+                     metric: str = 'manhattan') -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player whose distance to
+        <point>, measured with <metric>, is at most <r>.
+
+        Runtime: faster than O(n) when <r> is small
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                                   ('b', (75, 75))])
+        >>> list(t.query_radius((50, 50), 49))
+        []
+        """
+        for name, location in self.query_rect(point[0] - r, point[1] - r,
+                                              point[0] + r, point[1] + r):
+            if _distance(point, location + location, metric) <= r:
+                yield name, location
+
+    def find_collisions(self, radius: int, metric: str = 'manhattan') -> \
+            List[Tuple[str, str]]:
+        """ Return every pair of names of players whose distance to each other,
+        measured with <metric>, is at most <radius>. Each pair is ordered, and
+        the pairs are sorted.
+
+        Runtime: O(n * log(n)) when few players are within <radius> of each
+        other
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                                   ('b', (26, 25))])
+        >>> t.insert('c', (25, 27))
+        >>> t.find_collisions(2)
+        [('a', 'b'), ('a', 'c')]
+        """
+        collisions = set(_find_collisions(0, self._expand, radius, metric)) \
+            if self._names else set()
+        for name, point in self._delta.items():
+            for other, _ in self.query_radius(point, radius, metric):
+                if other != name:
+                    collisions.add((min(name, other), max(name, other)))
+        return sorted(collisions)
+
+    def names_in_range(self, point: Tuple[int, int], direction: str,
+                       distance: int) -> List[str]:
+        """ Return a list of names of players whose location is in the
+        <direction> relative to <point> and whose location is within <distance>
+        along both the x and y axis.
+
+        Runtime: faster than O(n) when distance is small
+
+        === precondition ===
+        direction in ['NE', 'SE', 'NE', 'SW']
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                                   ('b', (75, 75))])
+        >>> t.names_in_range((40, 40), 'NW', 20)
+        ['a']
+        """
+        x_range, y_range = _find_xy_range(point, direction, distance)
+        return [name for name, _ in self.query_rect(min(x_range), min(y_range),
+                                                    max(x_range), max(y_range))]
+
+    def nearest(self, point: Tuple[int, int], k: int,
+                filter: Optional[Set[str]] = None,
+                metric: str = 'manhattan') -> List[Tuple[str, Tuple[int, int]]]:
+        """ Return the names and locations of the <k> players closest to
+        <point>, closest first. Players at the same distance are ordered by
+        location. Only players whose name is in <filter> are considered, unless
+        <filter> is None.
+
+        Distances are measured with <metric>, either 'manhattan' or
+        'chebyshev'.
+
+        Runtime: O(log(n) + k) for evenly spread players and a small delta
+        buffer
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                                   ('b', (75, 75))])
+        >>> t.insert('c', (60, 40))
+        >>> t.nearest((50, 50), 2)
+        [('c', (60, 40)), ('a', (25, 25))]
+        """
+        found = _nearest(0, self._expand, point, k, filter, metric) \
+            if self._names else []
+        if k <= 0:
+            return []
+        elif len(found) < k:
+            buffered = self._delta.items()
+        else:
+            # buffered players further than the k-th player of the flat tree
+            # can not be among the closest
+            r = _distance(point, found[-1][1] + found[-1][1], metric)
+            buffered = self._delta_in_rect(point[0] - r, point[1] - r,
+                                           point[0] + r, point[1] + r)
+        found.extend(item for item in buffered
+                     if filter is None or item[0] in filter)
+        found.sort(key=lambda item: (_distance(point, item[1] + item[1],
+                                               metric), item[1]))
+        return found[:k]
+
+    def _expand(self, node: int, rect: Tuple[float, float, float, float]) -> \
+            Tuple[List[Tuple[str, Tuple[int, int]]],
+                  List[Tuple[int, Tuple[float, float, float, float]]]]:
+        """
+        Helper method for nearest and the range queries.
+        Return the player stored in <node>, if any, in a list, and every child
+        of <node> paired with the rectangle it covers inside <rect>, the
+        rectangle covered by <node>.
+        """
+        x, y = self._xs[node], self._ys[node]
+        name = self._names[node]
+        x0, y0, x1, y1 = rect
+        if (node + 1).bit_length() % 2 == 1:  # split along x
+            split = min(max(x, x0), x1)
+            lt_rect, gt_rect = (x0, y0, split, y1), (split, y0, x1, y1)
+        else:
+            split = min(max(y, y0), y1)
+            lt_rect, gt_rect = (x0, y0, x1, split), (x0, split, x1, y1)
+        subtrees = []
+        n = len(self._names)
+        if 2 * node + 1 < n:
+            subtrees.append((2 * node + 1, lt_rect))
+        if 2 * node + 2 < n:
+            subtrees.append((2 * node + 2, gt_rect))
+        return ([(name, (x, y))] if name is not None else []), subtrees
+
+    def size(self) -> int:
+        """ Return the number of nodes in <self>, counting every player in the
+        delta buffer as a node
+
+        Runtime: O(1)
+
+        >>> t = FlatTwoDTree((0, 0), (100, 100))
+        >>> t.size()
+        1
+        >>> t.insert_many([('a', (25, 25)), ('b', (75, 75))])
+        >>> t.size()
+        2
+        """
+        return max(1, len(self._names) + len(self._delta))
+
+    def height(self) -> int:
+        """ Return the height of <self>
+
+        Height is measured as the number of nodes in the path from the root of
+        the flat tree to its deepest node. Players in the delta buffer are not
+        part of the flat tree.
+
+        Runtime: O(1)
+
+        >>> t = FlatTwoDTree.from_points((0, 0), (100, 100),
+        ...                              [('a', (10, 10)), ('b', (20, 20)),
+        ...                               ('c', (30, 30)), ('d', (40, 40))])
+        >>> t.height()
+        3
+        """
+        return max(1, len(self._names).bit_length())
+
+    def depth(self, tree: Tree) -> Optional[int]:
+        """ Return the depth of the subtree <tree> relative to <self>. Return
+        None if <tree> is not a descendant of <self>
+
+        The nodes of a FlatTwoDTree are not Tree instances, so no tree is ever
+        a descendant of <self>.
+
+        Runtime: O(1)
+        """
+        return None
+
+    def is_leaf(self) -> bool:
+        """ Return True if <self> has no children
+
+        Runtime: O(1)
+        """
+        return len(self._slots) + len(self._delta) <= 1
+
+    def is_empty(self) -> bool:
+        """ Return True if <self> does not store any information about the
+        location of any players.
+
+        Runtime: O(1)
+        """
+        return not self._slots and not self._delta
+
+
+class GridTree(Tree):
+    """
+    A uniform grid of square cells that each hold the players inside them, for
+    dense fields where players only look a short distance around them.
+    Concrete implementation of Tree.
+
+    Inserting, moving and removing a player only changes the cells it leaves
+    and enters, and a range query only looks at the cells the range covers.
+    The cells should be about as large as the vision of the players, so that
+    names_in_range looks at no more than four cells.
+
+    As a Tree, the grid is a root whose children are its cells holding at
+    least one player, and whose grandchildren are the players in those cells.
+    A grid with at most one player is a single leaf.
+
+    === Private Attributes ===
+    _nw: the x/y coordinates of the north west corner of the field
+    _se: the x/y coordinates of the south east corner of the field
+    _cell: the side length of the cells
+    _points: a dictionary mapping the name of every player to its point
+    _names_at: a dictionary mapping the point of every player to its name
+    _cells: a dictionary mapping every cell holding at least one player to the
+    names of its players, kept as the keys of a dict. The cell of (x, y) is
+    ((x - _nw[0]) // _cell, (y - _nw[1]) // _cell)
+
+    === Representation Invariants ===
+    - _cell >= 1
+    - _points and _names_at describe the same players
+    - every player is in the cell of its point, and in no other cell
+    - no cell in _cells is empty
+    """
+    _nw: Tuple[int, int]
+    _se: Tuple[int, int]
+    _cell: int
+    _points: Dict[str, Tuple[int, int]]
+    _names_at: Dict[Tuple[int, int], str]
+    _cells: Dict[Tuple[int, int], Dict[str, None]]
+
+    def __init__(self, nw: Tuple[int, int], se: Tuple[int, int],
+                 cell: int = 10) -> None:
+        """Initialize a new Tree instance with <nw> and <se>, split into
+        square cells with sides of length <cell>.
+
+        Runtime: O(1)
+
+        >>> t = GridTree((0, 0), (100, 100))
+        >>> t = GridTree((0, 0), (100, 100), cell=25)
+        """
+        self._nw = nw
+        self._se = se
+        self._cell = max(1, cell)
+        self._points = {}
+        self._names_at = {}
+        self._cells = {}
+
+    @classmethod
+    def from_points(cls, nw: Tuple[int, int], se: Tuple[int, int],
+                    items: Iterable[Tuple[str, Tuple[int, int]]],
+                    cell: int = 10) -> GridTree:
+        """ Return a new GridTree with corners <nw> and <se> and cells with
+        sides of length <cell>, storing every (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players share the same point.
+
+        Runtime: O(n)
+
+        >>> t = GridTree.from_points((0, 0), (100, 100),
+        ...                          [('a', (10, 10)), ('b', (20, 20))])
+        >>> t._cells
+        {(1, 1): {'a': None}, (2, 2): {'b': None}}
+        """
+        tree = cls(nw, se, cell)
+        tree.insert_many(items)
+        return tree
+
+    def _cell_of(self, point: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Return the cell containing <point>.
+        """
+        return (point[0] - self._nw[0]) // self._cell, \
+            (point[1] - self._nw[1]) // self._cell
+
+    def _in_bounds(self, point: Tuple[int, int]) -> bool:
+        """
+        Return True if <point> is inside the field of <self>.
+        """
+        return self._nw[0] <= point[0] <= self._se[0] and \
+            self._nw[1] <= point[1] <= self._se[1]
+
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """ Return the rectangle that players can be placed in on the field
+        of <self>, as (west, north, east, south), edges included.
+
+        Runtime: O(1)
+
+        >>> GridTree((10, 20), (100, 200)).bounds()
+        (10, 20, 100, 200)
+        """
+        return self._nw[0], self._nw[1], self._se[0], self._se[1]
+
+    def _add(self, name: str, point: Tuple[int, int]) -> None:
+        """
+        Store the player named <name> at <point>, which must be free.
+        """
+        self._points[name] = point
+        self._names_at[point] = name
+        self._cells.setdefault(self._cell_of(point), {})[name] = None
+
+    def _discard(self, name: str) -> Optional[Tuple[int, int]]:
+        """
+        Remove the player named <name>, if any, and return its point.
+        """
+        point = self._points.pop(name, None)
+        if point is not None:
+            del self._names_at[point]
+            cell = self._cell_of(point)
+            del self._cells[cell][name]
+            if not self._cells[cell]:
+                del self._cells[cell]
+        return point
+
+    def __contains__(self, name: str) -> bool:
+        """ Return True if a player named <name> is stored in this tree.
+
+        Runtime: O(1)
+
+        >>> t = GridTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 25))
+        >>> 'a' in t
+        True
+        >>> 'b' in t
+        False
+        """
+        return name in self._points
+
+    def contains_point(self, point: Tuple[int, int]) -> bool:
+        """ Return True if a player at location <point> is stored in this tree.
+
+        Runtime: O(1)
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.contains_point((25, 25))
+        True
+        >>> t.contains_point((50, 50))
+        False
+        """
+        return point in self._names_at
+
+    def insert(self, name: str, point: Tuple[int, int]) -> None:
+        """Insert a player named <name> into this tree at point <point>.
+
+        Raise an OutOfBoundsError if <point> is out of bounds.
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        Runtime: O(1)
+
+        >>> t = GridTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 25))
+        >>> t.contains_point((25, 25))
+        True
+        """
+        if not self._in_bounds(point) or point in self._names_at:
+            raise OutOfBoundsError
+        # a name is stored once, as it is in the index of the other trees
+        self._discard(name)
+        self._add(name, point)
+
+    def insert_many(self, items: Iterable[Tuple[str, Tuple[int, int]]]) -> \
+            None:
+        """Insert a player for every (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players would share the same point.
+
+        An empty tree is bulk loaded, in which case nothing is inserted when
+        an OutOfBoundsError is raised. Otherwise the players are inserted one
+        at a time.
+
+        Runtime: O(n)
+
+        >>> t = GridTree((0, 0), (100, 100))
+        >>> t.insert_many([('a', (25, 25)), ('b', (75, 75))])
+        >>> 'b' in t
+        True
+        """
+        if not self.is_empty():
+            for name, point in items:
+                self.insert(name, point)
+            return None
+        # a name given twice keeps its last point
+        items = list(dict(items).items())
+        _check_items(self, items)
+        for name, point in items:
+            self._add(name, point)
+
+    def remove(self, name: str) -> None:
+        """ Remove information about a player named <name> from this tree.
+
+        Runtime: O(1)
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.remove('a')
+        >>> 'a' in t
+        False
+        >>> t._cells
+        {}
+        """
+        self._discard(name)
+
+    def remove_point(self, point: Tuple[int, int]) -> None:
+        """ Remove information about a player at point <point> from this tree.
+
+        Runtime: O(1)
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.remove_point((25, 25))
+        >>> t.contains_point((25, 25))
+        False
+        """
+        name = self._names_at.get(point)
+        if name is not None:
+            self._discard(name)
+
+    def move(self, name: str, direction: str, steps: int) -> \
+            Optional[Tuple[int, int]]:
+        """ Return the new location of the player named <name> after moving it
+        in the given <direction> by <steps> steps.
+
+        Raise an OutOfBoundsError if this would move the player named
+        <name> out of bounds (before moving the player).
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        Runtime: O(1)
+
+        === precondition ===
+        direction in ['N', 'S', 'E', 'W']
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.move('a', 'S', 10)
+        (25, 35)
+        """
+        point = self._points.get(name)
+        if point is None:
+            return None
+        return self.move_point(point, direction, steps)
+
+    def move_point(self, point: Tuple[int, int], direction: str, steps: int) ->\
+            Optional[Tuple[int, int]]:
+        """ Return the new location of the player at point <point> after moving
+        it in the given <direction> by <steps> steps.
+
+        Raise an OutOfBoundsError if this would move the player at point
+        <point> out of bounds (before moving the player).
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        Only the cells the player leaves and enters are changed.
+
+        Runtime: O(1)
+
+        === precondition ===
+        direction in ['N', 'S', 'E', 'W']
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25))])
+        >>> t.move_point((25, 25), 'E', 10)
+        (35, 25)
+        >>> t._cells
+        {(3, 2): {'a': None}}
+        """
+        name = self._names_at.get(point)
+        if name is None:
+            return None
+        new_point = _calc_point(point, direction, steps)
+        if not self._in_bounds(new_point) or new_point in self._names_at:
+            raise OutOfBoundsError
+        self._discard(name)
+        self._add(name, new_point)
+        return new_point
+
+    def move_many(self, moves: Iterable[Tuple[str, str, int]]) -> \
+            Tuple[Dict[str, Tuple[int, int]], List[Tuple[str, str, int]]]:
+        """ Move players by every (name, direction, steps) in <moves>, in
+        order, as if move had been called for each of them.
+
+        Return a dictionary mapping the name of every player that moved to its
+        new location, and a list of the moves that were rejected because they
+        would have raised an OutOfBoundsError. Moves of players that are not
+        in this tree are ignored.
+
+        Runtime: O(k) for k moves
+
+        === precondition ===
+        every direction is in ['N', 'S', 'E', 'W']
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 35)),
+        ...                                               ('b', (25, 45))])
+        >>> t.move_many([('a', 'N', 10), ('b', 'N', 10), ('b', 'E', 90)])
+        ({'a': (25, 25), 'b': (25, 35)}, [('b', 'E', 90)])
+        """
+        locations = {}
+        rejected = []
+        for name, direction, steps in moves:
+            point = self._points.get(name)
+            if point is None:
+                continue
+            try:
+                locations[name] = self.move_point(point, direction, steps)
+            except OutOfBoundsError:
+                rejected.append((name, direction, steps))
+        return locations, rejected
+
+    def query_rect(self, x0: int, y0: int, x1: int, y1: int) -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player inside the rectangle
+        with north west corner (<x0>, <y0>) and south east corner (<x1>, <y1>),
+        borders included.
+
+        Only the cells that overlap the rectangle are looked at, or every
+        player when there are fewer players than such cells.
+
+        Runtime: O(c + k) for c cells and k players in them
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                               ('b', (75, 75))])
+        >>> list(t.query_rect(20, 20, 80, 70))
+        [('a', (25, 25))]
+        """
+        x0, y0 = max(x0, self._nw[0]), max(y0, self._nw[1])
+        x1, y1 = min(x1, self._se[0]), min(y1, self._se[1])
+        if x0 > x1 or y0 > y1:
+            return
+        west, north = self._cell_of((x0, y0))
+        east, south = self._cell_of((x1, y1))
+        if (east - west + 1) * (south - north + 1) > len(self._cells):
+            buckets = self._cells.values()
+        else:
+            buckets = (self._cells.get((column, row), {})
+                       for column in range(west, east + 1)
+                       for row in range(north, south + 1))
+        for bucket in buckets:
+            for name in list(bucket):
+                point = self._points[name]
+                if x0 <= point[0] <= x1 and y0 <= point[1] <= y1:
+                    yield name, point
+
+    def query_radius(self, point: Tuple[int, int], r: int,
+                     metric: str = 'manhattan') -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player whose distance to
+        <point>, measured with <metric>, is at most <r>.
+
+        Runtime: O(c + k) for c cells and k players within <r> along both axes
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                               ('b', (75, 75))])
+        >>> list(t.query_radius((50, 50), 49))
+        []
+        >>> list(t.query_radius((50, 50), 25, 'chebyshev'))
+        [('a', (25, 25)), ('b', (75, 75))]
+        """
+        for name, location in self.query_rect(point[0] - r, point[1] - r,
+                                              point[0] + r, point[1] + r):
+            if _distance(point, location + location, metric) <= r:
+                yield name, location
+
+    def find_collisions(self, radius: int, metric: str = 'manhattan') -> \
+            List[Tuple[str, str]]:
+        """ Return every pair of names of players whose distance to each other,
+        measured with <metric>, is at most <radius>. Each pair is ordered, and
+        the pairs are sorted.
+
+        Every player is only compared with the players in the cells within
+        <radius> of its own.
+
+        Runtime: O(n) when few players are within <radius> of each other and
+        <radius> is at most the side of a cell
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                               ('b', (26, 25)),
+        ...                                               ('c', (25, 27))])
+        >>> t.find_collisions(2)
+        [('a', 'b'), ('a', 'c')]
+        """
+        collisions = []
+        for name, point in self._points.items():
+            for other, _ in self.query_radius(point, radius, metric):
+                if name < other:
+                    collisions.append((name, other))
+        collisions.sort()
+        return collisions
+
+    def names_in_range(self, point: Tuple[int, int], direction: str,
+                       distance: int) -> List[str]:
+        """ Return a list of names of players whose location is in the
+        <direction> relative to <point> and whose location is within <distance>
+        along both the x and y axis.
+
+        Runtime: O(c + k) for c cells and k players in them, which is O(k)
+        when <distance> is at most the side of a cell
+
+        === precondition ===
+        direction in ['NE', 'SE', 'NE', 'SW']
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                               ('b', (75, 75))])
+        >>> t.names_in_range((40, 40), 'NW', 20)
+        ['a']
+        """
+        x_range, y_range = _find_xy_range(point, direction, distance)
+        return [name for name, _ in self.query_rect(min(x_range), min(y_range),
+                                                    max(x_range), max(y_range))]
+
+    def nearest(self, point: Tuple[int, int], k: int,
+                filter: Optional[Set[str]] = None,
+                metric: str = 'manhattan') -> List[Tuple[str, Tuple[int, int]]]:
+        """ Return the names and locations of the <k> players closest to
+        <point>, closest first. Players at the same distance are ordered by
+        location. Only players whose name is in <filter> are considered, unless
+        <filter> is None.
+
+        Distances are measured with <metric>, either 'manhattan' or
+        'chebyshev'.
+
+        The cells are searched in growing rings around the cell of <point>,
+        until the rings are further than the <k>-th closest player found.
+
+        Runtime: O(k) for evenly spread players and cells holding a few players
+        each
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> t = GridTree.from_points((0, 0), (100, 100), [('a', (25, 25)),
+        ...                                               ('b', (75, 75)),
+        ...                                               ('c', (60, 40))])
+        >>> t.nearest((50, 50), 2)
+        [('c', (60, 40)), ('a', (25, 25))]
+        """
+        if k <= 0:
+            return []
+
+        def key(item: Tuple[str, Tuple[int, int]]) -> \
+                Tuple[int, Tuple[int, int]]:
+            return _distance(point, item[1] + item[1], metric), item[1]
+
+        column, row = self._cell_of(point)
+        west, north = self._cell_of((self._nw[0], self._nw[1]))
+        east, south = self._cell_of((self._se[0], self._se[1]))
+        last = max(column - west, east - column, row - north, south - row)
+        found = []
+        ring = 0
+        while ring <= last:
+            # once the rings cover more cells than there are players, it is
+            # cheaper to look at all the players left
+            if (2 * ring + 1) ** 2 > 4 * len(self._cells):
+                found = [item for item in self._points.items()
+                         if filter is None or item[0] in filter]
+                break
+            for cell in _ring(column, row, ring):
+                for name in self._cells.get(cell, ()):
+                    if filter is None or name in filter:
+                        found.append((name, self._points[name]))
+            # every player in a further ring is more than ring * _cell steps
+            # away along one axis
+            if len(found) >= k:
+                found.sort(key=key)
+                if key(found[k - 1])[0] <= ring * self._cell:
+                    break
+            ring += 1
+        found.sort(key=key)
+        return found[:k]
+
+    def size(self) -> int:
+        """ Return the number of nodes in <self>, which are the grid, its cells
+        holding at least one player and the players in them
+
+        Runtime: O(1)
+
+        >>> t = GridTree((0, 0), (100, 100))
+        >>> t.size()
+        1
+        >>> t.insert_many([('a', (25, 25)), ('b', (26, 26)), ('c', (75, 75))])
+        >>> t.size()
+        6
+        """
+        if self.is_leaf():
+            return 1
+        return 1 + len(self._cells) + len(self._points)
+
+    def height(self) -> int:
+        """ Return the height of <self>
+
+        Height is measured as the number of nodes in the path from the grid to
+        a player in one of its cells.
+
+        Runtime: O(1)
+
+        >>> t = GridTree((0, 0), (100, 100))
+        >>> t.insert('a', (25, 25))
+        >>> t.height()
+        1
+        >>> t.insert('b', (75, 75))
+        >>> t.height()
+        3
+        """
+        return 1 if self.is_leaf() else 3
+
+    def depth(self, tree: Tree) -> Optional[int]:
+        """ Return the depth of the subtree <tree> relative to <self>. Return
+        None if <tree> is not a descendant of <self>
+
+        The cells and players of a GridTree are not Tree instances, so no tree
+        is ever a descendant of <self>.
+
+        Runtime: O(1)
+        """
+        return None
+
+    def is_leaf(self) -> bool:
+        """ Return True if <self> has no children
+
+        Runtime: O(1)
+        """
+        return len(self._points) <= 1
+
+    def is_empty(self) -> bool:
+        """ Return True if <self> does not store any information about the
+        location of any players.
+
+        Runtime: O(1)
+        """
+        return not self._points
+
+
+class LinearQuadTree(Tree):
+    """
+    A linear QuadTree, which keeps its players in one array sorted by the
+    Z-order (Morton) key of their points instead of in a tree of nodes.
+    Concrete implementation of Tree.
+
+    The key of (x, y) interleaves the bits of x and y, so the players in any
+    quadrant of a field split in halves, then in halves again, down to single
+    points, form one run of consecutive keys. Looking a point up, inserting it
+    and removing it are binary searches, and a move only shifts the keys
+    between the old and the new place of the player. A range query splits
+    the field in quadrants, and reads off the run of every quadrant inside
+    the range whole.
+
+    As a Tree, every quadrant holding more than a capacity of players is split
+    into its quadrants holding at least one player, and the quadrants that are
+    not split are the leaves. Unlike in a QuadTree, the quadrants are halved
+    along powers of two rather than around the centre of the field.
+
+    === Private Attributes ===
+    _centre: the centre of the field, whose corners are (0, 0) and
+    (2 * _centre[0], 2 * _centre[1])
+    _bits: the number of bits of the largest coordinate on the field, so that
+    the square of side 2 ** _bits at (0, 0) covers the whole field
+    _capacity: the number of players a quadrant holds before it is split
+    _keys: the key of every player, sorted
+    _names: the name of every player, in the order of _keys
+    _points: a dictionary mapping the name of every player to its point
+
+    === Representation Invariants ===
+    - _capacity >= 1
+    - _keys is strictly increasing
+    - len(_keys) == len(_names) == len(_points)
+    - _keys[i] == _morton(*_points[_names[i]]) for every i
+    """
+    _centre: Tuple[int, int]
+    _bits: int
+    _capacity: int
+    _keys: array
+    _names: List[str]
+    _points: Dict[str, Tuple[int, int]]
+
+    def __init__(self, centre: Tuple[int, int], capacity: int = 8) -> None:
+        """Initialize a new Tree instance with centre <centre>, whose
+        quadrants are split once they hold more than <capacity> players.
+
+        Runtime: O(1)
+
+        === precondition ===
+        - the coordinates of the field are below 2 ** 32
+
+        >>> q = LinearQuadTree((50, 50))
+        >>> q = LinearQuadTree((50, 50), capacity=1)
+        """
+        self._centre = centre
+        self._bits = max(2 * centre[0], 2 * centre[1]).bit_length()
+        self._capacity = max(1, capacity)
+        self._keys = array('Q')
+        self._names = []
+        self._points = {}
+
+    @classmethod
+    def from_points(cls, centre: Tuple[int, int],
+                    items: Iterable[Tuple[str, Tuple[int, int]]],
+                    capacity: int = 8) -> LinearQuadTree:
+        """ Return a new LinearQuadTree with centre <centre> and quadrants
+        holding up to <capacity> players, storing every (name, point) pair in
+        <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players share the same point.
+
+        Runtime: O(n * log(n))
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (75, 25)),
+        ...                                           ('b', (25, 75)),
+        ...                                           ('c', (25, 25))])
+        >>> q._names
+        ['c', 'a', 'b']
+        """
+        tree = cls(centre, capacity)
+        tree.insert_many(items)
+        return tree
+
+    def _in_bounds(self, point: Tuple[int, int]) -> bool:
+        """
+        Return True if <point> is inside the field of <self>.
+        """
+        return 0 <= point[0] <= 2 * self._centre[0] and \
+            0 <= point[1] <= 2 * self._centre[1]
+
+    def _find(self, key: int) -> int:
+        """
+        Return the index of the player with key <key>, or -1 if there is none.
+        """
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return i
+        return -1
+
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """ Return the rectangle that players can be placed in on the field
+        described by <self>, as (west, north, east, south), edges included.
+
+        Runtime: O(1)
+
+        >>> LinearQuadTree((100, 50)).bounds()
+        (0, 0, 200, 100)
+        """
+        return 0, 0, 2 * self._centre[0], 2 * self._centre[1]
+
+    def __contains__(self, name: str) -> bool:
+        """ Return True if a player named <name> is stored in this tree.
+
+        Runtime: O(1)
+
+        >>> q = LinearQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> 'a' in q
+        True
+        >>> 'b' in q
+        False
+        """
+        return name in self._points
+
+    def contains_point(self, point: Tuple[int, int]) -> bool:
+        """ Return True if a player at location <point> is stored in this tree.
+
+        Runtime: O(log(n))
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25))])
+        >>> q.contains_point((25, 25))
+        True
+        >>> q.contains_point((50, 50))
+        False
+        """
+        return self._in_bounds(point) and \
+            self._find(_morton(point[0], point[1])) != -1
+
+    def insert(self, name: str, point: Tuple[int, int]) -> None:
+        """Insert a player named <name> into this tree at point <point>.
+
+        Raise an OutOfBoundsError if <point> is out of bounds.
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        Runtime: O(log(n)) comparisons, and a shift of the keys after <point>
+
+        >>> q = LinearQuadTree((50, 50))
+        >>> q.insert('a', (25, 25))
+        >>> q.insert('b', (20, 20))
+        >>> q._names
+        ['b', 'a']
+        """
+        if not self._in_bounds(point):
+            raise OutOfBoundsError
+        key = _morton(point[0], point[1])
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            raise OutOfBoundsError
+        if name in self._points:
+            # a name is stored once, as it is in the index of the other trees
+            self.remove(name)
+            i = bisect_left(self._keys, key)
+        self._keys.insert(i, key)
+        self._names.insert(i, name)
+        self._points[name] = point
+
+    def insert_many(self, items: Iterable[Tuple[str, Tuple[int, int]]]) -> \
+            None:
+        """Insert a player for every (name, point) pair in <items>.
+
+        Raise an OutOfBoundsError naming the offending players if a point is
+        out of bounds or if two players would share the same point.
+
+        An empty tree is bulk loaded, in which case nothing is inserted when
+        an OutOfBoundsError is raised. Otherwise the players are inserted one
+        at a time.
+
+        A bulk load computes the keys of all the players in one pass and sorts
+        them once, instead of shifting the keys for every player.
+
+        Runtime: O(n * log(n))
+
+        >>> q = LinearQuadTree((50, 50))
+        >>> q.insert_many([('a', (75, 75)), ('b', (25, 25))])
+        >>> q._names
+        ['b', 'a']
+        """
+        if not self.is_empty():
+            for name, point in items:
+                self.insert(name, point)
+            return None
+        # a name given twice keeps its last point
+        points = dict(items)
+        _check_items(self, list(points.items()))
+        self._points = points
+        pairs = sorted((_morton(point[0], point[1]), name)
+                       for name, point in self._points.items())
+        self._keys = array('Q', [key for key, _ in pairs])
+        self._names = [name for _, name in pairs]
+
+    def remove(self, name: str) -> None:
+        """ Remove information about a player named <name> from this tree.
+
+        Runtime: O(log(n)) comparisons, and a shift of the keys after the
+        player
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25))])
+        >>> q.remove('a')
+        >>> 'a' in q
+        False
+        >>> q._keys
+        array('Q')
+        """
+        point = self._points.pop(name, None)
+        if point is not None:
+            i = self._find(_morton(point[0], point[1]))
+            del self._keys[i]
+            del self._names[i]
+
+    def remove_point(self, point: Tuple[int, int]) -> None:
+        """ Remove information about a player at point <point> from this tree.
+
+        Runtime: O(log(n)) comparisons, and a shift of the keys after <point>
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25))])
+        >>> q.remove_point((25, 25))
+        >>> q.contains_point((25, 25))
+        False
+        """
+        if not self._in_bounds(point):
+            return None
+        i = self._find(_morton(point[0], point[1]))
+        if i != -1:
+            del self._points[self._names[i]]
+            del self._keys[i]
+            del self._names[i]
+
+    def move(self, name: str, direction: str, steps: int) -> \
+            Optional[Tuple[int, int]]:
+        """ Return the new location of the player named <name> after moving it
+        in the given <direction> by <steps> steps.
+
+        Raise an OutOfBoundsError if this would move the player named
+        <name> out of bounds (before moving the player).
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        Runtime: O(log(n)) comparisons, and a shift of the keys between the
+        old and the new point of the player
+
+        === precondition ===
+        direction in ['N', 'S', 'E', 'W']
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25))])
+        >>> q.move('a', 'S', 10)
+        (25, 35)
+        """
+        point = self._points.get(name)
+        if point is None:
+            return None
+        return self.move_point(point, direction, steps)
+
+    def move_point(self, point: Tuple[int, int], direction: str, steps: int) ->\
+            Optional[Tuple[int, int]]:
+        """ Return the new location of the player at point <point> after moving
+        it in the given <direction> by <steps> steps.
+
+        Raise an OutOfBoundsError if this would move the player at point
+        <point> out of bounds (before moving the player).
+
+        Raise an OutOfBoundsError if moving the player would place the player at
+        exactly the same coordinates of another player in the Tree
+        (before moving the player).
+
+        The player is re-sorted in place: only the keys between its old and
+        new place in the order are shifted, by one.
+
+        Runtime: O(log(n)) comparisons, and a shift of the keys between the
+        old and the new point of the player
+
+        === precondition ===
+        direction in ['N', 'S', 'E', 'W']
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25)),
+        ...                                           ('b', (30, 30))])
+        >>> q.move_point((25, 25), 'E', 10)
+        (35, 25)
+        >>> q._names
+        ['b', 'a']
+        """
+        if not self._in_bounds(point):
+            return None
+        i = self._find(_morton(point[0], point[1]))
+        if i == -1:
+            return None
+        new_point = _calc_point(point, direction, steps)
+        if not self._in_bounds(new_point):
+            raise OutOfBoundsError
+        key = _morton(new_point[0], new_point[1])
+        j = bisect_left(self._keys, key)
+        if j < len(self._keys) and self._keys[j] == key:
+            raise OutOfBoundsError
+        keys, names = self._keys, self._names
+        name = names[i]
+        if j > i:
+            # the player goes just before index j once it leaves index i
+            j -= 1
+            keys[i:j] = keys[i + 1:j + 1]
+            names[i:j] = names[i + 1:j + 1]
+        elif j < i:
+            keys[j + 1:i + 1] = keys[j:i]
+            names[j + 1:i + 1] = names[j:i]
+        keys[j] = key
+        names[j] = name
+        self._points[name] = new_point
+        return new_point
+
+    def move_many(self, moves: Iterable[Tuple[str, str, int]]) -> \
+            Tuple[Dict[str, Tuple[int, int]], List[Tuple[str, str, int]]]:
+        """ Move players by every (name, direction, steps) in <moves>, in
+        order, as if move had been called for each of them.
+
+        Return a dictionary mapping the name of every player that moved to its
+        new location, and a list of the moves that were rejected because they
+        would have raised an OutOfBoundsError. Moves of players that are not
+        in this tree are ignored.
+
+        Runtime: O(k * log(n)) comparisons for k moves
+
+        === precondition ===
+        every direction is in ['N', 'S', 'E', 'W']
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 35)),
+        ...                                           ('b', (25, 45))])
+        >>> q.move_many([('a', 'N', 10), ('b', 'N', 10), ('b', 'E', 90)])
+        ({'a': (25, 25), 'b': (25, 35)}, [('b', 'E', 90)])
+        """
+        locations = {}
+        rejected = []
+        for name, direction, steps in moves:
+            point = self._points.get(name)
+            if point is None:
+                continue
+            try:
+                locations[name] = self.move_point(point, direction, steps)
+            except OutOfBoundsError:
+                rejected.append((name, direction, steps))
+        return locations, rejected
+
+    def query_rect(self, x0: int, y0: int, x1: int, y1: int) -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player inside the rectangle
+        with north west corner (<x0>, <y0>) and south east corner (<x1>, <y1>),
+        borders included.
+
+        The players come out in the order of their keys.
+
+        Runtime: faster than O(n) when the rectangle is small
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25)),
+        ...                                           ('b', (75, 75))])
+        >>> list(q.query_rect(20, 20, 80, 70))
+        [('a', (25, 25))]
+        """
+        for start, end, inside in self._intervals(x0, y0, x1, y1):
+            for name in self._names[start:end]:
+                point = self._points[name]
+                if inside or (x0 <= point[0] <= x1 and y0 <= point[1] <= y1):
+                    yield name, point
+
+    def _intervals(self, x0: int, y0: int, x1: int, y1: int) -> \
+            Iterator[Tuple[int, int, bool]]:
+        """
+        Helper method for query_rect.
+        Yield (start, end, inside) for runs of keys, in order, that together
+        hold every player inside the rectangle with corners (<x0>, <y0>) and
+        (<x1>, <y1>). The players of the run from index start to index end,
+        excluded, are all inside the rectangle if inside is True.
+        """
+        stack = [self._root()]
+        while stack:
+            node = stack.pop()
+            west, north, east, south = self._rect(node)
+            if west > x1 or x0 > east or north > y1 or y0 > south:
+                continue
+            if x0 <= west and east <= x1 and y0 <= north and south <= y1:
+                yield node[0], node[1], True
+            elif node[1] - node[0] <= self._capacity:
+                yield node[0], node[1], False
+            else:
+                stack.extend(reversed(self._children(node)))
+
+    def query_radius(self, point: Tuple[int, int], r: int,
+                     metric: str = 'manhattan') -> \
+            Iterator[Tuple[str, Tuple[int, int]]]:
+        """ Yield the name and location of every player whose distance to
+        <point>, measured with <metric>, is at most <r>.
+
+        Runtime: faster than O(n) when <r> is small
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25)),
+        ...                                           ('b', (75, 75))])
+        >>> list(q.query_radius((50, 50), 49))
+        []
+        >>> list(q.query_radius((50, 50), 25, 'chebyshev'))
+        [('a', (25, 25)), ('b', (75, 75))]
+        """
+        for name, location in self.query_rect(point[0] - r, point[1] - r,
+                                              point[0] + r, point[1] + r):
+            if _distance(point, location + location, metric) <= r:
+                yield name, location
+
+    def find_collisions(self, radius: int, metric: str = 'manhattan') -> \
+            List[Tuple[str, str]]:
+        """ Return every pair of names of players whose distance to each other,
+        measured with <metric>, is at most <radius>. Each pair is ordered, and
+        the pairs are sorted.
+
+        Runtime: O(n * log(n)) when few players are within <radius> of each
+        other
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25)),
+        ...                                           ('b', (26, 25)),
+        ...                                           ('c', (25, 27))])
+        >>> q.find_collisions(1)
+        [('a', 'b')]
+        """
+        return _find_collisions(self._root(), self._expand, radius, metric)
+
+    def names_in_range(self, point: Tuple[int, int], direction: str,
+                       distance: int) -> List[str]:
+        """ Return a list of names of players whose location is in the
+        <direction> relative to <point> and whose location is within <distance>
+        along both the x and y axis.
+
+        Runtime: faster than O(n) when distance is small
+
+        === precondition ===
+        direction in ['NE', 'SE', 'NE', 'SW']
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25)),
+        ...                                           ('b', (75, 75))])
+        >>> q.names_in_range((40, 40), 'NW', 20)
+        ['a']
+        """
+        x_range, y_range = _find_xy_range(point, direction, distance)
+        return [name for name, _ in self.query_rect(min(x_range), min(y_range),
+                                                    max(x_range), max(y_range))]
+
+    def nearest(self, point: Tuple[int, int], k: int,
+                filter: Optional[Set[str]] = None,
+                metric: str = 'manhattan') -> List[Tuple[str, Tuple[int, int]]]:
+        """ Return the names and locations of the <k> players closest to
+        <point>, closest first. Players at the same distance are ordered by
+        location. Only players whose name is in <filter> are considered, unless
+        <filter> is None.
+
+        Distances are measured with <metric>, either 'manhattan' or
+        'chebyshev'.
+
+        Runtime: O(log(n) + k) for evenly spread players
+
+        === precondition ===
+        metric in ['manhattan', 'chebyshev']
+
+        >>> q = LinearQuadTree.from_points((50, 50), [('a', (25, 25)),
+        ...                                           ('b', (75, 75)),
+        ...                                           ('c', (60, 40))])
+        >>> q.nearest((50, 50), 2)
+        [('c', (60, 40)), ('a', (25, 25))]
+        """
+        return _nearest(self._root(), self._expand, point, k, filter, metric)
+
+    def _root(self) -> List[int]:
+        """
+        Return the quadrant covering the whole field, as a node of the form
+        [start, end, bits, key, x, y]: the players from index start to index
+        end, excluded, are in the square of side 2 ** bits whose north west
+        corner is (x, y), and whose smallest key is key. Nodes are lists, as
+        _find_collisions tells players apart from nodes by being tuples.
+        """
+        return [0, len(self._keys), self._bits, 0, 0, 0]
+
+    def _rect(self, node: List[int]) -> \
+            Tuple[int, int, int, int]:
+        """
+        Return the square covered by the quadrant <node> as (west, north,
+        east, south), edges included.
+        """
+        side = 1 << node[2]
+        return node[4], node[5], node[4] + side - 1, node[5] + side - 1
+
+    def _children(self, node: List[int]) -> \
+            List[List[int]]:
+        """
+        Return the quadrants of the quadrant <node> holding at least one
+        player, in the order of their keys: NW, NE, SW and SE.
+        """
+        start, end, bits, key, x, y = node
+        bits -= 1
+        span = 1 << (2 * bits)
+        half = 1 << bits
+        children = []
+        for quadrant in range(4):
+            if quadrant == 3:
+                stop = end
+            else:
+                stop = bisect_left(self._keys, key + span, start, end)
+            if stop > start:
+                children.append([start, stop, bits, key, x + half *
+                                 (quadrant & 1), y + half * (quadrant >> 1)])
+            start = stop
+            key += span
+        return children
+
+    def _expand(self, node: List[int],
+                rect: Tuple[float, float, float, float]) -> \
+            Tuple[List[Tuple[str, Tuple[int, int]]],
+                  List[Tuple[List[int],
+                             Tuple[float, float, float, float]]]]:
+        """
+        Helper method for nearest and find_collisions.
+        Return the players of the quadrant <node> if it is a leaf, and its
+        children paired with the squares they cover otherwise. <rect> is not
+        used, as a quadrant knows the square it covers.
+        """
+        start, end = node[0], node[1]
+        if end - start <= self._capacity:
+            return [(name, self._points[name])
+                    for name in self._names[start:end]], []
+        return [], [(child, self._rect(child))
+                    for child in self._children(node)]
+
+    def size(self) -> int:
+        """ Return the number of nodes in <self>, which are the quadrants that
+        are split and their children
+
+        Runtime: O(n)
+
+        >>> q = LinearQuadTree((50, 50), capacity=1)
+        >>> q.size()
+        1
+        >>> q.insert_many([('a', (25, 25)), ('b', (75, 75)), ('c', (80, 80))])
+        >>> q.size()
+        6
+        """
+        size = 0
+        stack = [self._root()]
+        while stack:
+            node = stack.pop()
+            size += 1
+            if node[1] - node[0] > self._capacity:
+                stack.extend(self._children(node))
+        return size
+
+    def height(self) -> int:
+        """ Return the height of <self>
+
+        Height is measured as the number of nodes in the path from the root of
+        this tree to the node at the greatest depth in this tree.
+
+        Runtime: O(n)
+
+        >>> q = LinearQuadTree((50, 50), capacity=1)
+        >>> q.insert('a', (25, 25))
+        >>> q.height()
+        1
+        >>> q.insert('b', (75, 75))
+        >>> q.height()
+        2
+        """
+        height = 0
+        stack = [(self._root(), 1)]
+        while stack:
+            node, level = stack.pop()
+            height = max(height, level)
+            if node[1] - node[0] > self._capacity:
+                for child in self._children(node):
+                    stack.append((child, level + 1))
+        return height
+
+    def depth(self, tree: Tree) -> Optional[int]:
+        """ Return the depth of the subtree <tree> relative to <self>. Return
+        None if <tree> is not a descendant of <self>
+
+        The quadrants of a LinearQuadTree are not Tree instances, so no tree
+        is ever a descendant of <self>.
+
+        Runtime: O(1)
+
+        >>> q = LinearQuadTree((50, 50))
+        >>> q.depth(QuadTree((25, 25))) is None
+        True
+        """
+        return None
+
+    def is_leaf(self) -> bool:
+        """ Return True if <self> has no children
+
+        Runtime: O(1)
+        """
+        return len(self._keys) <= self._capacity
+
+    def is_empty(self) -> bool:
+        """ Return True if <self> does not store any information about the
+        location of any players.
+
+        Runtime: O(1)
+        """
+        return not self._keys
+
+
+def _ring(column: int, row: int, ring: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield every cell whose distance to the cell (<column>, <row>), counted in
+    cells along the furthest axis, is exactly <ring>.
+    """
+    if ring == 0:
+        yield column, row
+        return
+    for i in range(column - ring, column + ring + 1):
+        yield i, row - ring
+        yield i, row + ring
+    for j in range(row - ring + 1, row + ring):
+        yield column - ring, j
+        yield column + ring, j
+
+
+def _left_size(n: int) -> int:
+    """
+    Return the number of nodes in the left subtree of a complete binary tree
+    with <n> nodes.
+    """
+    if n <= 1:
+        return 0
+    height = n.bit_length() - 1
+    half = 1 << (height - 1)
+    return half - 1 + min(n - (1 << height) + 1, half)
+
+
+def _morton(x: int, y: int) -> int:
+    """
+    Return the Z-order key of the point (<x>, <y>), whose bits alternate
+    between the bits of <x>, from the lowest, and the bits of <y>.
+
+    === precondition ===
+    - 0 <= x < 2 ** 32 and 0 <= y < 2 ** 32
+
+    >>> _morton(3, 0), _morton(0, 3), _morton(5, 6)
+    (5, 10, 57)
+    """
+    x = (x | (x << 16)) & 0x0000FFFF0000FFFF
+    x = (x | (x << 8)) & 0x00FF00FF00FF00FF
+    x = (x | (x << 4)) & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x << 2)) & 0x3333333333333333
+    x = (x | (x << 1)) & 0x5555555555555555
+    y = (y | (y << 16)) & 0x0000FFFF0000FFFF
+    y = (y | (y << 8)) & 0x00FF00FF00FF00FF
+    y = (y | (y << 4)) & 0x0F0F0F0F0F0F0F0F
+    y = (y | (y << 2)) & 0x3333333333333333
+    y = (y | (y << 1)) & 0x5555555555555555
+    return x | (y << 1)
+
+
 if __name__ == '__main__':
     import python_ta
-    python_ta.check_all(config={'extra-imports': ['typing'],
+    python_ta.check_all(config={'extra-imports': ['typing', 'heapq', 'array',
+                                                  'bisect', 'math'],
                                 'disable': ['R0913', 'R0902', 'W0611', 'R1710',
                                             'R1702']})